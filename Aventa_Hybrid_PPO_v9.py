@@ -1,14 +1,27 @@
 import argparse
 import MetaTrader5 as mt5 # type: ignore
-import time
 import numpy as np # type: ignore
-from stable_baselines3 import PPO # type: ignore
 import signal
-import csv
-from datetime import datetime, timedelta
+from datetime import timedelta
 import os  # Tambahkan ini
-import pandas as pd # type: ignore
 import json  # <-- ditambahkan
+from tick_scheduler import TickScheduler
+from market_snapshot import take_snapshot
+from async_logger import AsyncCsvLogger
+from daily_profit import DailyProfitTracker
+from trading_report import TradingReporter
+from bar_buffer import BarRingBuffer
+from bar_aggregator import MultiTimeframeBars
+from feature_engine import RingFeatureTracker
+from feature_scaler import ScalerArtifact
+from observation_spec import ObservationSpec
+from bot_clock import get_clock
+from policy_server import DEFAULT_ADDRESS as POLICY_SERVER_ADDRESS, DEFAULT_KEY_FILE as POLICY_KEY_FILE
+from policy_server import PolicyClient, load_authkey, load_policy
+
+# Semua timing bot (interval, jam trading, reset harian, sleep) lewat satu jam yang bisa diinjeksikan
+# (SystemClock di produksi, VirtualClock saat replay) -- lihat bot_clock.py
+clock = get_clock()
 
 # Parser untuk argumen
 parser = argparse.ArgumentParser(description="Aventa Hybrid PPO Trading Bot")
@@ -17,7 +30,8 @@ parser.add_argument("--symbol", type=str, required=True, help="Trading symbol")
 parser.add_argument("--lot_size", type=float, required=True, help="Lot size")
 parser.add_argument("--close_profit", type=float, required=True, help="Profit target")
 parser.add_argument("--max_open_trades", type=int, required=True, help="Maximum number of open trades")
-parser.add_argument("--ppo_model_path", type=str, required=True, help="Path to PPO model file")
+parser.add_argument("--ppo_model_path", type=str, required=True,
+                    help="Path to PPO model file (.zip SB3, atau .npz hasil numpy_policy.py untuk inferensi tanpa torch)")
 parser.add_argument("--type_filling", type=int, required=True, choices=[1, 2, 3],
                     help="Order filling mode: 1=FOK, 2=IOC, 3=RETURN")
 parser.add_argument("--max_spread", type=float, required=True, help="Maximum allowed spread")  # Tambahkan argumen ini
@@ -32,6 +46,28 @@ parser.add_argument("--reverse", action="store_true", help="Aktifkan reverse tra
 parser.add_argument("--window_open_limit", type=int, default=50, help="Maksimal open trade per window aktif (default 50)")  # lebih banyak untuk HFT
 parser.add_argument("--window_on_seconds", type=int, default=60, help="Durasi window aktif trading dalam detik (default 60 detik = 1 menit)")  # HFT: lebih singkat
 parser.add_argument("--window_pause_seconds", type=int, default=10, help="Durasi window PAUSE dalam detik (default 10 detik)")  # HFT: singkat
+# Scheduler berbasis tick (menggantikan polling buta 50 ms)
+parser.add_argument("--risk_check_interval", type=float, default=1.0, help="Interval risk check saat tidak ada tick baru, dalam detik (default 1.0)")
+parser.add_argument("--tick_poll_min", type=float, default=0.02, help="Interval polling tick minimum dalam detik (default 0.02)")
+parser.add_argument("--tick_poll_max", type=float, default=0.25, help="Interval polling tick maksimum saat pasar sepi, dalam detik (default 0.25)")
+# Logger transaksi asinkron
+parser.add_argument("--log_flush_interval", type=float, default=0.5, help="Interval flush log_transaksi.csv dalam detik (default 0.5)")
+parser.add_argument("--log_queue_size", type=int, default=10000, help="Kapasitas antrean log sebelum baris dibuang (default 10000)")
+parser.add_argument("--report_interval", type=float, default=5.0,
+                    help="Jeda minimum (detik) antar baris trading report jika hanya equity/floating yang berubah (default 5)")
+parser.add_argument("--report_format", type=str, default="csv", choices=["csv", "binary"],
+                    help="Format trading report: csv (trading_report_{akun}.csv) atau binary (.bin per hari)")
+parser.add_argument("--log_policy", type=str, default="drop", choices=["drop", "block"],
+                    help="Kebijakan saat antrean log penuh: drop=buang baris baru, block=tunggu singkat (default drop)")
+parser.add_argument("--scaler_path", type=str, default=None,
+                    help="Artifact scaler dari preprocessing (processed_data_{simbol}_scalers.json); "
+                         "jika diisi, observasi PPO dinormalisasi sama seperti data training "
+                         "(diabaikan jika model membawa observation spec sendiri)")
+parser.add_argument("--policy_server", type=str, nargs="?", const=POLICY_SERVER_ADDRESS, default=None,
+                    help="Inferensi PPO lewat daemon bersama (policy_server.py) di alamat ini; tanpa nilai = "
+                         f"{POLICY_SERVER_ADDRESS}. Jika daemon tidak tersedia, model dimuat in-process")
+parser.add_argument("--policy_key_file", type=str, default=POLICY_KEY_FILE,
+                    help="File kunci autentikasi policy server (sama dengan --key_file daemon)")
 
 # Parse argumen
 args = parser.parse_args()
@@ -86,7 +122,7 @@ def save_baseline_equity(account_number, equity):
         data = {
             "account": account_number,
             "baseline_equity": float(equity),
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            "timestamp": clock.now().strftime("%Y-%m-%d %H:%M:%S")
         }
         with open(f"baseline_equity_{account_number}.json", "w") as f:
             json.dump(data, f)
@@ -143,6 +179,7 @@ lot_size = args.lot_size
 close_profit = args.close_profit
 max_open_trades = args.max_open_trades
 ppo_model_path = args.ppo_model_path
+MAGIC_NUMBER = 810251
 
 # Ensure the symbol is selected
 print(f"Memilih simbol: {symbol}...")
@@ -151,9 +188,34 @@ if not mt5.symbol_select(symbol, True):
     mt5.shutdown()
     exit()
 
+# Ring buffer bar M1: histori diambil sekali, selanjutnya hanya 2 bar terbaru per update
+m1_bars = BarRingBuffer(mt5, symbol, mt5.TIMEFRAME_M1, capacity=120, bar_seconds=60)
+# Bar M5/M15/M30/H1 dibangun incremental dari ring M1 (histori native diambil sekali saat seed)
+mtf_bars = MultiTimeframeBars(m1_bars, mt5, capacity=120)
+
 # Load PPO agent
 print("Memuat agen trading PPO...")
-ppo_agent = PPO.load(ppo_model_path)
+if args.policy_server:
+    # Model dimuat sekali oleh daemon untuk semua bot; torch baru diimport di sini jika fallback dibutuhkan
+    try:
+        policy_key = load_authkey(args.policy_key_file)
+    except (OSError, ValueError) as e:
+        policy_key = b""  # tanpa kunci daemon tidak dipakai; PolicyClient langsung fallback in-process
+        print(f"Kunci policy server tidak terbaca ({e})")
+    ppo_agent = PolicyClient(ppo_model_path, address=args.policy_server, authkey=policy_key)
+    print(f"Inferensi PPO lewat policy server {args.policy_server} (fallback in-process jika tidak tersedia)")
+else:
+    ppo_agent = load_policy(ppo_model_path)
+# Spec observasi dari trainer (kolom fitur, window, scaling); None untuk model lama (Close mentah 4 bar)
+obs_spec = ObservationSpec.load_from_model(ppo_model_path)
+# Normalisasi observasi model lama: parameter scaler yang sama dengan saat preprocessing (tanpa fit ulang)
+obs_scaler = ScalerArtifact.load(args.scaler_path) if args.scaler_path and obs_spec is None else None
+if obs_spec is not None:
+    print(f"Observasi PPO: {obs_spec.columns} x {obs_spec.window} bar (mode {obs_spec.obs_mode})")
+
+# Indikator M1 (MA, Stochastic, RSI, ATR, SR) di-update streaming O(1) per bar;
+# baris fitur bar yang sudah close disimpan sebanyak yang dibutuhkan observasi PPO
+m1_features = RingFeatureTracker(history=obs_spec.rows_needed - 1 if obs_spec is not None else 0)
 
 # Added separator lines for debug information between accounts
 print("\n-----------------------------")
@@ -168,18 +230,14 @@ print(f"Spread Maksimal: {args.max_spread}")
 print("-----------------------------\n")
 
 def print_with_account(msg):
-    try:
-        account_info = mt5.account_info()
-        account_number = account_info.login if account_info else "N/A"
-    except Exception:
-        account_number = "N/A"
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    # Nomor akun tidak berubah selama proses berjalan -> pakai nilai dari startup (tanpa IPC)
+    timestamp = clock.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{timestamp}] [Account: {account_number}] {msg}")
 
 # Function to get account information
-def get_account_info():
+def get_account_info(snapshot=None):
     #print_with_account("Mengambil informasi akun...")
-    account_info = mt5.account_info()
+    account_info = snapshot.account if snapshot is not None else mt5.account_info()
     if account_info is None:
         print_with_account("Gagal mendapatkan informasi akun")
         mt5.shutdown()
@@ -189,17 +247,20 @@ def get_account_info():
     return account_info
 
 # Function to get open trades
-def get_open_trades():
+def get_open_trades(snapshot=None):
+    if snapshot is not None:
+        return list(snapshot.positions)
     print_with_account("Fetching open trades with specific magic number...")
     trades = mt5.positions_get(symbol=symbol)
     if trades is None:
         return []
-    return [t for t in trades if t.magic == 810251]
+    return [t for t in trades if t.magic == MAGIC_NUMBER]
 
 # Function to calculate TP price based on $0.8 profit
-def calculate_tp_price(trade_type, entry_price, lot_size, tp_amount=close_profit):
+def calculate_tp_price(trade_type, entry_price, lot_size, tp_amount=close_profit, point=None):
     """Menghitung harga TP berdasarkan profit $0.5."""
-    point = mt5.symbol_info(symbol).point
+    if point is None:
+        point = mt5.symbol_info(symbol).point
     tp_points = (tp_amount / lot_size)
     if "BTC" in symbol:
         tp_points *= 100
@@ -211,9 +272,10 @@ def calculate_tp_price(trade_type, entry_price, lot_size, tp_amount=close_profit
     return None
 
 # Modify the place_trade function to include TP
-def place_trade(action):
+def place_trade(action, snapshot=None):
+    tick = snapshot.tick if snapshot is not None else None
     # Debug spread aktual
-    actual_spread = get_actual_spread(symbol)
+    actual_spread = get_actual_spread(symbol, tick)
     if actual_spread is not None:
         log_to_csv("Spread", "Diperiksa Sebelum Trading", f"Spread Aktual: {actual_spread:.5f}")
         if actual_spread > args.max_spread:
@@ -223,8 +285,11 @@ def place_trade(action):
 
     print_with_account(f"Melakukan trading dengan aksi: {'BELI' if action == 2 else 'JUAL'}...")
     trade_type = mt5.ORDER_TYPE_BUY if action == 2 else mt5.ORDER_TYPE_SELL
-    price = mt5.symbol_info_tick(symbol).ask if action == 2 else mt5.symbol_info_tick(symbol).bid
-    tp_price = calculate_tp_price(mt5.ORDER_TYPE_BUY if action == 2 else mt5.ORDER_TYPE_SELL, price, lot_size)
+    if tick is None:
+        tick = mt5.symbol_info_tick(symbol)
+    price = tick.ask if action == 2 else tick.bid
+    point = snapshot.symbol_info.point if snapshot is not None and snapshot.symbol_info is not None else None
+    tp_price = calculate_tp_price(mt5.ORDER_TYPE_BUY if action == 2 else mt5.ORDER_TYPE_SELL, price, lot_size, point=point)
     request = {
         "action": mt5.TRADE_ACTION_DEAL,
         "symbol": symbol,
@@ -233,7 +298,7 @@ def place_trade(action):
         "price": price,
         "tp": tp_price,  # Add TP to the trade request
         "deviation": 5,  # lebih agresif untuk HFT (dikurangi)
-        "magic": 810251,
+        "magic": MAGIC_NUMBER,
         "comment": "AvHybrid_v9",
         "type_time": mt5.ORDER_TIME_GTC,
         "type_filling": type_filling,
@@ -249,11 +314,14 @@ def place_trade(action):
     update_trading_report()
 
 # Function to close all trades
-def close_all_trades():
+def close_all_trades(snapshot=None):
     print_with_account("Menutup semua posisi terbuka...")
-    for trade in get_open_trades():
+    tick = snapshot.tick if snapshot is not None else None
+    for trade in get_open_trades(snapshot):
+        if tick is None:
+            tick = mt5.symbol_info_tick(symbol)
         trade_type = mt5.ORDER_TYPE_SELL if trade.type == mt5.ORDER_TYPE_BUY else mt5.ORDER_TYPE_BUY
-        price = mt5.symbol_info_tick(symbol).bid if trade.type == mt5.ORDER_TYPE_BUY else mt5.symbol_info_tick(symbol).ask
+        price = tick.bid if trade.type == mt5.ORDER_TYPE_BUY else tick.ask
         request = {
             "action": mt5.TRADE_ACTION_DEAL,
             "symbol": symbol,
@@ -262,7 +330,7 @@ def close_all_trades():
             "position": trade.ticket,
             "price": price,
             "deviation": 10,  # dikurangi dari 20 untuk respons lebih cepat
-            "magic": 810251,
+            "magic": MAGIC_NUMBER,
             "comment": "Close",
             "type_time": mt5.ORDER_TIME_GTC,
             "type_filling": type_filling,  # tambahkan ini
@@ -280,9 +348,12 @@ def close_all_trades():
             elif result.retcode == 10030:
                 print_with_account(f"[Close Trade] Retcode=10030 (server busy/no connection). Percobaan ke-{retry+1}/5. Reinitializing...")
                 mt5.shutdown()
-                time.sleep(0.5)
+                clock.sleep(0.5)
                 mt5.initialize(args.mt5_path)  # reinit ulang
-                time.sleep(0.5)  # jeda singkat sebelum retry
+                clock.sleep(0.5)  # jeda singkat sebelum retry
+                tick = mt5.symbol_info_tick(symbol)  # harga snapshot sudah basi setelah reinit
+                if tick is not None:
+                    request["price"] = tick.bid if trade.type == mt5.ORDER_TYPE_BUY else tick.ask
             else:
                 print_with_account(f"Failed to close trade, retcode={result.retcode}")
                 log_to_csv("Close Trade", "Failed", f"Position: {trade.ticket}, Retcode: {result.retcode}")
@@ -296,6 +367,8 @@ def close_all_trades():
 # Function to reset the program
 def reset_program(signal_received, frame):
     print_with_account("\nMengatur ulang program ke kondisi awal...")
+    transaction_logger.close()  # Tulis sisa antrean log sebelum restart
+    daily_profit_tracker.close()
     mt5.shutdown()  # Pastikan MetaTrader 5 ditutup dengan benar
     print_with_account("Memulai ulang program...")
     exec(open(__file__).read())  # Memulai ulang skrip
@@ -303,15 +376,23 @@ def reset_program(signal_received, frame):
 # Attach signal handler for Ctrl+C
 signal.signal(signal.SIGINT, reset_program)
 
+# Logger transaksi: file handle tunggal + thread penulis batch, tidak mem-blok loop trading
+LOG_FILE = "log_transaksi.csv"
+transaction_logger = AsyncCsvLogger(
+    LOG_FILE,
+    fieldnames=["timestamp", "action", "status", "details"],
+    max_queue=args.log_queue_size,
+    flush_interval=args.log_flush_interval,
+    policy=args.log_policy,
+)
+
+# Total profit closed harian: dibangun dari log saat startup, checkpoint per akun
+daily_profit_tracker = DailyProfitTracker(LOG_FILE, f"daily_profit_{account_number}.json", now=clock.now,
+                                          clock=clock.monotonic)
+
 # Fungsi untuk mencatat log ke file CSV
 def log_to_csv(action, status, details=""):
-    log_file = "log_transaksi.csv"
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    try:
-        account_info = mt5.account_info()
-        account_number = account_info.login if account_info else "N/A"
-    except Exception:
-        account_number = "N/A"
+    timestamp = clock.now().strftime("%Y-%m-%d %H:%M:%S")
     log_entry = {
         "timestamp": timestamp,
         "action": action,
@@ -320,35 +401,20 @@ def log_to_csv(action, status, details=""):
     }
     # Tampilkan log di layar dengan timestamp & nomor akun
     print(f"[{timestamp}] [Account: {account_number}] [{action}] [{status}] {details}")
-    # Tulis log ke file CSV
-    try:
-        file_exists = os.path.isfile(log_file)  # type: ignore
-        with open(log_file, mode="a", newline="") as file:
-            writer = csv.DictWriter(file, fieldnames=["timestamp", "action", "status", "details"])
-            if not file_exists:
-                writer.writeheader()  # Tulis header jika file belum ada
-            writer.writerow(log_entry)
-    except Exception as e:
-        print(f"[ERROR] Gagal mencatat log ke CSV: {e}")
+    # Total profit harian di-update di sini, bukan menunggu baris sampai di file
+    daily_profit_tracker.record(log_entry)
+    # Tulis log ke file CSV (diantrekan, ditulis batch oleh thread latar belakang)
+    transaction_logger.log(log_entry)
 
 # Function to get the actual spread of the symbol
-def get_actual_spread(symbol):
-    tick = mt5.symbol_info_tick(symbol)
+def get_actual_spread(symbol, tick=None):
     if tick is None:
-        try:
-            account_info = mt5.account_info()
-            account_number = account_info.login if account_info else "N/A"
-        except Exception:
-            account_number = "N/A"
-        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [Account: {account_number}] [ERROR] Failed to fetch tick data for symbol: {symbol}")
+        tick = mt5.symbol_info_tick(symbol)
+    if tick is None:
+        print(f"[{clock.now().strftime('%Y-%m-%d %H:%M:%S')}] [Account: {account_number}] [ERROR] Failed to fetch tick data for symbol: {symbol}")
         return None
     spread = tick.ask - tick.bid
-    try:
-        account_info = mt5.account_info()
-        account_number = account_info.login if account_info else "N/A"
-    except Exception:
-        account_number = "N/A"
-    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [Account: {account_number}] [DEBUG] Actual spread for {symbol}: {spread:.5f}")
+    print(f"[{clock.now().strftime('%Y-%m-%d %H:%M:%S')}] [Account: {account_number}] [DEBUG] Actual spread for {symbol}: {spread:.5f}")
     return spread
 
 # Added debug information for suggested lot size based on free margin
@@ -370,9 +436,10 @@ def calculate_suggested_lot(free_margin, risk_percentage=1, lot_min=0.01, lot_st
         # Bulatkan ke kelipatan lot_step
         return round(suggested_lot // lot_step * lot_step, 2)
 
-def get_margin_per_lot(symbol):
+def get_margin_per_lot(symbol, symbol_info=None):
     """Mendeteksi margin per lot dari broker untuk simbol tertentu."""
-    symbol_info = mt5.symbol_info(symbol)
+    if symbol_info is None:
+        symbol_info = mt5.symbol_info(symbol)
     if symbol_info is None:
         print(f"[ERROR] Failed to fetch symbol info for {symbol}")
         return None
@@ -384,45 +451,24 @@ def get_margin_per_lot(symbol):
 
     return margin_per_lot
 
-def analyze_entry_signal(df_m5, df_m15, df_m30, df_h1):
+def analyze_entry_signal(m5, m15, m30, h1, features=None):
     """
     Analisa sinyal entry berdasarkan aturan multi-timeframe.
-    df_m5, df_m15, df_m30, df_h1: DataFrame OHLCV untuk masing-masing timeframe.
+    m5, m15, m30, h1: dict kolom OHLCV (view NumPy zero-copy, lihat MultiTimeframeBars.columns)
+        untuk masing-masing timeframe.
+    features: dict indikator M1 terbaru dari feature_engine (MA_3, MA_15, stoch_k, RSI_14, ATR_14, ...).
     Return: 'BUY', 'SELL', atau None
     """
     # --- Hapus seluruh kode yang menggunakan ta.ema, ta.stoch, dst ---
     # Ganti dengan return None agar tidak error dan PPO agent selalu digunakan
     return None
 
-def get_daily_closed_profit(log_file="log_transaksi.csv"):
+def get_daily_closed_profit():
     """
     Menghitung total profit harian dari transaksi yang sudah closed pada hari ini.
+    Total di-update oleh log_to_csv; log hanya dibaca saat startup (lihat daily_profit.py).
     """
-    today = datetime.now().strftime("%Y-%m-%d")
-    total_profit = 0.0
-    try:
-        if not os.path.isfile(log_file):
-            return 0.0
-        with open(log_file, mode="r", newline="") as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                # Filter hanya transaksi closed hari ini
-                if row["action"] in ["Close Trade", "Profit Target", "Daily Target"] and row["status"] == "Successful":
-                    if row["timestamp"].startswith(today):
-                        # Ambil nilai profit dari details jika ada
-                        details = row["details"]
-                        # Contoh details: "Profit: $12.34" atau "Position: 123456, Volume: 0.05"
-                        if "Profit:" in details:
-                            try:
-                                profit_str = details.split("Profit: $")[-1].split()[0]
-                                profit_val = float(profit_str)
-                                total_profit += profit_val
-                            except:
-                                continue
-        return total_profit
-    except Exception as e:
-        print(f"[ERROR] Gagal membaca profit harian dari log: {e}")
-        return 0.0
+    return daily_profit_tracker.total()
 
 # === Windowed trading control (HFT tuning) ===
 WINDOW_OPEN_LIMIT = args.window_open_limit
@@ -459,24 +505,28 @@ def update_window_status(window_open_count, window_limit, window_time_left, is_p
     except Exception as e:
         print_with_account(f"[ERROR] Gagal update {WINDOW_STATUS_FILE}: {e}")
 
-def update_trading_report():
+# Trading report: hanya menulis saat ada perubahan (sampling + dedup), lihat trading_report.py
+trading_reporter = TradingReporter(account_number, interval=args.report_interval, fmt=args.report_format,
+                                   clock=clock.monotonic, now=clock.now)
+
+def update_trading_report(snapshot=None):
     """
-    Membuat/memperbarui laporan trading per akun dalam bentuk CSV.
-    File: trading_report_{account_number}.csv
+    Membuat/memperbarui laporan trading per akun.
+    File: trading_report_{account_number}.csv (atau .bin harian untuk --report_format binary)
     Kolom: timestamp, balance, equity, margin, free_margin, open_trades, floating_profit, daily_closed_profit
+    Jika snapshot tidak diberikan (mis. setelah open/close), data diambil ulang dari terminal.
+    Baris hanya ditulis jika nilai berubah (lihat TradingReporter).
     """
     try:
-        account_info = mt5.account_info()
+        if snapshot is None:
+            snapshot = take_snapshot(mt5, symbol, MAGIC_NUMBER)
+        account_info = snapshot.account
         if account_info is None:
             return
-        account_number = account_info.login
-        report_file = f"trading_report_{account_number}.csv"
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        open_trades = get_open_trades()
+        open_trades = get_open_trades(snapshot)
         floating_profit = sum(trade.profit for trade in open_trades)
         daily_closed_profit = get_daily_closed_profit()
         row = {
-            "timestamp": timestamp,
             "balance": account_info.balance,
             "equity": account_info.equity,
             "margin": account_info.margin,
@@ -485,19 +535,14 @@ def update_trading_report():
             "floating_profit": floating_profit,
             "daily_closed_profit": daily_closed_profit
         }
-        file_exists = os.path.isfile(report_file)
-        with open(report_file, mode="a", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=list(row.keys()))
-            if not file_exists:
-                writer.writeheader()
-            writer.writerow(row)
+        trading_reporter.report(row)
     except Exception as e:
         print(f"[ERROR] Gagal update trading report: {e}")
 
 def trading_loop():
     print_with_account("Memulai loop trading (HFT mode)...")
     daily_profit = 0
-    start_of_day = datetime.now().date()
+    start_of_day = clock.now().date()
     max_dd_hit_count = 0
 
     global window_initialized, is_pause_window, active_end_ts, pause_end_ts, window_open_count
@@ -508,17 +553,28 @@ def trading_loop():
     pause_until_next_day = False
     pause_resume_time = None
 
+    # Scheduler: loop hanya bangun saat tick berubah atau risk check jatuh tempo
+    scheduler = TickScheduler(
+        mt5, symbol,
+        risk_interval=args.risk_check_interval,
+        min_poll=args.tick_poll_min,
+        max_poll=args.tick_poll_max,
+        clock=clock.monotonic,
+        sleep=clock.sleep,
+    )
+
     while True:
-        now = time.time()
+        event = scheduler.wait()
+        now = clock.monotonic()
 
         # === PAUSE SAMPAI BESOK JAM 4:00 JIKA 3 KALI CUTLOSS ===
         if pause_until_next_day:
-            now_dt = datetime.now()
+            now_dt = clock.now()
             if now_dt >= pause_resume_time:
                 print_with_account(f"Waktu tunggu selesai, trading pair {symbol} dilanjutkan.")
                 pause_until_next_day = False
                 max_dd_hit_count = 0
-                start_of_day = datetime.now().date()
+                start_of_day = clock.now().date()
                 # Reset window state
                 window_initialized = False
                 continue
@@ -526,9 +582,12 @@ def trading_loop():
             jam = int(sisa // 3600)
             menit = int((sisa % 3600) // 60)
             print_with_account(f"Trading pair {symbol} akan dilanjutkan pada {pause_resume_time.strftime('%Y-%m-%d %H:%M')}. Sisa waktu: {jam} jam {menit} menit.")
-            time.sleep(60)
+            clock.sleep(min(60, sisa))
             continue
 
+        # Satu snapshot akun/posisi/tick/simbol per iterasi, dipakai semua pengecekan di bawah
+        snap = take_snapshot(mt5, symbol, MAGIC_NUMBER, tick=event.tick)
+
         # === Window state machine ===
         if not window_initialized:
             window_initialized = True
@@ -542,13 +601,13 @@ def trading_loop():
         update_window_status(window_open_count, WINDOW_OPEN_LIMIT, window_time_left, is_pause_window)
 
         # --- CEK FLOATING PROFIT SAAT PAUSE/AKTIF ---
-        open_trades = get_open_trades()
-        cumulative_profit = sum(trade.profit for trade in open_trades)
+        open_trades = get_open_trades(snap)
+        cumulative_profit = snap.floating_profit
         if cumulative_profit >= 0.5:
             print_with_account(f"[AUTO CLOSE] Floating profit mencapai ${cumulative_profit:.2f} (>= $0.5). Menutup semua posisi...")
             log_to_csv("Auto Close", "Floating Profit >= 0.5", f"Profit: ${cumulative_profit:.2f}")
-            close_all_trades()
-            time.sleep(0.05)
+            close_all_trades(snap)
+            clock.sleep(0.05)
             continue
 
         if is_pause_window:
@@ -556,41 +615,41 @@ def trading_loop():
             if remaining > 0:
                 mm, ss = divmod(max(0, remaining), 60)
                 print_with_account(f"PAUSE: {mm:02d}:{ss:02d} tersisa sebelum trading aktif lagi...")
-                time.sleep(0.1)
+                clock.sleep(0.1)
                 continue
             # end pause -> switch to active window
             is_pause_window = False
-            active_end_ts = time.time() + WINDOW_ON_SECONDS
+            active_end_ts = clock.monotonic() + WINDOW_ON_SECONDS
             window_open_count = 0
             print_with_account(f"=== MODE: TRADING AKTIF ({WINDOW_ON_SECONDS}s, max {WINDOW_OPEN_LIMIT} open) ===")
 
         # if active window time elapsed or open limit reached -> switch to pause
         if (now >= active_end_ts) or (window_open_count >= WINDOW_OPEN_LIMIT):
             is_pause_window = True
-            pause_end_ts = time.time() + WINDOW_PAUSE_SECONDS  # gunakan argumen (HFT singkat)
-            window_time_left = int(pause_end_ts - time.time())
+            pause_end_ts = clock.monotonic() + WINDOW_PAUSE_SECONDS  # gunakan argumen (HFT singkat)
+            window_time_left = int(pause_end_ts - clock.monotonic())
             update_window_status(window_open_count, WINDOW_OPEN_LIMIT, window_time_left, True)
             print_with_account(f"=== MODE: PAUSE ({WINDOW_PAUSE_SECONDS}s) ===")
             continue
 
         # --- Reset harian ---
-        if datetime.now().date() != start_of_day:
+        if clock.now().date() != start_of_day:
             daily_profit = 0
-            start_of_day = datetime.now().date()
+            start_of_day = clock.now().date()
             max_dd_hit_count = 0  # Reset counter setiap hari baru
             print_with_account("-" * 50)
             print_with_account(f"Memulai hari baru. Target harian dan max_dd_hit_count diatur ulang.")
             print_with_account("-" * 50)
 
-        current_time = datetime.now()
+        current_time = clock.now()
         current_hour = current_time.hour
 
         # Jika max_dd tercapai 3x, hentikan trading sampai hari berikutnya jam 4:00 WIB
         if max_dd_hit_count >= 3:
             print_with_account(f"[PERINGATAN] Max drawdown tercapai 3 kali hari ini untuk pair {symbol}. Semua posisi akan ditutup dan trading dihentikan sampai besok jam 04:00.")
-            close_all_trades()
+            close_all_trades(snap)
             log_to_csv("Max Drawdown", "Stop Trading", f"Pair: {symbol}, Trading dihentikan sampai besok jam 04:00")
-            now_dt = datetime.now()
+            now_dt = clock.now()
             # Hitung waktu resume trading besok jam 4:00 WIB
             if now_dt.hour < 4:
                 pause_resume_time = now_dt.replace(hour=4, minute=0, second=0, microsecond=0)
@@ -610,42 +669,44 @@ def trading_loop():
             minutes, seconds = divmod(remainder, 60)
             print_with_account(f"Waktu saat ini: {current_time.strftime('%H:%M:%S')}. Di luar jam trading ({args.start_trading_hour}:00-{args.end_trading_hour}:00).")
             print_with_account(f"Menunggu hingga trading dimulai dalam {hours} jam, {minutes} menit, dan {seconds} detik...")
-            time.sleep(2)
+            clock.sleep(2)
             continue
 
         # Mengambil informasi akun dan trading
-        print_with_account("-" * 50)
-        print_with_account("Mengambil informasi akun dan trading...")
-        account_info = get_account_info()
+        # Risk check terjadwal tanpa tick baru hanya mengevaluasi batas; print, log "Checked"
+        # dan akumulasi daily_profit tetap sekali per tick seperti loop lama
+        account_info = get_account_info(snap)
         daily_closed_profit = get_daily_closed_profit()
-        print_with_account(f"Total profit harian (closed): ${daily_closed_profit:.2f}")
-        # Check cumulative profit
-        open_trades = get_open_trades()
-        cumulative_profit = sum(trade.profit for trade in open_trades)
-        print_with_account(f"Total profit saat ini: ${cumulative_profit:.2f}")
-        log_to_csv("Cumulative Profit", "Checked", f"Profit: ${cumulative_profit:.2f}")
+        if event.new_tick:
+            print_with_account("-" * 50)
+            print_with_account("Mengambil informasi akun dan trading...")
+            print_with_account(f"Total profit harian (closed): ${daily_closed_profit:.2f}")
+            # Check cumulative profit
+            print_with_account(f"Total profit saat ini: ${cumulative_profit:.2f}")
+            log_to_csv("Cumulative Profit", "Checked", f"Profit: ${cumulative_profit:.2f}")
 
         # === CLOSE ALL jika floating profit >= 2.0 ===
         if cumulative_profit >= 2.0:
             print_with_account(f"[AUTO CLOSE] Floating profit mencapai ${cumulative_profit:.2f} (>= $2.0). Menutup semua posisi...")
             log_to_csv("Auto Close", "Floating Profit >= 2.0", f"Profit: ${cumulative_profit:.2f}")
-            close_all_trades()
+            close_all_trades(snap)
             print_with_account("Lanjut ke iterasi berikutnya...")
-            time.sleep(2)
+            clock.sleep(2)
             continue
 
         # Cek floating minus (cumulative_profit < 0) dan profit harian sudah melebihi floating minus minimal $5
         if cumulative_profit < 0 and daily_closed_profit > abs(cumulative_profit) and abs(cumulative_profit) >= 5:
             print_with_account(f"Profit harian sudah melebihi floating minus minimal $5. Semua posisi akan ditutup.")
             log_to_csv("Close All", "By Daily Profit", f"Profit harian: ${daily_closed_profit:.2f}, Floating minus: ${cumulative_profit:.2f}")
-            close_all_trades()
+            close_all_trades(snap)
             print_with_account("Lanjut ke iterasi berikutnya...")
-            time.sleep(2)
+            clock.sleep(2)
             continue
-        print_with_account(f"Nomor Akun: {account_info.login}")
-        print_with_account(f"Nama Akun: {account_info.name}")
-        print_with_account(f"Margin Bebas: {account_info.margin_free}")
-        print_with_account("-" * 50)
+        if event.new_tick:
+            print_with_account(f"Nomor Akun: {account_info.login}")
+            print_with_account(f"Nama Akun: {account_info.name}")
+            print_with_account(f"Margin Bebas: {account_info.margin_free}")
+            print_with_account("-" * 50)
 
         # --- CEK MAX DRAWDOWN ---
         equity = account_info.equity
@@ -654,40 +715,42 @@ def trading_loop():
             drawdown_pct = ((balance - equity) / balance) * 100
         else:
             drawdown_pct = 0
-        print_with_account(f"Drawdown saat ini: {drawdown_pct:.2f}% dari saldo akun.")
-        log_to_csv("Drawdown", "Checked", f"Drawdown: {drawdown_pct:.2f}%")
+        if event.new_tick:
+            print_with_account(f"Drawdown saat ini: {drawdown_pct:.2f}% dari saldo akun.")
+            log_to_csv("Drawdown", "Checked", f"Drawdown: {drawdown_pct:.2f}%")
 
         if drawdown_pct >= args.max_dd:
             max_dd_hit_count += 1
             print_with_account(f"[PERINGATAN] Max drawdown tercapai ({drawdown_pct:.2f}% >= {args.max_dd}%). Menutup semua posisi... (Hit ke-{max_dd_hit_count}/3)")
             log_to_csv("Max Drawdown", f"Tercapai ke-{max_dd_hit_count}", f"Drawdown: {drawdown_pct:.2f}%")
-            close_all_trades()
+            close_all_trades(snap)
             print_with_account("Lanjut ke iterasi berikutnya...")
-            time.sleep(2)
+            clock.sleep(2)
             continue
 
         # Check cumulative profit
-        open_trades = get_open_trades()
-        cumulative_profit = sum(trade.profit for trade in open_trades)
-        print_with_account(f"Total profit saat ini: ${cumulative_profit:.2f}")
-        log_to_csv("Cumulative Profit", "Checked", f"Profit: ${cumulative_profit:.2f}")
+        if event.new_tick:
+            print_with_account(f"Total profit saat ini: ${cumulative_profit:.2f}")
+            log_to_csv("Cumulative Profit", "Checked", f"Profit: ${cumulative_profit:.2f}")
         if cumulative_profit >= close_profit:
             print_with_account(f"Target profit tercapai: ${cumulative_profit:.2f}. Menutup semua posisi...")
             log_to_csv("Profit Target", "Tercapai", f"Profit: ${cumulative_profit:.2f}")
-            close_all_trades()
+            close_all_trades(snap)
             print_with_account("Lanjut ke iterasi berikutnya...")
-            time.sleep(2)
+            clock.sleep(2)
             continue
 
         # Calculate daily profit as a percentage of the account balance
-        daily_profit += cumulative_profit
+        if event.new_tick:
+            daily_profit += cumulative_profit
         daily_profit_percentage = (daily_profit / account_info.balance) * 100
-        print_with_account(f"Profit harian saat ini: {daily_profit_percentage:.2f}% dari saldo akun.")
 
         # Check if daily profit target is reached
         floating_minus_pct = abs(cumulative_profit) / account_info.balance * 100 if cumulative_profit < 0 else 0
         effective_daily_profit = daily_profit_percentage - floating_minus_pct
-        print_with_account(f"Effective daily profit (setelah floating minus): {effective_daily_profit:.2f}% dari saldo akun.")
+        if event.new_tick:
+            print_with_account(f"Profit harian saat ini: {daily_profit_percentage:.2f}% dari saldo akun.")
+            print_with_account(f"Effective daily profit (setelah floating minus): {effective_daily_profit:.2f}% dari saldo akun.")
 
         # --- NEW: close jika equity sudah mencapai baseline + daily_target% ---
         try:
@@ -697,26 +760,26 @@ def trading_loop():
                 if current_equity >= target_equity:
                     print_with_account(f"[BASELINE TARGET] Equity mencapai target berdasarkan baseline: {current_equity:.2f} >= {target_equity:.2f}. Menutup semua posisi...")
                     log_to_csv("Baseline Target", "Tercapai", f"Equity: {current_equity:.2f}, Baseline: {baseline_equity:.2f}, Daily Target%: {args.daily_target}")
-                    close_all_trades()
+                    close_all_trades(snap)
                     # Simpan baseline baru agar tidak langsung trigger lagi di sesi yang sama (opsional)
                     save_baseline_equity(account_number, baseline_equity)  # keep same baseline or update as desired
                     # PAUSE sampai besok jam 04:00 WIB (sama seperti original flow)
-                    now_dt = datetime.now()
+                    now_dt = clock.now()
                     target_time = (now_dt + timedelta(days=1)).replace(hour=4, minute=0, second=0, microsecond=0)
                     if now_dt.hour < 4:
                         target_time = now_dt.replace(hour=4, minute=0, second=0, microsecond=0)
                     print_with_account(f"Trading akan dilanjutkan pada {target_time.strftime('%Y-%m-%d %H:%M')}.")
                     while True:
-                        now_dt = datetime.now()
+                        now_dt = clock.now()
                         if now_dt >= target_time:
                             print_with_account(f"Waktu tunggu selesai, trading dilanjutkan.")
                             break
                         sisa = (target_time - now_dt).total_seconds()
                         jam = int(sisa // 3600); menit = int((sisa % 3600) // 60)
                         print_with_account(f"Trading akan dilanjutkan pada {target_time.strftime('%Y-%m-%d %H:%M')}. Sisa waktu: {jam} jam {menit} menit.")
-                        time.sleep(300)  # cek setiap 5 menit
+                        clock.sleep(min(300, sisa))  # cek setiap 5 menit, bangun tepat di target
                     daily_profit = 0
-                    start_of_day = datetime.now().date()
+                    start_of_day = clock.now().date()
                     continue
         except Exception as e:
             print_with_account(f"[ERROR] Pengecekan baseline equity gagal: {e}")
@@ -725,28 +788,32 @@ def trading_loop():
         if effective_daily_profit >= args.daily_target:
             print_with_account(f"Target harian tercapai (setelah floating minus): {effective_daily_profit:.2f}%. Menutup semua posisi...")
             log_to_csv("Daily Target", "Tercapai", f"Profit efektif: {effective_daily_profit:.2f}")
-            close_all_trades()
+            close_all_trades(snap)
             # PAUSE sampai besok jam 04:00 WIB
-            now_dt = datetime.now()
+            now_dt = clock.now()
             target_time = (now_dt + timedelta(days=1)).replace(hour=4, minute=0, second=0, microsecond=0)
             if now_dt.hour < 4:
                 target_time = now_dt.replace(hour=4, minute=0, second=0, microsecond=0)
             print_with_account(f"Trading akan dilanjutkan pada {target_time.strftime('%Y-%m-%d %H:%M')}.")
             while True:
-                now_dt = datetime.now()
+                now_dt = clock.now()
                 if now_dt >= target_time:
                     print_with_account(f"Waktu tunggu selesai, trading dilanjutkan.")
                     break
                 sisa = (target_time - now_dt).total_seconds()
                 jam = int(sisa // 3600); menit = int((sisa % 3600) // 60)
                 print_with_account(f"Trading akan dilanjutkan pada {target_time.strftime('%Y-%m-%d %H:%M')}. Sisa waktu: {jam} jam {menit} menit.")
-                time.sleep(300)  # cek setiap 5 menit
+                clock.sleep(min(300, sisa))  # cek setiap 5 menit, bangun tepat di target
             daily_profit = 0
-            start_of_day = datetime.now().date()
+            start_of_day = clock.now().date()
+            continue
+
+        # Tick belum berubah: cukup risk check terjadwal di atas, pipeline keputusan dilewati
+        if not event.new_tick:
             continue
 
         # Get margin per lot
-        margin_per_lot = get_margin_per_lot(symbol)
+        margin_per_lot = get_margin_per_lot(symbol, snap.symbol_info)
         if margin_per_lot is not None:
             print_with_account(f"Margin per lot untuk {symbol}: {margin_per_lot}")
             print_with_account("-" * 50)
@@ -757,28 +824,25 @@ def trading_loop():
             print_with_account(f"[ERROR] Unable to calculate suggested lot size for {symbol}")
             print_with_account("-" * 50)
 
-        symbol_info = mt5.symbol_info(symbol)
+        symbol_info = snap.symbol_info
         if symbol_info is not None:
             margin_per_lot = symbol_info.margin_initial
             print_with_account(f"Margin per lot untuk {symbol}: {margin_per_lot}")
         else:
             print_with_account(f"Failed to fetch symbol info for {symbol}")
 
-        open_trades = get_open_trades()
-
         log_to_csv("Account Info", "Fetched", f"Account Number: {account_info.login}, Account Name: {account_info.name}, Free Margin: {account_info.margin_free}")
 
-        actual_spread = get_actual_spread(symbol)
+        actual_spread = get_actual_spread(symbol, snap.tick)
         if actual_spread is not None:
             log_to_csv("Spread", "Checked", f"Actual Spread: {actual_spread:.5f}")
 
-        cumulative_profit = sum(trade.profit for trade in open_trades)
         print_with_account(f"Total profit: ${cumulative_profit:.2f}")
         log_to_csv("Cumulative Profit", "Checked", f"Profit: ${cumulative_profit:.2f}")
         if cumulative_profit >= close_profit:
             print_with_account(f"Target profit tercapai: ${cumulative_profit:.2f}")
             log_to_csv("Profit Target", "Reached", f"Profit: ${cumulative_profit:.2f}")
-            close_all_trades()
+            close_all_trades(snap)
             continue
 
         print_with_account(f"Jumlah posisi terbuka: {len(open_trades)}")
@@ -786,29 +850,24 @@ def trading_loop():
         if len(open_trades) >= max_open_trades:
             print_with_account(f"Batas maksimal posisi terbuka tercapai: {len(open_trades)}")
             log_to_csv("Max Open Trades", "Reached", f"Count: {len(open_trades)}")
-            time.sleep(2)
+            clock.sleep(2)
             continue
 
         print_with_account("Mengambil data pasar multi-timeframe...")
-        rates_m5 = mt5.copy_rates_from_pos(symbol, mt5.TIMEFRAME_M1, 0, 120)
-        rates_m15 = mt5.copy_rates_from_pos(symbol, mt5.TIMEFRAME_M1, 0, 120)
-        rates_m30 = mt5.copy_rates_from_pos(symbol, mt5.TIMEFRAME_M1, 0, 120)
-        rates_h1 = mt5.copy_rates_from_pos(symbol, mt5.TIMEFRAME_M1, 0, 120)
-        if (rates_m5 is None or len(rates_m5) < 10 or
-            rates_m15 is None or len(rates_m15) < 100 or
-            rates_m30 is None or len(rates_m30) < 55 or
-            rates_h1 is None or len(rates_h1) < 55):
+        # Update incremental ring buffer M1 (hanya bar terbaru yang diambil dari terminal)
+        if not m1_bars.update() or len(m1_bars) < 100:
             print_with_account("Data pasar multi-timeframe tidak mencukupi")
             log_to_csv("Market Data", "Insufficient", "Multi-timeframe rates not enough")
-            time.sleep(2)
+            clock.sleep(2)
             continue
 
-        df_m5 = pd.DataFrame(rates_m5)
-        df_m15 = pd.DataFrame(rates_m15)
-        df_m30 = pd.DataFrame(rates_m30)
-        df_h1 = pd.DataFrame(rates_h1)
-
-        signal = analyze_entry_signal(df_m5, df_m15, df_m30, df_h1)
+        mtf_bars.update()
+        features = m1_features.update(m1_bars)
+        signal = analyze_entry_signal(
+            mtf_bars.columns("M5"), mtf_bars.columns("M15"),
+            mtf_bars.columns("M30"), mtf_bars.columns("H1"),
+            features=features,
+        )
         print_with_account(f"Sinyal analisa manual: {signal}")
 
         # Tentukan action dari sinyal manual
@@ -822,11 +881,22 @@ def trading_loop():
         # Jika tidak ada sinyal manual, gunakan PPO agent
         if action is None:
             print_with_account("Tidak ada sinyal manual, menggunakan PPO agent...")
-            close_prices = np.array([rate['close'] for rate in rates_m5], dtype=np.float32)
-            obs = close_prices[-4:].reshape(1, -1)
-            action, _ = ppo_agent.predict(obs)
-            print_with_account(f"Aksi agen PPO: {action}")
-            log_to_csv("PPO Action", "Predicted", f"Action: {action}")
+            if obs_spec is not None:
+                obs = obs_spec.live_observation(m1_features, features)
+            else:
+                close_prices = m1_bars.column("close")
+                obs_close = close_prices[-4:]
+                if obs_scaler is not None:
+                    obs_close = obs_scaler.transform_column("Close", obs_close)
+                obs = obs_close.astype(np.float32).reshape(1, -1)
+            if obs is None:
+                # Fitur belum lengkap (histori bar kurang / indikator masih NaN): tahan
+                print_with_account("Observasi PPO belum siap, aksi ditahan.")
+                action = 0
+            else:
+                action, _ = ppo_agent.predict(obs)
+                print_with_account(f"Aksi agen PPO: {action}")
+                log_to_csv("PPO Action", "Predicted", f"Action: {action}")
 
         # Reverse Trading jika argumen aktif
         if args.reverse:
@@ -842,29 +912,30 @@ def trading_loop():
                 print_with_account(f"[INFO] Batas {WINDOW_OPEN_LIMIT} transaksi pada jendela aktif tercapai. Menunggu ke PAUSE.")
             else:
                 # Cek jeda 1 detik antar open posisi (HFT)
-                if last_open_time == 0 or (time.time() - last_open_time) >= 1:
+                if last_open_time == 0 or (clock.monotonic() - last_open_time) >= 1:
                     if action == 2:
-                        place_trade(2)
+                        place_trade(2, snap)
                     elif action == 1:
-                        place_trade(1)
+                        place_trade(1, snap)
                     window_open_count += 1
-                    last_open_time = time.time()
+                    last_open_time = clock.monotonic()
                     # Update status file setiap kali open trade
-                    window_time_left = int(active_end_ts - time.time())
+                    window_time_left = int(active_end_ts - clock.monotonic())
                     update_window_status(window_open_count, WINDOW_OPEN_LIMIT, window_time_left, False)
                     print_with_account(f"[INFO] Transaksi dibuka pada jendela ini: {window_open_count}/{WINDOW_OPEN_LIMIT}")
                 else:
-                    sisa = 1 - (time.time() - last_open_time)
+                    sisa = 1 - (clock.monotonic() - last_open_time)
                     print_with_account(f"[INFO] Menunggu jeda {max(0,int(sisa))} detik sebelum open posisi berikutnya.")
         else:
             print_with_account("Aksi tahan terdeteksi, tidak ada trading yang dilakukan.")
             log_to_csv("PPO Action", "Hold", "No trade placed")
 
         # Update trading report setiap iterasi utama
-        update_trading_report()
+        # (setelah open trade snapshot sudah basi; place_trade sudah menulis report terbaru)
+        if not (action == 2 or action == 1):
+            update_trading_report(snap)
 
-        print_with_account("Menunggu singkat sebelum iterasi berikutnya...")
-        time.sleep(0.05)  # HFT: loop cepat
+        print_with_account("Menunggu tick berikutnya...")
 
 # Start trading loop
 try:
@@ -872,13 +943,16 @@ try:
 except KeyboardInterrupt:
     print("Loop trading dihentikan")
 finally:
+    transaction_logger.close()
+    daily_profit_tracker.close()
+    trading_reporter.close()
     print("Menutup MetaTrader 5...")
     mt5.shutdown()
 
 def trading_loop_with_timer():
     print_with_account("Memulai loop trading dengan timer siklikal (HFT mode)...")
     daily_profit = 0
-    start_of_day = datetime.now().date()
+    start_of_day = clock.now().date()
     max_dd_hit_count = 0  # Tambahkan penghitung max_dd tercapai
 
     global baseline_equity  # gunakan baseline juga di sini
@@ -886,26 +960,26 @@ def trading_loop_with_timer():
     while True:
         # === ON: Trading aktif selama window ON (HFT) ===
         print_with_account(f"=== MODE: TRADING AKTIF ({WINDOW_ON_SECONDS}s) ===")
-        on_start = time.time()
+        on_start = clock.monotonic()
         trade_executed = False  # Tambahkan flag untuk mendeteksi transaksi
-        while (time.time() - on_start) < WINDOW_ON_SECONDS:
+        while (clock.monotonic() - on_start) < WINDOW_ON_SECONDS:
             # Reset daily profit dan max_dd_hit_count di hari baru
-            if datetime.now().date() != start_of_day:
+            if clock.now().date() != start_of_day:
                 daily_profit = 0
-                start_of_day = datetime.now().date()
+                start_of_day = clock.now().date()
                 max_dd_hit_count = 0
                 print_with_account("-" * 50)
                 print_with_account(f"Memulai hari baru. Target harian dan max_dd_hit_count diatur ulang.")
                 print_with_account("-" * 50)
 
-            current_time = datetime.now()
+            current_time = clock.now()
             current_hour = current_time.hour
 
             if max_dd_hit_count >= 3:
                 print_with_account(f"[PERINGATAN] Max drawdown tercapai 3 kali hari ini untuk pair {symbol}. Semua posisi akan ditutup dan trading dihentikan sampai besok jam 04:00.")
                 close_all_trades()
                 log_to_csv("Max Drawdown", "Stop Trading", f"Pair: {symbol}, Trading dihentikan sampai besok jam 04:00")
-                now_dt = datetime.now()
+                now_dt = clock.now()
                 # Hitung waktu resume trading besok jam 4:00 WIB
                 if now_dt.hour < 4:
                     pause_resume_time = now_dt.replace(hour=4, minute=0, second=0, microsecond=0)
@@ -925,7 +999,7 @@ def trading_loop_with_timer():
                 minutes, seconds = divmod(remainder, 60)
                 print_with_account(f"Waktu saat ini: {current_time.strftime('%H:%M:%S')}. Di luar jam trading ({args.start_trading_hour}:00-{args.end_trading_hour}:00).")
                 print_with_account(f"Menunggu hingga trading dimulai dalam {hours} jam, {minutes} menit, dan {seconds} detik...")
-                time.sleep(2)
+                clock.sleep(2)
                 continue
 
             # Mengambil informasi akun dan trading
@@ -946,7 +1020,7 @@ def trading_loop_with_timer():
                 log_to_csv("Auto Close", "Floating Profit >= 0.5", f"Profit: ${cumulative_profit:.2f}")
                 close_all_trades()
                 print_with_account("Lanjut ke iterasi berikutnya...")
-                time.sleep(2)
+                clock.sleep(2)
                 continue
 
             # Cek floating minus (cumulative_profit < 0) dan profit harian sudah melebihi floating minus minimal $5
@@ -955,7 +1029,7 @@ def trading_loop_with_timer():
                 log_to_csv("Close All", "By Daily Profit", f"Profit harian: ${daily_closed_profit:.2f}, Floating minus: ${cumulative_profit:.2f}")
                 close_all_trades()
                 print_with_account("Lanjut ke iterasi berikutnya...")
-                time.sleep(2)
+                clock.sleep(2)
                 continue
             print_with_account(f"Nomor Akun: {account_info.login}")
             print_with_account(f"Nama Akun: {account_info.name}")
@@ -978,7 +1052,7 @@ def trading_loop_with_timer():
                 log_to_csv("Max Drawdown", f"Tercapai ke-{max_dd_hit_count}", f"Drawdown: {drawdown_pct:.2f}%")
                 close_all_trades()
                 print_with_account("Lanjut ke iterasi berikutnya...")
-                time.sleep(2)
+                clock.sleep(2)
                 continue
 
             # Check cumulative profit
@@ -991,7 +1065,7 @@ def trading_loop_with_timer():
                 log_to_csv("Profit Target", "Tercapai", f"Profit: ${cumulative_profit:.2f}")
                 close_all_trades()
                 print_with_account("Lanjut ke iterasi berikutnya...")
-                time.sleep(2)
+                clock.sleep(2)
                 continue
 
             # Calculate daily profit as a percentage of the account balance
@@ -1014,22 +1088,22 @@ def trading_loop_with_timer():
                         log_to_csv("Baseline Target", "Tercapai", f"Equity: {current_equity:.2f}, Baseline: {baseline_equity:.2f}, Daily Target%: {args.daily_target}")
                         close_all_trades()
                         save_baseline_equity(account_number, baseline_equity)
-                        now_dt = datetime.now()
+                        now_dt = clock.now()
                         target_time = (now_dt + timedelta(days=1)).replace(hour=4, minute=0, second=0, microsecond=0)
                         if now_dt.hour < 4:
                             target_time = now_dt.replace(hour=4, minute=0, second=0, microsecond=0)
                         print_with_account(f"Trading akan dilanjutkan pada {target_time.strftime('%Y-%m-%d %H:%M')}.")
                         while True:
-                            now_dt = datetime.now()
+                            now_dt = clock.now()
                             if now_dt >= target_time:
                                 print_with_account(f"Waktu tunggu selesai, trading dilanjutkan.")
                                 break
                             sisa = (target_time - now_dt).total_seconds()
                             jam = int(sisa // 3600); menit = int((sisa % 3600) // 60)
                             print_with_account(f"Trading akan dilanjutkan pada {target_time.strftime('%Y-%m-%d %H:%M')}. Sisa waktu: {jam} jam {menit} menit.")
-                            time.sleep(300)  # cek setiap 5 menit
+                            clock.sleep(min(300, sisa))  # cek setiap 5 menit, bangun tepat di target
                         daily_profit = 0
-                        start_of_day = datetime.now().date()
+                        start_of_day = clock.now().date()
                         continue
             except Exception as e:
                 print_with_account(f"[ERROR] Pengecekan baseline equity gagal (timer loop): {e}")
@@ -1040,37 +1114,37 @@ def trading_loop_with_timer():
                 log_to_csv("Daily Target", "Tercapai", f"Profit efektif: {effective_daily_profit:.2f}")
                 close_all_trades()
                 # PAUSE sampai besok jam 04:00 WIB
-                now_dt = datetime.now()
+                now_dt = clock.now()
                 target_time = (now_dt + timedelta(days=1)).replace(hour=4, minute=0, second=0, microsecond=0)
                 if now_dt.hour < 4:
                     target_time = now_dt.replace(hour=4, minute=0, second=0, microsecond=0)
                 print_with_account(f"Trading akan dilanjutkan pada {target_time.strftime('%Y-%m-%d %H:%M')}.")
                 while True:
-                    now_dt = datetime.now()
+                    now_dt = clock.now()
                     if now_dt >= target_time:
                         print_with_account(f"Waktu tunggu selesai, trading dilanjutkan.")
                         break
                     sisa = (target_time - now_dt).total_seconds()
                     jam = int(sisa // 3600); menit = int((sisa % 3600) // 60)
                     print_with_account(f"Trading akan dilanjutkan pada {target_time.strftime('%Y-%m-%d %H:%M')}. Sisa waktu: {jam} jam {menit} menit.")
-                    time.sleep(300)  # cek setiap 5 menit
+                    clock.sleep(min(300, sisa))  # cek setiap 5 menit, bangun tepat di target
                 daily_profit = 0
-                start_of_day = datetime.now().date()
+                start_of_day = clock.now().date()
                 continue
         # === END window ON ===
 
         # === MODIFIKASI: hanya masuk PAUSE jika ada transaksi ===
         if trade_executed:
             print_with_account(f"=== MODE: PAUSE ({WINDOW_PAUSE_SECONDS}s) ===")
-            pause_start = time.time()
-            while (time.time() - pause_start) < WINDOW_PAUSE_SECONDS:
+            pause_start = clock.monotonic()
+            while (clock.monotonic() - pause_start) < WINDOW_PAUSE_SECONDS:
                 open_trades = get_open_trades()
                 floating_profit = sum(trade.profit for trade in open_trades)
                 if floating_profit >= 1.5:
                     print_with_account(f"[AUTO CLOSE] Floating profit mencapai ${floating_profit:.2f} (>= $1.5) saat PAUSE. Menutup semua posisi...")
                     close_all_trades()
                 print_with_account("PAUSE: Tidak ada open trade baru. Menunggu...")
-                time.sleep(0.5)
+                clock.sleep(0.5)
             # Setelah PAUSE, loop kembali ke window ON berikutnya
         else:
             print_with_account("Tidak ada transaksi selama window ON. Mengulangi mode ON berikutnya tanpa masuk PAUSE.")
\ No newline at end of file
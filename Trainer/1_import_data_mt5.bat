@@ -1,3 +1,5 @@
 @echo off
-python 1_import_data_mt5.py
+set /p MT5_PATH=Masukkan path ke MetaTrader 5: 
+set /p SYMBOL=Masukkan simbol yang akan digunakan (contoh: XAUUSD.c): 
+python 1_import_data_mt5.py --mt5_path "%MT5_PATH%" --symbol "%SYMBOL%" %*
 pause
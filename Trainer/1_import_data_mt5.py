@@ -1,30 +1,63 @@
+"""
+Import data historis MetaTrader 5 ke store kolumnar data_{symbol}_mt5.cols secara incremental.
+
+Store yang sudah ada dipakai sebagai cache: timestamp terakhir dibaca dari
+manifest/ekor kolom Date (tanpa memuat seluruh data), hanya rentang yang belum
+ada yang diunduh (per halaman `--page_bars` bar untuk timeframe kecil seperti M1),
+hasilnya di-dedupe lalu ditambahkan ke store. Bar terakhir di store (mungkin
+masih terbentuk saat disimpan) ditimpa dengan versi terbaru.
+
+Store kolumnar (lihat column_store.py) dibaca langsung oleh preprocessing dan
+trainer; CSV hanya dibuat jika diminta dengan --export_csv. CSV lama
+data_{symbol}_mt5.csv otomatis dikonversi ke store pada run pertama.
+
+Contoh:
+    python 1_import_data_mt5.py --mt5_path "C:/Program Files/MetaTrader 5/terminal64.exe" --symbol XAUUSD.c
+    python 1_import_data_mt5.py --symbol XAUUSD.c --timeframe M1 --days 365 --no_images
+    python 1_import_data_mt5.py --symbol XAUUSD.c --export_csv data_XAUUSD.c_mt5.csv
+    # Offline dengan MT5 palsu yang menyajikan bar sintetis (test: tests/test_import_data_mt5.py):
+    python 1_import_data_mt5.py --symbol FAKE --timeframe M1 --fake_bars 100000 --no_images
+"""
+
+import argparse
 import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
 import pandas as pd
-import MetaTrader5 as mt5
-import mplfinance as mpf
-from datetime import datetime, timedelta
 
-def download_data(symbol, mt5_path, start=None, end=None):
-    """Mengunduh data historis dari MetaTrader 5 dan membersihkan data."""
-    # Inisialisasi koneksi ke MetaTrader 5
-    if not mt5.initialize(mt5_path):
-        raise RuntimeError(f"MetaTrader5 gagal diinisialisasi: {mt5.last_error()}")
+# column_store.py ada di root repo (dipakai bersama oleh preprocessing & trainer)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from column_store import ColumnStore, ColumnStoreWriter, import_csv, is_store, load_frame  # noqa: E402
+from candlestick_renderer import render_candlesticks  # noqa: E402
 
-    # Jika start dan end tidak diberikan, gunakan rentang 200 hari terakhir dan timeframe D1
-    if start is None or end is None:
-        end = datetime.now()
-        start = end - timedelta(days=200)  # 200 hari
+try:
+    import MetaTrader5 as mt5  # type: ignore
+except ImportError:  # mis. Linux: hanya mode --fake_bars yang bisa dipakai
+    mt5 = None
 
-    print(f"Mengunduh data untuk simbol {symbol} dari {start} hingga {end} pada timeframe D1...")
+# Nama timeframe -> (atribut konstanta MT5, durasi bar dalam detik)
+TIMEFRAMES = {
+    "M1": ("TIMEFRAME_M1", 60),
+    "M5": ("TIMEFRAME_M5", 300),
+    "M15": ("TIMEFRAME_M15", 900),
+    "M30": ("TIMEFRAME_M30", 1800),
+    "H1": ("TIMEFRAME_H1", 3600),
+    "D1": ("TIMEFRAME_D1", 86400),
+}
+# Urutan kolom di store (dan CSV ekspor)
+CSV_COLUMNS = ['Date', 'Close', 'High', 'Low', 'Open', 'Volume']
+DEFAULT_PAGE_BARS = 50_000
+# MT5 palsu (--fake_bars dan test): deret bar tetap sejak FAKE_EPOCH, ter-seed per blok
+FAKE_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+FAKE_SEED = 0
+_FAKE_BLOCK = 10_000
 
-    # Unduh data historis dari MT5 (ganti ke TIMEFRAME_D1)
-    rates = mt5.copy_rates_range(symbol, mt5.TIMEFRAME_D1, start, end)
-    if rates is None or len(rates) == 0:
-        print(f"[INFO] Data tidak ditemukan untuk simbol {symbol} pada timeframe D1 dan rentang {start} - {end}.")
-        print("Coba buka chart simbol tersebut di MT5, scroll ke kiri sejauh mungkin, lalu jalankan ulang script ini.")
-        print("Atau, coba ganti timeframe ke M15 atau kurangi rentang hari.")
-        raise ValueError(f"Tidak ada data untuk simbol {symbol}. Coba gunakan simbol lain atau cek data di MT5.")
 
+def rates_to_frame(rates):
+    """Konversi array rates MT5 ke DataFrame bersih (kolom CSV_COLUMNS)."""
     # Konversi data ke DataFrame
     data = pd.DataFrame(rates)
     data['time'] = pd.to_datetime(data['time'], unit='s')  # Konversi waktu ke format datetime
@@ -45,60 +78,227 @@ def download_data(symbol, mt5_path, start=None, end=None):
 
     # Hapus kembali jika ada NaN setelah konversi
     data = data.dropna().reset_index(drop=True)
+    return data[CSV_COLUMNS]
+
+
+def fetch_rates_paged(mt5_module, symbol, timeframe, start, end, page_seconds):
+    """
+    copy_rates_range per halaman [start, end] sehingga satu panggilan tidak pernah
+    meminta jutaan bar M1 sekaligus. Batas halaman inklusif di kedua sisi, jadi
+    bar di batas bisa muncul dua kali (di-dedupe oleh pemanggil).
+    """
+    pages = []
+    cur = start
+    while cur < end:
+        nxt = min(cur + timedelta(seconds=page_seconds), end)
+        rates = mt5_module.copy_rates_range(symbol, timeframe, cur, nxt)
+        if rates is not None and len(rates):
+            pages.append(rates)
+        cur = nxt
+    return pages
+
+
+def download_data(symbol, mt5_path, start=None, end=None, timeframe="D1",
+                  page_bars=DEFAULT_PAGE_BARS, mt5_module=None):
+    """
+    Mengunduh data historis dari MetaTrader 5 dan membersihkan data.
 
-    # Tutup koneksi ke MT5
-    mt5.shutdown()
+    Args:
+        symbol: simbol
+        mt5_path: path terminal MT5 (None = terminal default)
+        start, end: rentang waktu (UTC); default 200 hari terakhir
+        timeframe: nama timeframe (lihat TIMEFRAMES)
+        page_bars: jumlah bar maksimum per panggilan copy_rates_range
+        mt5_module: modul MetaTrader5 (atau fake_mt5.FakeMT5); default modul asli
+    """
+    mt5_module = mt5_module or mt5
+    if mt5_module is None:
+        raise RuntimeError("Modul MetaTrader5 tidak terpasang (gunakan --fake_bars untuk uji offline)")
+    tf_attr, tf_seconds = TIMEFRAMES[timeframe]
+
+    # Inisialisasi koneksi ke MetaTrader 5
+    ok = mt5_module.initialize(mt5_path) if mt5_path else mt5_module.initialize()
+    if not ok:
+        raise RuntimeError(f"MetaTrader5 gagal diinisialisasi: {mt5_module.last_error()}")
+
+    try:
+        # Jika start dan end tidak diberikan, gunakan rentang 200 hari terakhir
+        if end is None:
+            end = datetime.now(timezone.utc)
+        if start is None:
+            start = end - timedelta(days=200)  # 200 hari
 
+        print(f"Mengunduh data untuk simbol {symbol} dari {start} hingga {end} pada timeframe {timeframe}...")
+        pages = fetch_rates_paged(mt5_module, symbol, getattr(mt5_module, tf_attr), start, end,
+                                  page_seconds=page_bars * tf_seconds)
+    finally:
+        # Tutup koneksi ke MT5
+        mt5_module.shutdown()
+
+    if not pages:
+        return pd.DataFrame(columns=CSV_COLUMNS)
+    data = pd.concat([rates_to_frame(p) for p in pages], ignore_index=True)
+    # Halaman saling tumpang tindih di batas: simpan satu bar per timestamp (versi terbaru)
+    data = data.drop_duplicates(subset='Date', keep='last').sort_values('Date').reset_index(drop=True)
     return data
 
-def save_candlestick_images(data, output_dir='candlestick_images', window_sizes=[20, 50, 100], return_threshold=0.002):
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+def update_store(store_path, symbol, mt5_path=None, timeframe="D1", days=200,
+                 page_bars=DEFAULT_PAGE_BARS, full=False, mt5_module=None, now=_utcnow):
+    """
+    Sinkronkan store kolumnar dengan terminal: unduh hanya bar setelah timestamp
+    terakhir di store lalu tambahkan. Return jumlah baris baru (tanpa bar terakhir
+    yang hanya diperbarui).
+
+    `now` adalah sumber waktu UTC untuk akhir rentang (bisa diganti saat uji offline).
+    """
+    last_ts, length = None, 0
+    if not full and is_store(store_path):
+        store = ColumnStore(store_path)
+        length = len(store)
+        if length:
+            last_ts = pd.Timestamp(store.last('Date'))
+    end = now()
+    if last_ts is None:
+        start = end - timedelta(days=days)
+    else:
+        # Mulai dari bar terakhir di store (inklusif) agar versi finalnya ikut diambil
+        start = last_ts.to_pydatetime().replace(tzinfo=timezone.utc)
+    data = download_data(symbol, mt5_path, start=start, end=end, timeframe=timeframe,
+                         page_bars=page_bars, mt5_module=mt5_module)
+
+    if last_ts is None:
+        if data.empty:
+            print(f"[INFO] Data tidak ditemukan untuk simbol {symbol} pada timeframe {timeframe} dan rentang {start} - {end}.")
+            print("Coba buka chart simbol tersebut di MT5, scroll ke kiri sejauh mungkin, lalu jalankan ulang script ini.")
+            print("Atau, coba ganti timeframe ke M15 atau kurangi rentang hari.")
+            raise ValueError(f"Tidak ada data untuk simbol {symbol}. Coba gunakan simbol lain atau cek data di MT5.")
+        with ColumnStoreWriter(store_path) as writer:
+            writer.append(data)
+        return len(data)
+
+    data = data[data['Date'] >= last_ts]
+    if data.empty:
+        return 0
+    with ColumnStoreWriter(store_path, append=True) as writer:
+        if data['Date'].iloc[0] == last_ts:
+            # Bar terakhir di store diunduh ulang -> ganti dengan versi terbaru
+            writer.truncate(length - 1)
+        writer.append(data)
+    return int((data['Date'] > last_ts).sum())
+
+
+def save_candlestick_images(data, output_dir='candlestick_images', window_sizes=[20, 50, 100], return_threshold=0.002,
+                            workers=None, skip_existing=True, fmt='png'):
     """Menyimpan gambar candlestick dari dataset dengan klasifikasi bullish dan bearish.
     Label bullish jika return > threshold & harga di atas MA20,
     bearish jika return < -threshold & harga di bawah MA20.
+
+    Render paralel lewat candlestick_renderer (process pool + shared memory);
+    fmt='npz' menyimpan array RGB per rentang alih-alih file PNG.
+    Label semua window juga ditulis ke {output_dir}/labels.npy (load_label_index).
+    """
+    rendered, skipped = render_candlesticks(data, output_dir=output_dir, window_sizes=window_sizes,
+                                            return_threshold=return_threshold, workers=workers,
+                                            skip_existing=skip_existing, fmt=fmt)
+    print(f"Selesai: {rendered} gambar dirender, {skipped} sudah ada (dilewati) di folder '{output_dir}'")
+
+
+class _FakeClock:
+    """Jam UTC palsu: dipakai sebagai `now` update_store dan `time_fn` FakeMT5."""
+
+    def __init__(self, at):
+        self.at = at
+
+    def __call__(self):
+        return self.at
+
+    def timestamp(self):
+        return self.at.timestamp()
+
+    def advance(self, seconds):
+        self.at += timedelta(seconds=seconds)
+
+
+def _fake_rates(bars, timeframe):
+    """
+    `bars` bar sintetis sejak FAKE_EPOCH. Dibangkitkan per blok ber-seed tetap, jadi
+    N bar pertama selalu sama berapa pun `bars` (run berikutnya melanjutkan deret yang sama).
     """
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-    for window_size in window_sizes:
-        bullish_folder = os.path.join(output_dir, f"bullish_{window_size}")
-        bearish_folder = os.path.join(output_dir, f"bearish_{window_size}")
-        os.makedirs(bullish_folder, exist_ok=True)
-        os.makedirs(bearish_folder, exist_ok=True)
-        # Hitung MA20 untuk filter trend
-        data[f'MA20_{window_size}'] = data['Close'].rolling(window=window_size).mean()
-        for i in range(len(data) - window_size):
-            sample = data.iloc[i:i+window_size].set_index('Date')
-            open_first = sample['Open'].iloc[0]
-            close_last = sample['Close'].iloc[-1]
-            ma20_last = sample[f'MA20_{window_size}'].iloc[-1]
-            ret = (close_last / open_first) - 1
-            # Labeling dengan return dan filter trend MA
-            if ret > return_threshold and close_last > ma20_last:
-                label = "bullish"
-                save_folder = bullish_folder
-            elif ret < -return_threshold and close_last < ma20_last:
-                label = "bearish"
-                save_folder = bearish_folder
-            else:
-                continue  # Skip jika tidak jelas
-            filename = os.path.join(save_folder, f'candlestick_{window_size}_{i}.png')
-            mpf.plot(sample, type='candle', style='charles', savefig=filename)
-        print(f"Selesai menyimpan gambar window_size={window_size} di folder '{output_dir}'")
-
-# Input dari pengguna
-mt5_path = input("Masukkan path ke MetaTrader 5: ")
-symbol = input("Masukkan simbol yang akan digunakan (contoh: XAUUSD.c): ")
-
-# Contoh penggunaan
-data = download_data(symbol, mt5_path)
-save_candlestick_images(data)
-
-# Tambahkan nama simbol ke dalam nama file CSV
-csv_filename = f'data_{symbol}_mt5.csv'
-
-# Atur ulang kolom sesuai dengan format yang diinginkan
-data = data[['Date', 'Close', 'High', 'Low', 'Open', 'Volume']]
-
-# Simpan data ke file CSV tanpa menyimpan index agar tidak muncul kolom 'Unnamed: 0'
-data.to_csv(csv_filename, index=False)
-print(f"Data telah disimpan sebagai {csv_filename}")
+    import fake_mt5
+
+    tf_seconds = TIMEFRAMES[timeframe][1]
+    epoch = int(FAKE_EPOCH.timestamp())
+    blocks, price = [], 2000.0
+    for b in range(0, bars, _FAKE_BLOCK):
+        block = fake_mt5.synthetic_rates(epoch + b * tf_seconds, _FAKE_BLOCK, bar_seconds=tf_seconds,
+                                         start_price=price, seed=FAKE_SEED + b // _FAKE_BLOCK)
+        price = float(block['close'][-1])
+        blocks.append(block)
+    return np.concatenate(blocks)[:bars]
+
+
+def _fake_mt5_module(bars, timeframe, clock=None):
+    """
+    FakeMT5 dengan `bars` bar `timeframe` dari _fake_rates; hanya bar dengan waktu <= jam
+    yang terlihat. Tanpa `clock`, jam diletakkan di tengah bar terakhir (masih terbentuk).
+
+    Return: (modul fake, clock) -- clock dipakai sebagai `now` update_store.
+    """
+    import fake_mt5
+
+    if clock is None:
+        clock = _FakeClock(FAKE_EPOCH + timedelta(seconds=(bars - 0.5) * TIMEFRAMES[timeframe][1]))
+    return fake_mt5.FakeMT5(rates=_fake_rates(bars, timeframe), time_fn=clock.timestamp), clock
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import data historis MT5 (incremental) ke store kolumnar data_{symbol}_mt5.cols")
+    parser.add_argument("--mt5_path", type=str, default=None, help="Path ke terminal MetaTrader 5")
+    parser.add_argument("--symbol", type=str, required=True, help="Simbol yang akan digunakan (contoh: XAUUSD.c)")
+    parser.add_argument("--timeframe", type=str, default="D1", choices=list(TIMEFRAMES),
+                        help="Timeframe bar (default D1)")
+    parser.add_argument("--days", type=int, default=200,
+                        help="Rentang hari untuk unduhan awal jika store belum ada (default 200)")
+    parser.add_argument("--store", type=str, default=None, help="Direktori store kolumnar (default data_{symbol}_mt5.cols)")
+    parser.add_argument("--export_csv", type=str, default=None, help="Ekspor juga seluruh store ke file CSV ini")
+    parser.add_argument("--page_bars", type=int, default=DEFAULT_PAGE_BARS,
+                        help=f"Jumlah bar maksimum per permintaan copy_rates_range (default {DEFAULT_PAGE_BARS})")
+    parser.add_argument("--full", action="store_true", help="Abaikan store yang ada dan unduh ulang seluruh rentang")
+    parser.add_argument("--no_images", action="store_true", help="Lewati pembuatan gambar candlestick")
+    parser.add_argument("--image_workers", type=int, default=None,
+                        help="Jumlah proses render gambar candlestick (default: jumlah CPU)")
+    parser.add_argument("--image_format", type=str, default="png", choices=["png", "npz"],
+                        help="png = file per gambar, npz = shard array RGB (default png)")
+    parser.add_argument("--rerender", action="store_true", help="Render ulang gambar yang sudah ada")
+    parser.add_argument("--fake_bars", type=int, default=0,
+                        help="Uji offline: MT5 palsu dengan N bar sintetis sejak FAKE_EPOCH (tanpa terminal); "
+                             "N lebih besar di run berikutnya melanjutkan deret yang sama")
+    args = parser.parse_args()
+
+    # Tambahkan nama simbol ke dalam nama store
+    store_path = args.store or f'data_{args.symbol}_mt5.cols'
+    legacy_csv = f'data_{args.symbol}_mt5.csv'
+    if not args.full and not is_store(store_path) and os.path.isfile(legacy_csv):
+        print(f"Mengonversi {legacy_csv} ke store kolumnar {store_path}...")
+        import_csv(legacy_csv, store_path)
+    mt5_module, now = None, _utcnow
+    if args.fake_bars > 0:
+        mt5_module, now = _fake_mt5_module(args.fake_bars, args.timeframe)
+
+    added = update_store(store_path, args.symbol, mt5_path=args.mt5_path, timeframe=args.timeframe,
+                         days=args.days, page_bars=args.page_bars, full=args.full, mt5_module=mt5_module, now=now)
+    print(f"{added} bar baru disimpan ke {store_path}")
+
+    if args.export_csv:
+        # CSV hanya format ekspor; simpan tanpa index agar tidak muncul kolom 'Unnamed: 0'
+        ColumnStore(store_path).export_csv(args.export_csv)
+        print(f"Data telah diekspor sebagai {args.export_csv}")
 
+    if not args.no_images:
+        save_candlestick_images(load_frame(store_path), workers=args.image_workers,
+                                skip_existing=not args.rerender, fmt=args.image_format)
@@ -1,57 +1,42 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
-import ta  # Library untuk indikator teknikal
 from sklearn.preprocessing import MinMaxScaler, StandardScaler
 
-def preprocess_data(data, timesteps):
-    """Melakukan preprocessing data dengan menambahkan indikator teknikal dan normalisasi."""
-    
-    # Pastikan 'Date' menjadi index jika tersedia
-    if 'Date' in data.columns:
-        data.set_index('Date', inplace=True)
-    
-    # Konversi index ke datetime jika belum
-    data.index = pd.to_datetime(data.index)
-    
-    # Moving Averages untuk HFT rule: MA_fast (3) dan MA_slow (15)
-    data['MA_3'] = data['Close'].rolling(window=3).mean()
-    data['MA_15'] = data['Close'].rolling(window=15).mean()
-
-    # Stochastic Oscillator (%K, %D). Thresholds: <20 oversold, >80 overbought
-    stoch = ta.momentum.StochasticOscillator(high=data['High'], low=data['Low'], close=data['Close'], window=14, smooth_window=3)
-    data['stoch_k'] = stoch.stoch()
-    data['stoch_d'] = stoch.stoch_signal()
-
-    # RSI 14
-    data['RSI_14'] = ta.momentum.RSIIndicator(close=data['Close'], window=14).rsi()
-
-    # ATR 14
-    data['ATR_14'] = ta.volatility.AverageTrueRange(high=data['High'], low=data['Low'], close=data['Close'], window=14).average_true_range()
-
-    # Support / Resistance detection (simple): rolling extrema + touch-count strength
-    sr_window = 50  # window untuk level SR
-    touch_thresh = 0.002  # 0.2% threshold untuk "touch" level
-    data['SR_min'] = data['Close'].rolling(window=sr_window).min()
-    data['SR_max'] = data['Close'].rolling(window=sr_window).max()
-    # distance to SR levels
-    data['dist_to_support'] = (data['Close'] - data['SR_min']).abs() / data['SR_min']
-    data['dist_to_resistance'] = (data['Close'] - data['SR_max']).abs() / data['SR_max']
-    # hitungan "touch" dalam lookback window (200 bars) untuk menilai kekuatan
-    lookback = 200
-    def count_touches(series_close, level_series):
-        touches = []
-        for i in range(len(series_close)):
-            start = max(0, i - lookback + 1)
-            lvl = level_series.iloc[i]
-            if np.isnan(lvl):
-                touches.append(0)
-                continue
-            window_close = series_close.iloc[start:i+1]
-            cnt = (np.abs(window_close - lvl) / lvl <= touch_thresh).sum()
-            touches.append(int(cnt))
-        return pd.Series(touches, index=series_close.index)
-    data['support_touches'] = count_touches(data['Close'], data['SR_min'])
-    data['resistance_touches'] = count_touches(data['Close'], data['SR_max'])
+# feature_engine.py ada di root repo (dipakai bersama dengan live bot)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from feature_engine import ChunkedFeatures  # noqa: E402
+from column_store import ColumnStore, ColumnStoreWriter, is_store, iter_frames, load_frame  # noqa: E402
+from feature_scaler import ScalerArtifact, scaler_path_for  # noqa: E402
+
+# Kolom yang di-scale dengan StandardScaler (Volume memakai MinMaxScaler)
+PRICE_COLS = ['Open', 'High', 'Low', 'Close', 'MA_3', 'MA_15', 'stoch_k', 'stoch_d', 'RSI_14', 'ATR_14', 'log_return']
+REQUIRED_COLS = ['MA_15', 'stoch_k', 'stoch_d', 'RSI_14', 'ATR_14', 'log_return', 'SR_min', 'SR_max']
+# Jumlah bar terakhir yang dipakai untuk menebak durasi bar (lihat last_bar_forming)
+_PERIOD_SAMPLE = 10
+
+
+def add_indicators(data, feats, prev_ma=None):
+    """
+    Tambahkan indikator & label ke `data` (in place) dari hasil feature_engine.
+
+    Args:
+        data: DataFrame OHLC(V) dengan index datetime
+        feats: dict hasil compute_features / ChunkedFeatures.update (+ kolom touch)
+        prev_ma: (MA_3, MA_15) baris terakhir chunk sebelumnya, untuk ma_cross di batas chunk
+    """
+    # Indikator dari feature_engine (NumPy vectorized, sama dengan versi streaming di live bot):
+    # MA_3/MA_15 (HFT rule), Stochastic %K/%D (<20 oversold, >80 overbought), RSI 14, ATR 14,
+    # Support / Resistance (rolling extrema 50 bar) + jarak ke level SR
+    for col in ['MA_3', 'MA_15', 'stoch_k', 'stoch_d', 'RSI_14', 'ATR_14',
+                'SR_min', 'SR_max', 'dist_to_support', 'dist_to_resistance']:
+        data[col] = feats[col]
+
+    # Support / Resistance: touch-count strength
+    # hitungan "touch" (0.2% dari level) dalam lookback window 200 bar untuk menilai kekuatan
+    data['support_touches'] = feats['support_touches']
+    data['resistance_touches'] = feats['resistance_touches']
     # flags: strong support/resistance if touches >= 3 within lookback
     data['strong_support'] = data['support_touches'] >= 3
     data['strong_resistance'] = data['resistance_touches'] >= 3
@@ -61,8 +46,11 @@ def preprocess_data(data, timesteps):
     # MA crossover signal: 1=BUY when MA_3 crosses above MA_15, -1=SELL when opposite
     data['ma_cross'] = 0
     ma3 = data['MA_3']; ma15 = data['MA_15']
-    cross_up = (ma3 > ma15) & (ma3.shift(1) <= ma15.shift(1))
-    cross_down = (ma3 < ma15) & (ma3.shift(1) >= ma15.shift(1))
+    ma3_prev = ma3.shift(1); ma15_prev = ma15.shift(1)
+    if prev_ma is not None and len(data):
+        ma3_prev.iloc[0], ma15_prev.iloc[0] = prev_ma
+    cross_up = (ma3 > ma15) & (ma3_prev <= ma15_prev)
+    cross_down = (ma3 < ma15) & (ma3_prev >= ma15_prev)
     data.loc[cross_up, 'ma_cross'] = 1
     data.loc[cross_down, 'ma_cross'] = -1
     # RSI zone label: oversold/overbought/sideway/neutral
@@ -70,62 +58,352 @@ def preprocess_data(data, timesteps):
     data.loc[data['RSI_14'] < 30, 'rsi_zone'] = 'oversold'
     data.loc[data['RSI_14'] > 70, 'rsi_zone'] = 'overbought'
     data.loc[(data['RSI_14'] >= 40) & (data['RSI_14'] <= 60), 'rsi_zone'] = 'sideway'
-    
+
     # Momentum (log return)
-    data['log_return'] = np.log(data['Close'] / data['Close'].shift(1))
-    
-    # Hapus baris yang memiliki NaN setelah perhitungan indikator
-    required_cols = ['MA_15', 'stoch_k', 'stoch_d', 'RSI_14', 'ATR_14', 'log_return', 'SR_min', 'SR_max']
-    data.dropna(subset=required_cols, inplace=True)
-    
+    data['log_return'] = feats['log_return']
+
+
+def _set_date_index(data):
+    # Pastikan 'Date' menjadi index jika tersedia
+    if 'Date' in data.columns:
+        data.set_index('Date', inplace=True)
+    # Konversi index ke datetime jika belum
+    data.index = pd.to_datetime(data.index)
+
+
+def _raise_empty(data):
+    print(f"Jumlah data setelah dropna: {len(data)}")
+    print("Beberapa baris awal data:")
+    print(data.head(10))
+    raise ValueError(
+        "Data kosong setelah dropna pada indikator yang baru (MA_15, RSI_14, Stochastic, ATR, SR). "
+        "Cek apakah data Anda cukup panjang dan tidak ada missing value di kolom Close/High/Low.\n"
+        "Minimal panjang data sebaiknya >= 200 bar untuk deteksi support/resistance dan rolling yang digunakan."
+    )
+
+
+class IndicatorStream:
+    """
+    Indikator per chunk dengan state rolling yang dibawa antar chunk (ChunkedFeatures:
+    200 bar lookback touch, SR 50, MA 15, EMA RSI/ATR) dan bisa disimpan ke artifact
+    scaler untuk melanjutkan di run berikutnya.
+
+    Args:
+        state: hasil `state()` dari run sebelumnya (None = mulai dari awal histori)
+    """
+
+    def __init__(self, state=None):
+        self.engine = ChunkedFeatures() if state is None else ChunkedFeatures.from_state(state['features'])
+        self.prev_ma = None if state is None or state.get('prev_ma') is None else tuple(state['prev_ma'])
+        self.last_date = None if state is None else state.get('last_date')
+
+    def process(self, chunk):
+        """Indikator untuk satu chunk mentah (in place), lalu dropna. Return chunk."""
+        _set_date_index(chunk)
+        if chunk.empty:
+            return chunk
+        feats = self.engine.update(chunk['Open'].values, chunk['High'].values,
+                                   chunk['Low'].values, chunk['Close'].values)
+        add_indicators(chunk, feats, prev_ma=self.prev_ma)
+        self.prev_ma = (float(chunk['MA_3'].iloc[-1]), float(chunk['MA_15'].iloc[-1]))
+        self.last_date = str(chunk.index[-1])
+        # Hapus baris yang memiliki NaN setelah perhitungan indikator
+        chunk.dropna(subset=REQUIRED_COLS, inplace=True)
+        return chunk
+
+    def state(self):
+        return {'features': self.engine.state(), 'prev_ma': self.prev_ma, 'last_date': self.last_date}
+
+
+def fit_scalers(data):
+    """Fit StandardScaler (harga & indikator) dan MinMaxScaler (Volume) -> ScalerArtifact."""
+    scaler_price = StandardScaler().fit(data[PRICE_COLS])
+    scaler_vol = MinMaxScaler().fit(data[['Volume']]) if 'Volume' in data.columns else None
+    return ScalerArtifact.from_sklearn(scaler_price, PRICE_COLS, scaler_vol)
+
+
+def apply_scalers(data, artifact):
+    """Transform (tanpa fit) dengan parameter dari artifact, in place."""
+    data[PRICE_COLS] = artifact.transform_prices(data[PRICE_COLS].values)
+    if artifact.has_volume and 'Volume' in data.columns:
+        data['Volume'] = artifact.transform_volume(data['Volume'].values)
+
+
+def attach_target(chunk, pending):
+    """
+    target = log_return bar berikutnya. Baris terakhir belum punya target, jadi
+    ditahan (pending) sampai chunk/run berikutnya. Return (baris siap tulis, pending).
+    """
+    if pending is not None:
+        chunk = pd.concat([pending, chunk])
+    chunk['target'] = chunk['log_return'].shift(-1)
+    return chunk.iloc[:-1], chunk.iloc[-1:].drop(columns=['target'])
+
+
+def _pending_to_state(pending):
+    if pending is None or pending.empty:
+        return None
+    row = pending.iloc[0]
+    return {
+        'index': str(pending.index[0]),
+        'columns': list(pending.columns),
+        'values': [v.item() if hasattr(v, 'item') else v for v in row.tolist()],
+    }
+
+
+def _pending_from_state(state):
+    if not state:
+        return None
+    index = pd.DatetimeIndex([pd.Timestamp(state['index'])], name='Date')
+    return pd.DataFrame([state['values']], columns=state['columns'], index=index)
+
+
+def save_artifact(artifact, path, stream, pending):
+    """Simpan scaler + state incremental (indikator rolling & baris pending) ke `path`."""
+    artifact.stream_state = {**stream.state(), 'pending': _pending_to_state(pending)}
+    artifact.save(path)
+
+
+def preprocess_data(data, timesteps, artifact=None, stream=None):
+    """
+    Melakukan preprocessing data dengan menambahkan indikator teknikal dan normalisasi.
+
+    Args:
+        data: DataFrame mentah (kolom Date, Open, High, Low, Close, Volume)
+        timesteps: jumlah minimum baris valid
+        artifact: ScalerArtifact tersimpan (transform only); None = fit scaler baru
+        stream: IndicatorStream yang dipakai (agar state-nya bisa disimpan)
+
+    Return: (data, artifact)
+    """
+    stream = stream or IndicatorStream()
+    data = stream.process(data)
+
     # Tambahkan pengecekan data kosong sebelum normalisasi
     if data.empty:
-        print(f"Jumlah data setelah dropna: {len(data)}")
-        print("Beberapa baris awal data:")
-        print(data.head(10))
-        raise ValueError(
-            "Data kosong setelah dropna pada indikator yang baru (MA_15, RSI_14, Stochastic, ATR, SR). "
-            "Cek apakah data Anda cukup panjang dan tidak ada missing value di kolom Close/High/Low.\n"
-            "Minimal panjang data sebaiknya >= 200 bar untuk deteksi support/resistance dan rolling yang digunakan."
-        )
-    
+        _raise_empty(data)
+
     # Scaling harga dan indikator dengan StandardScaler, Volume tetap MinMaxScaler
-    price_cols = ['Open', 'High', 'Low', 'Close', 'MA_3', 'MA_15', 'stoch_k', 'stoch_d', 'RSI_14', 'ATR_14', 'log_return']
-    scaler_price = StandardScaler()
-    data[price_cols] = scaler_price.fit_transform(data[price_cols])
-    if 'Volume' in data.columns:
-        scaler_vol = MinMaxScaler()
-        data[['Volume']] = scaler_vol.fit_transform(data[['Volume']])
-    
+    if artifact is None:
+        artifact = fit_scalers(data)
+    apply_scalers(data, artifact)
+
     # Validasi jumlah data setelah preprocessing
     if len(data) < timesteps:
         raise ValueError("Jumlah data valid setelah preprocessing tidak cukup untuk timesteps yang ditentukan.")
-    
-    return data
-
-# Allow user to specify symbol and data file at runtime
-symbol = input("Masukkan simbol (default: BTCUSDm): ") or 'BTCUSDm'
-data_file = input(f"Masukkan nama file data untuk {symbol} (default: data_{symbol}_mt5.csv): ") or f"data_{symbol}_mt5.csv"
-
-# Load data
-data = pd.read_csv(data_file, parse_dates=['Date'])
-print("Data sebelum preprocessing:")
-print(data.head())
-
-# Proses data
-timesteps = 20  # Contoh nilai timesteps
-processed_data = preprocess_data(data, timesteps)
-
-# Ubah label target menjadi log return (arah harga)
-processed_data['target'] = processed_data['log_return'].shift(-1)
-processed_data.dropna(subset=['target'], inplace=True)
-
-# Tampilkan hasil preprocessing
-print("\nData setelah preprocessing:")
-print(processed_data.head())
-
-# Simpan hasil preprocessing dengan nama file yang mencantumkan simbol
-processed_filename = f'processed_data_{symbol}.csv'
-# Simpan data hasil preprocessing tanpa menyimpan index agar tidak muncul kolom 'Unnamed: 0'
-processed_data.to_csv(processed_filename, index=False)
-print(f"Data setelah preprocessing telah disimpan sebagai {processed_filename}")
+
+    return data, artifact
+
+
+def _utcnow():
+    # Kolom Date dari 1_import_data_mt5.py adalah waktu UTC tanpa zona
+    return pd.Timestamp.now(tz='UTC').tz_localize(None)
+
+
+def last_bar_forming(dates, now=None):
+    """
+    True jika bar terakhir di `dates` (urut naik) belum selesai pada `now` (UTC).
+    Durasi bar = selisih terkecil antar beberapa bar terakhir (gap akhir pekan/sesi
+    hanya memperbesar selisih). Jika durasi tidak bisa ditebak, bar dianggap masih terbentuk.
+    """
+    dates = pd.DatetimeIndex(np.asarray(dates)[-_PERIOD_SAMPLE:])
+    diffs = dates[1:] - dates[:-1]
+    diffs = diffs[diffs > pd.Timedelta(0)]
+    if len(diffs) == 0:
+        return True
+    now = _utcnow() if now is None else pd.Timestamp(now)
+    return dates[-1] + diffs.min() > now
+
+
+def drop_forming_bar(data, now=None, prior_dates=None):
+    """
+    Buang bar terakhir data mentah jika periodenya belum selesai pada `now`. Bar itu
+    masih terbentuk saat diunduh dan ditimpa versi finalnya oleh 1_import_data_mt5.py
+    (update_store), jadi baru diproses di run berikutnya. Dengan begitu state rolling
+    yang disimpan tidak pernah memuat nilai bar yang kemudian berubah. Histori yang
+    sudah final (mis. CSV lama) diproses utuh.
+
+    Args:
+        data: DataFrame mentah dengan kolom Date
+        now: waktu UTC pembanding (default: sekarang)
+        prior_dates: Date bar sebelum `data` (chunk sebelumnya), untuk menebak durasi bar
+    """
+    dates = data['Date'].values
+    if prior_dates is not None:
+        dates = np.concatenate([prior_dates, dates])
+    if len(data) and last_bar_forming(dates, now):
+        return data.iloc[:-1].copy()
+    return data.copy()
+
+
+def iter_final_frames(data_path, chunksize, start=0, now=None):
+    """Seperti column_store.iter_frames, tapi tanpa bar terakhir yang masih terbentuk (lihat drop_forming_bar)."""
+    previous = None
+    prior_dates = None
+    for chunk in iter_frames(data_path, chunksize, start=start):
+        if chunk.empty:
+            continue
+        if previous is not None:
+            # Diambil sebelum yield: pemanggil bisa menjadikan Date index (in place)
+            prior_dates = previous['Date'].values[-_PERIOD_SAMPLE:]
+            yield previous
+        previous = chunk
+    if previous is not None:
+        final = drop_forming_bar(previous, now, prior_dates)
+        if not final.empty:
+            yield final
+
+
+def iter_indicator_chunks(data_path, chunksize, stream, now=None):
+    """Baca store/CSV per chunk lewat `stream`; yield chunk yang sudah di-dropna (belum di-scale)."""
+    for chunk in iter_final_frames(data_path, chunksize, now=now):
+        chunk = stream.process(chunk)
+        if not chunk.empty:
+            yield chunk
+
+
+def preprocess_streaming(data_path, out_store, timesteps, chunksize=200_000, artifact_path=None, now=None):
+    """
+    Versi streaming dari preprocess_data + pembuatan target untuk histori multi-tahun.
+    Memori sebanding dengan `chunksize`, bukan panjang histori.
+
+    Pass 1 menghitung statistik scaler (partial_fit), pass 2 menghitung ulang
+    indikator, melakukan transform dan menulis output per chunk ke store kolumnar
+    `out_store`. Artifact scaler + state incremental disimpan ke `artifact_path`
+    (default di samping out_store). `now` (UTC) menentukan apakah bar terakhir masih
+    terbentuk (lihat drop_forming_bar).
+
+    Return: jumlah baris yang ditulis.
+    """
+    scaler_price = StandardScaler()
+    scaler_vol = MinMaxScaler()
+    has_volume = False
+    total = 0
+    for chunk in iter_indicator_chunks(data_path, chunksize, IndicatorStream(), now):
+        scaler_price.partial_fit(chunk[PRICE_COLS])
+        if 'Volume' in chunk.columns:
+            has_volume = True
+            scaler_vol.partial_fit(chunk[['Volume']])
+        total += len(chunk)
+    if total == 0:
+        _raise_empty(pd.DataFrame())
+    if total < timesteps:
+        raise ValueError("Jumlah data valid setelah preprocessing tidak cukup untuk timesteps yang ditentukan.")
+    artifact = ScalerArtifact.from_sklearn(scaler_price, PRICE_COLS, scaler_vol if has_volume else None)
+
+    stream = IndicatorStream()
+    pending = None
+    with ColumnStoreWriter(out_store) as writer:
+        for chunk in iter_indicator_chunks(data_path, chunksize, stream, now):
+            apply_scalers(chunk, artifact)
+            out, pending = attach_target(chunk, pending)
+            writer.append(out.reset_index())
+        written = writer.length
+    save_artifact(artifact, artifact_path or scaler_path_for(out_store), stream, pending)
+    return written
+
+
+def preprocess_incremental(data_path, out_store, chunksize=200_000, artifact_path=None, now=None):
+    """
+    Mode "transform only": proses hanya bar di `data_path` yang lebih baru dari run
+    terakhir, memakai scaler dan state rolling dari artifact (tanpa fit ulang), lalu
+    tambahkan ke store `out_store`. Histori lama tidak diproses ulang.
+
+    Semua mode menahan bar terakhir data mentah selama periodenya belum selesai pada
+    `now` (drop_forming_bar), sehingga bar yang ditimpa update_store sejak run
+    sebelumnya belum pernah masuk state maupun output.
+
+    Return: jumlah baris yang ditambahkan.
+    """
+    artifact_path = artifact_path or scaler_path_for(out_store)
+    artifact = ScalerArtifact.load(artifact_path)
+    state = artifact.stream_state
+    if not state or state.get('last_date') is None:
+        raise ValueError(f"Artifact {artifact_path} tidak punya state incremental. Jalankan preprocessing penuh dulu.")
+    stream = IndicatorStream(state)
+    pending = _pending_from_state(state.get('pending'))
+    last_date = pd.Timestamp(state['last_date'])
+
+    # Store kolumnar: lompat langsung ke bar setelah last_date (binary search kolom Date)
+    start = 0
+    if is_store(data_path):
+        dates = ColumnStore(data_path).column('Date')
+        start = int(np.searchsorted(dates, last_date.to_datetime64(), side='right'))
+        # Sertakan beberapa bar lama (dibuang filter di bawah) untuk menebak durasi bar
+        start = max(0, start - _PERIOD_SAMPLE)
+
+    with ColumnStoreWriter(out_store, append=True) as writer:
+        before = writer.length
+        for chunk in iter_final_frames(data_path, chunksize, start=start, now=now):
+            _set_date_index(chunk)
+            chunk = chunk[chunk.index > last_date].copy()
+            if chunk.empty:
+                continue
+            chunk = stream.process(chunk)
+            if chunk.empty:
+                continue
+            apply_scalers(chunk, artifact)
+            out, pending = attach_target(chunk, pending)
+            writer.append(out.reset_index())
+        written = writer.length - before
+    save_artifact(artifact, artifact_path, stream, pending)
+    return written
+
+
+if __name__ == "__main__":
+    # Allow user to specify symbol and data file at runtime
+    symbol = input("Masukkan simbol (default: BTCUSDm): ") or 'BTCUSDm'
+    # Default: store kolumnar dari 1_import_data_mt5.py; CSV lama tetap bisa dibaca
+    default_data = f"data_{symbol}_mt5.cols"
+    if not is_store(default_data):
+        default_data = f"data_{symbol}_mt5.csv"
+    data_file = input(f"Masukkan store/file data untuk {symbol} (default: {default_data}): ") or default_data
+    # 1 = muat seluruh data; 2 = streaming per chunk (histori multi-tahun);
+    # 3 = incremental, hanya bar baru dengan scaler tersimpan (tanpa fit ulang)
+    mode = input("Mode [1] penuh, [2] streaming per chunk, [3] incremental/transform only (default: 1): ").strip() or '1'
+    chunksize = 200_000
+    if mode in ('2', '3'):
+        chunk_input = input(f"Ukuran chunk (baris) (default: {chunksize}): ").strip()
+        chunksize = int(chunk_input) if chunk_input else chunksize
+    export_csv = input("Ekspor juga hasil ke CSV? (y/N): ").strip().lower() == 'y'
+
+    timesteps = 20  # Contoh nilai timesteps
+    # Simpan hasil preprocessing dengan nama store yang mencantumkan simbol
+    processed_store = f'processed_data_{symbol}.cols'
+    artifact_file = scaler_path_for(processed_store)
+
+    if mode == '3':
+        rows = preprocess_incremental(data_file, processed_store, chunksize=chunksize)
+        print(f"{rows} baris baru ditambahkan ke {processed_store} (scaler dari {artifact_file})")
+    elif mode == '2':
+        rows = preprocess_streaming(data_file, processed_store, timesteps, chunksize=chunksize)
+        print(f"{rows} baris hasil preprocessing (streaming, chunk {chunksize}) telah disimpan sebagai {processed_store}")
+        print(f"Scaler disimpan sebagai {artifact_file}")
+    else:
+        # Load data (tanpa bar terakhir yang mungkin masih terbentuk)
+        data = drop_forming_bar(load_frame(data_file))
+        print("Data sebelum preprocessing:")
+        print(data.head())
+
+        # Proses data
+        stream = IndicatorStream()
+        processed_data, artifact = preprocess_data(data, timesteps, stream=stream)
+
+        # Ubah label target menjadi log return (arah harga)
+        processed_data, pending = attach_target(processed_data, None)
+
+        # Tampilkan hasil preprocessing
+        print("\nData setelah preprocessing:")
+        print(processed_data.head())
+
+        with ColumnStoreWriter(processed_store) as writer:
+            writer.append(processed_data.reset_index())
+        save_artifact(artifact, artifact_file, stream, pending)
+        print(f"Data setelah preprocessing telah disimpan sebagai {processed_store}")
+        print(f"Scaler disimpan sebagai {artifact_file}")
+
+    if export_csv:
+        # CSV hanya format ekspor (tanpa index agar tidak muncul kolom 'Unnamed: 0')
+        processed_filename = f'processed_data_{symbol}.csv'
+        ColumnStore(processed_store).export_csv(processed_filename, chunksize=chunksize)
+        print(f"Data juga diekspor sebagai {processed_filename}")
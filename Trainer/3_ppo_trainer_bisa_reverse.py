@@ -5,7 +5,8 @@ Trainer PPO yang menyimpan model ke `PPO_agent.zip`.
 
 Fitur utama:
 - Env trading sederhana, aksi: 0=Hold, 1=Buy (Long), 2=Sell (Short)
-- Observasi: N harga Close terakhir (default N=4)
+- Observasi: N harga Close terakhir (default N=4); --obs_mode returns/close_returns
+  menambah return per bar (live bot saat ini memakai mode close)
 - Reward: arah posisi * perubahan harga, plus biaya spread & komisi saat buka/flip
 - Flag --reverse untuk membalik aksi Buy<->Sell selama training
 - EvalCallback & CheckpointCallback
@@ -14,176 +15,52 @@ Fitur utama:
 Contoh pakai:
     pip install -r requirements_training.txt
     python ppo_trainer.py --csv /path/data.csv --timesteps 300000 --window 4 --reverse
+    python ppo_trainer.py --data processed_data_XAUUSD.cols --timesteps 300000
+    python ppo_trainer.py --data processed_data_XAUUSD.cols --n_envs 16 --vec_backend subproc
+
+`--data` (alias `--csv`) menerima store kolumnar (.cols, lihat column_store.py)
+atau CSV. Dari store, kolom Close di-memory-map tanpa parsing.
+
+Environment (SimpleTradingEnv dan versi batch BatchTradingVecEnv) ada di trading_env.py.
+`--n_envs` env training dijalankan lewat `--vec_backend`:
+- dummy:   DummyVecEnv, satu proses, tiap env di slice train yang berbeda
+- subproc: SubprocVecEnv, satu proses per env; harga di shared memory (tanpa pickling histori)
+- batched: BatchTradingVecEnv, semua env di-step NumPy dengan start acak
+
+`--episode_length N` membatasi episode training N step dengan start acak (seeded);
+evaluasi memakai `--eval_episodes` episode tetap sepanjang N di data eval.
+Tanpa itu episode berjalan sampai akhir data seperti sebelumnya.
+
+`--features Close,MA_3,RSI_14` memakai matriks fitur (N, F) dari processed store
+sebagai observasi (window x F). Spesifikasi observasi (kolom, window, mode, scaling
+dari processed_data_*_scalers.json) disimpan di dalam zip model sehingga live bot
+membangun observasi yang sama (lihat observation_spec.py).
 """
 
 import argparse
 import os
-import numpy as np
-import pandas as pd
-import gymnasium as gym
-from gymnasium import spaces
+import sys
 from stable_baselines3 import PPO
-from stable_baselines3.common.vec_env import DummyVecEnv
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
 from stable_baselines3.common.callbacks import EvalCallback, CheckpointCallback
 from stable_baselines3.common.logger import configure
 
-
-class SimpleTradingEnv(gym.Env):
-    """
-    Environment single-asset minimalis untuk PPO.
-
-    - Observation: last N close prices (raw), shape=(N,)
-    - Actions: 0=Hold, 1=Buy (long), 2=Sell (short)
-    - Position: -1 short, 0 flat, 1 long (maks 1 unit)
-    - Reward: position * price_change + biaya saat open/flip
-    - reverse=True akan memetakan aksi 1<->2 saat step()
-    """
-    metadata = {"render_modes": []}
-
-    def __init__(
-        self,
-        close_prices: np.ndarray,
-        window: int = 4,
-        spread: float = 0.0,
-        commission: float = 0.0,
-        reverse: bool = False,
-    ):
-        super().__init__()
-        assert close_prices.ndim == 1 and len(close_prices) > window + 2, \
-            "Need 1D close prices longer than window."
-        self.close = close_prices.astype(np.float32)
-        self.window = int(window)
-        self.spread = float(spread)
-        self.commission = float(commission)
-        self.reverse = bool(reverse)
-
-        self.action_space = spaces.Discrete(3)  # 0 hold, 1 buy, 2 sell
-        self.observation_space = spaces.Box(
-            low=0, high=np.finfo(np.float32).max, shape=(self.window,), dtype=np.float32
-        )
-
-        self.reset(seed=None, options=None)
-
-    def _obs(self):
-        return self.close[self.idx - self.window : self.idx].astype(np.float32)
-
-    def reset(self, seed=None, options=None):
-        super().reset(seed=seed)
-        self.idx = self.window
-        self.position = 0   # -1 short, 0 flat, 1 long
-        self.entry_price = 0.0
-        self.total_reward = 0.0
-        return self._obs(), {}
-
-    def step(self, action: int):
-        # Reverse mapping jika diaktifkan: 1<->2; 0 tetap
-        if self.reverse:
-            action = 2 if action == 1 else (1 if action == 2 else 0)
-
-        prev_price = float(self.close[self.idx - 1])
-        self.idx += 1
-        done = self.idx >= len(self.close)
-        curr_price = float(self.close[self.idx - 1])
-        price_change = curr_price - prev_price
-
-        reward = 0.0
-
-        # Trading dan biaya
-        if action == 1:  # Buy/Long
-            if self.position == 0:
-                self.position = 1
-                self.entry_price = curr_price + self.spread
-                reward -= self.commission
-            elif self.position == -1:
-                # tutup short
-                reward += (self.entry_price - (curr_price + self.spread))
-                reward -= self.commission
-                # buka long
-                self.position = 1
-                self.entry_price = curr_price + self.spread
-                reward -= self.commission
-
-        elif action == 2:  # Sell/Short
-            if self.position == 0:
-                self.position = -1
-                self.entry_price = curr_price - self.spread
-                reward -= self.commission
-            elif self.position == 1:
-                # tutup long
-                reward += ((curr_price - self.spread) - self.entry_price)
-                reward -= self.commission
-                # buka short
-                self.position = -1
-                self.entry_price = curr_price - self.spread
-                reward -= self.commission
-
-        # Hold: tidak ada biaya tambahan
-
-        # Shaped reward: unrealized PnL dari perubahan harga berjalan
-        if self.position == 1:
-            reward += price_change
-        elif self.position == -1:
-            reward -= price_change
-
-        self.total_reward += reward
-
-        obs = self._obs()
-        info = {
-            "idx": self.idx,
-            "position": self.position,
-            "entry_price": self.entry_price,
-            "total_reward": self.total_reward,
-        }
-        return obs, float(reward), done, False, info
-
-    def close_position(self):
-        if self.position == 0:
-            return 0.0
-        curr_price = float(self.close[self.idx - 1])
-        pnl = 0.0
-        if self.position == 1:
-            pnl = (curr_price - self.spread) - self.entry_price
-        elif self.position == -1:
-            pnl = self.entry_price - (curr_price + self.spread)
-        self.position = 0
-        self.entry_price = 0.0
-        return pnl
-
-
-def load_close_prices(csv_path: str, price_column: str = "Close") -> np.ndarray:
-    """
-    Memuat kolom harga Close dari CSV. Fleksibel terhadap beberapa variasi nama.
-    Jika tidak ditemukan, fallback ke kolom numerik terakhir.
-    """
-    df = pd.read_csv(csv_path)
-    # Kandidat umum termasuk header dataset yang sering dipakai
-    candidates = [
-        price_column,
-        "Close", "close", "close_price", "ClosePrice", "CLOSE",
-        "Adj Close", "adj_close", "AdjClose",
-    ]
-    col = None
-    for c in candidates:
-        if c in df.columns:
-            col = c
-            break
-    if col is None:
-        numeric_cols = [c for c in df.columns if np.issubdtype(df[c].dtype, np.number)]
-        if not numeric_cols:
-            raise ValueError(
-                "Tidak menemukan kolom numerik untuk harga. Pastikan CSV memiliki kolom 'Close'."
-            )
-        col = numeric_cols[-1]
-    series = df[col].dropna().values
-    return series.astype(np.float32)
+# feature_scaler.py & observation_spec.py ada di root repo (dipakai bersama dengan live bot)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from feature_scaler import ScalerArtifact, scaler_path_for  # noqa: E402
+from observation_spec import LIVE_COLUMNS, ObservationSpec  # noqa: E402
+from trading_data import load_close_prices, load_feature_matrix  # noqa: E402
+from trading_env import (  # noqa: E402
+    OBS_MODES, BatchTradingVecEnv, SharedPrices, SimpleTradingEnv, SliceEnvFactory, eval_starts, split_slices,
+)
 
 
 def main():
     parser = argparse.ArgumentParser(
         description="Train PPO dan ekspor PPO_agent.zip untuk live trading."
     )
-    parser.add_argument("--csv", type=str, required=True,
-                        help="Path ke CSV dengan minimal kolom 'Close'.")
+    parser.add_argument("--data", "--csv", dest="csv", type=str, required=True,
+                        help="Path ke store kolumnar (.cols) atau CSV dengan minimal kolom 'Close'.")
     parser.add_argument("--window", type=int, default=4,
                         help="Panjang window observasi (default 4).")
     parser.add_argument("--spread", type=float, default=0.0,
@@ -224,6 +101,22 @@ def main():
         action="store_true",
         help="Aktifkan reverse trading saat training (flip Buy<->Sell)."
     )
+    parser.add_argument("--n_envs", type=int, default=1,
+                        help="Jumlah env training paralel.")
+    parser.add_argument("--vec_backend", type=str, default="dummy", choices=["dummy", "subproc", "batched"],
+                        help="Backend VecEnv training (dummy/subproc/batched).")
+    parser.add_argument("--obs_mode", type=str, default="close", choices=list(OBS_MODES),
+                        help="Fitur observasi: close (mentah), returns, atau close_returns.")
+    parser.add_argument("--features", type=str, default="",
+                        help="Kolom fitur observasi dipisah koma (mis. Close,MA_3,RSI_14); "
+                             f"kosong = Close saja. Pilihan: {','.join(LIVE_COLUMNS)}")
+    parser.add_argument("--scaler_path", type=str, default=None,
+                        help="Artifact scaler preprocessing untuk spec observasi "
+                             "(default: <data>_scalers.json jika ada).")
+    parser.add_argument("--episode_length", type=int, default=0,
+                        help="Panjang episode (step) dengan start acak; 0 = sampai akhir data.")
+    parser.add_argument("--eval_episodes", type=int, default=5,
+                        help="Jumlah episode evaluasi tetap (dipakai jika --episode_length > 0).")
     parser.add_argument("--output", type=str, default="PPO_agent.zip",
                         help="Nama file output model PPO (default: PPO_agent.zip)")
 
@@ -235,32 +128,58 @@ def main():
     if args.reverse:
         print("[INFO] Reverse Trading ENABLED: environment flips actions 1<->2 during training.")
 
-    close_prices = load_close_prices(args.csv)
+    feature_columns = [c.strip() for c in args.features.split(",") if c.strip()]
+    features = None
+    if feature_columns:
+        close_prices, features = load_feature_matrix(args.csv, feature_columns)
+        print(f"[INFO] Observasi multi-fitur: {feature_columns} x window {args.window}")
+    else:
+        close_prices = load_close_prices(args.csv)
+    scaler_path = args.scaler_path or scaler_path_for(args.csv)
+    scaler = ScalerArtifact.load(scaler_path) if os.path.isfile(scaler_path) else None
+    # Spec divalidasi sebelum training (kolom harus bisa dihitung live)
+    obs_spec = ObservationSpec.from_scaler(feature_columns or ["Close"], args.window, args.obs_mode, scaler)
+
     n_total = len(close_prices)
     n_train = int(n_total * args.train_fraction)
+    eval_from = n_train - max(args.window, 32)  # overlap agar window valid
     train_prices = close_prices[:n_train]
-    eval_prices = close_prices[n_train - max(args.window, 32) :]  # overlap agar window valid
-
-    def make_train_env():
-        return SimpleTradingEnv(
-            train_prices,
-            window=args.window,
-            spread=args.spread,
-            commission=args.commission,
-            reverse=args.reverse,
-        )
-
-    def make_eval_env():
-        return SimpleTradingEnv(
-            eval_prices,
-            window=args.window,
-            spread=args.spread,
-            commission=args.commission,
-            reverse=args.reverse,
-        )
-
-    env = DummyVecEnv([make_train_env])
-    eval_env = DummyVecEnv([make_eval_env])
+    eval_prices = close_prices[eval_from:]
+    train_features = features[:n_train] if features is not None else None
+    eval_features = features[eval_from:] if features is not None else None
+
+    env_kwargs = dict(
+        window=args.window,
+        spread=args.spread,
+        commission=args.commission,
+        reverse=args.reverse,
+        episode_length=args.episode_length or None,
+        obs_mode=args.obs_mode,
+    )
+    shared = []
+    if args.vec_backend == "batched":
+        env = BatchTradingVecEnv(train_prices, n_envs=args.n_envs, seed=args.seed, features=train_features,
+                                 **env_kwargs)
+    else:
+        source, feature_source = train_prices, train_features
+        if args.vec_backend == "subproc":
+            source = SharedPrices(train_prices)
+            shared.append(source)
+            if train_features is not None:
+                feature_source = SharedPrices(train_features)
+                shared.append(feature_source)
+        env_fns = [SliceEnvFactory(source, lo, hi, features=feature_source, random_start=bool(args.episode_length),
+                                   **env_kwargs)
+                   for lo, hi in split_slices(len(train_prices), args.n_envs, args.window)]
+        env = SubprocVecEnv(env_fns) if args.vec_backend == "subproc" else DummyVecEnv(env_fns)
+    print(f"[INFO] {args.n_envs} env training ({args.vec_backend})")
+
+    # Satu env per episode evaluasi dengan start tetap: tiap evaluasi menilai episode yang sama
+    starts = eval_starts(len(eval_prices), args.window, args.episode_length, args.eval_episodes)
+    eval_env = DummyVecEnv([
+        (lambda start=start: SimpleTradingEnv(eval_prices, start=start, features=eval_features, **env_kwargs))
+        for start in starts
+    ])
 
     model = PPO(
         args.policy,
@@ -283,23 +202,30 @@ def main():
         eval_env,
         best_model_save_path=os.path.join(args.log_dir, "best_model"),
         log_path=os.path.join(args.log_dir, "eval"),
-        eval_freq=max(10_000, args.checkpoint_every // 2),
+        # Frekuensi callback dihitung per step VecEnv (= n_envs timestep)
+        eval_freq=max(1, max(10_000, args.checkpoint_every // 2) // args.n_envs),
+        n_eval_episodes=len(starts),
         deterministic=True,
         render=False,
     )
     checkpoint_callback = CheckpointCallback(
-        save_freq=args.checkpoint_every,
+        save_freq=max(1, args.checkpoint_every // args.n_envs),
         save_path=os.path.join(args.log_dir, "checkpoints"),
         name_prefix="ppo_checkpoint",
         save_replay_buffer=False,
         save_vecnormalize=False,
     )
 
-    model.learn(
-        total_timesteps=args.timesteps,
-        callback=[eval_callback, checkpoint_callback],
-        progress_bar=True,
-    )
+    try:
+        model.learn(
+            total_timesteps=args.timesteps,
+            callback=[eval_callback, checkpoint_callback],
+            progress_bar=True,
+        )
+    finally:
+        env.close()
+        for arr in shared:
+            arr.release()
 
     # Prompt user for output filename before saving
     output_name = input(f"Masukkan nama file output model PPO (.zip) [default: {args.output}]: ").strip()
@@ -309,6 +235,10 @@ def main():
         output_name += ".zip"
 
     model.save(output_name)
+    obs_spec.save_to_model(output_name)
+    best_model = os.path.join(args.log_dir, "best_model", "best_model.zip")
+    if os.path.isfile(best_model):
+        obs_spec.save_to_model(best_model)
     print(f"[DONE] Saved trained model to: {output_name}")
     print("Gunakan di live bot dengan arg: --ppo_model_path", output_name)
 
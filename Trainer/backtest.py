@@ -0,0 +1,215 @@
+"""
+Backtest cepat untuk model PPO hasil trainer (PPO_agent.zip) atas histori penuh.
+
+Dulu satu-satunya cara menilai model adalah menjalankan SimpleTradingEnv bar demi
+bar lewat SB3 (satu forward pass policy + satu `step()` Python per bar). Di sini:
+1. observasi seluruh histori dibangun sekali (trading_env.build_observations, sesuai
+   observation spec di dalam zip model),
+2. policy dijalankan dalam forward pass batch besar (observasi tidak bergantung
+   pada posisi, jadi semua aksi bisa dihitung di depan),
+3. posisi, harga entry, spread, komisi dan flip disimulasikan dalam satu pass
+   NumPy vectorized (`simulate`).
+
+Reward per bar identik dengan `SimpleTradingEnv.step` untuk aksi yang sama
+(episode dari idx = window sampai akhir data). Simulasi murni NumPy tanpa
+dependensi tambahan (mis. numba).
+
+Contoh:
+    python backtest.py --model PPO_agent.zip --data processed_data_XAUUSD.cols --spread 0.3
+    python backtest.py --benchmark       (waktu env.step vs simulate; paritas: tests/test_backtest.py)
+"""
+
+import argparse
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from stable_baselines3 import PPO
+
+# observation_spec.py ada di root repo (dipakai bersama dengan live bot)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from observation_spec import ObservationSpec  # noqa: E402
+from trading_data import load_close_prices, load_feature_matrix  # noqa: E402
+from trading_env import SimpleTradingEnv, build_observations  # noqa: E402
+
+# Jumlah observasi per forward pass policy
+DEFAULT_BATCH = 65_536
+
+
+@dataclass
+class BacktestResult:
+    """
+    Args:
+        rewards: reward per step (sama dengan SimpleTradingEnv.step)
+        positions: posisi setelah tiap step (-1, 0, 1)
+        entry_prices: harga entry posisi setelah tiap step
+        opened: mask step yang membuka posisi dari flat
+        flipped: mask step yang membalik posisi
+    """
+
+    rewards: np.ndarray
+    positions: np.ndarray
+    entry_prices: np.ndarray
+    opened: np.ndarray
+    flipped: np.ndarray
+
+    @property
+    def total_reward(self) -> float:
+        return float(self.equity[-1]) if len(self.rewards) else 0.0
+
+    @property
+    def equity(self) -> np.ndarray:
+        """Akumulasi reward (sama dengan info["total_reward"] env scalar)."""
+        return np.cumsum(self.rewards)
+
+    def summary(self) -> dict:
+        equity = self.equity
+        drawdown = np.maximum.accumulate(np.r_[0.0, equity])[1:] - equity if len(equity) else equity
+        return {
+            "steps": int(len(self.rewards)),
+            "total_reward": self.total_reward,
+            "trades": int(self.opened.sum() + self.flipped.sum()),
+            "flips": int(self.flipped.sum()),
+            "time_in_market": float((self.positions != 0).mean()) if len(self.positions) else 0.0,
+            "max_drawdown": float(drawdown.max()) if len(drawdown) else 0.0,
+        }
+
+
+def _ffill_index(mask: np.ndarray) -> np.ndarray:
+    """Index True terakhir sampai setiap posisi (-1 jika belum ada)."""
+    idx = np.where(mask, np.arange(len(mask)), -1)
+    return np.maximum.accumulate(idx) if len(idx) else idx
+
+
+def simulate(prices: np.ndarray, actions: np.ndarray, window: int, spread: float = 0.0,
+             commission: float = 0.0, reverse: bool = False) -> BacktestResult:
+    """
+    Simulasi satu episode SimpleTradingEnv (idx = window .. len-1) secara vectorized.
+
+    Args:
+        prices: harga close (float32 seperti di env)
+        actions: aksi policy per step, panjang len(prices) - window (0 hold, 1 buy, 2 sell)
+        window: panjang window observasi (idx awal episode)
+        spread, commission, reverse: sama dengan parameter SimpleTradingEnv
+    """
+    prices = np.asarray(prices, dtype=np.float32)
+    action = np.asarray(actions, dtype=np.int64)
+    if len(action) != len(prices) - window:
+        raise ValueError(f"Butuh {len(prices) - window} aksi, dapat {len(action)}")
+    if reverse:
+        action = np.where(action == 1, 2, np.where(action == 2, 1, 0))
+
+    prev_price = prices[window - 1:-1].astype(np.float64)
+    curr_price = prices[window:].astype(np.float64)
+    price_change = curr_price - prev_price
+
+    buy = action == 1
+    sell = action == 2
+    direction = np.where(buy, 1, np.where(sell, -1, 0))
+    # Posisi hanya berubah saat ada aksi buy/sell; hold membawa posisi sebelumnya
+    last = _ffill_index(direction != 0)
+    position = np.where(last >= 0, direction[np.maximum(last, 0)], 0)
+    pos_before = np.r_[0, position[:-1]]
+    trade = (direction != 0) & (direction != pos_before)
+    opened = trade & (pos_before == 0)
+    flip = trade & (pos_before != 0)
+
+    entry_at_trade = np.where(buy, curr_price + spread, curr_price - spread)
+    last_trade = _ffill_index(trade)
+    entry_price = np.where(last_trade >= 0, entry_at_trade[np.maximum(last_trade, 0)], 0.0)
+    entry_before = np.r_[0.0, entry_price[:-1]]
+
+    # Urutan operasi sama dengan SimpleTradingEnv.step agar reward identik sampai bit terakhir
+    reward = np.where(buy & flip, entry_before - (curr_price + spread), 0.0)
+    reward = np.where(sell & flip, (curr_price - spread) - entry_before, reward)
+    reward = reward - np.where(opened | flip, commission, 0.0)
+    reward = reward - np.where(flip, commission, 0.0)
+    reward = np.where(position == 1, reward + price_change,
+                      np.where(position == -1, reward - price_change, reward))
+    return BacktestResult(reward, position, entry_price, opened, flip)
+
+
+def policy_actions(model, observations: np.ndarray, batch_size: int = DEFAULT_BATCH) -> np.ndarray:
+    """Aksi deterministik policy SB3 untuk semua observasi, dalam forward pass batch."""
+    out = np.empty(len(observations), dtype=np.int64)
+    for lo in range(0, len(observations), batch_size):
+        chunk = np.asarray(observations[lo:lo + batch_size], dtype=np.float32)
+        out[lo:lo + len(chunk)], _ = model.predict(chunk, deterministic=True)
+    return out
+
+
+def backtest_model(model_path: str, data_path: str, spread: float = 0.0, commission: float = 0.0,
+                   reverse: bool = False, start: int = 0, bars: Optional[int] = None,
+                   batch_size: int = DEFAULT_BATCH) -> BacktestResult:
+    """
+    Backtest model atas data [start, start + bars). Observasi dibangun sesuai observation
+    spec di zip model; data dipakai apa adanya seperti saat training (processed store
+    sudah ter-scale). Model lama tanpa spec: window dari observation space, kolom Close.
+    """
+    model = PPO.load(model_path, device="cpu")
+    spec = ObservationSpec.load_from_model(model_path)
+    window = spec.window if spec is not None else int(model.observation_space.shape[0])
+    obs_mode = spec.obs_mode if spec is not None else "close"
+    features = None
+    if spec is not None and spec.columns != ["Close"]:
+        prices, features = load_feature_matrix(data_path, spec.columns)
+    else:
+        prices = load_close_prices(data_path)
+    stop = len(prices) if bars is None else min(len(prices), start + bars)
+    prices = prices[start:stop]
+    if features is not None:
+        features = features[start:stop]
+
+    observations = build_observations(prices, window, obs_mode, features)[:len(prices) - window]
+    actions = policy_actions(model, observations, batch_size)
+    return simulate(prices, actions, window, spread, commission, reverse)
+
+
+def _benchmark(n_bars: int = 20_000, window: int = 4, seed: int = 0) -> None:
+    """Waktu SimpleTradingEnv.step bar demi bar vs simulate() untuk aksi acak yang sama."""
+    rng = np.random.default_rng(seed)
+    prices = (2000 + np.cumsum(rng.normal(0, 1, n_bars))).astype(np.float32)
+    actions = rng.integers(0, 3, n_bars - window)
+    t0 = time.perf_counter()
+    simulate(prices, actions, window, spread=0.3, commission=0.05)
+    t_vec = time.perf_counter() - t0
+    env = SimpleTradingEnv(prices, window=window, spread=0.3, commission=0.05)
+    env.reset()
+    t0 = time.perf_counter()
+    for a in actions:
+        env.step(int(a))
+    t_env = time.perf_counter() - t0
+    print(f"{len(actions)} step: env.step={t_env * 1000:.0f} ms  vectorized={t_vec * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest vectorized model PPO atas histori.")
+    parser.add_argument("--model", type=str, default="PPO_agent.zip", help="Path model PPO (.zip).")
+    parser.add_argument("--data", type=str, help="Store kolumnar (.cols) atau CSV yang sama dengan training.")
+    parser.add_argument("--spread", type=float, default=0.0)
+    parser.add_argument("--commission", type=float, default=0.0)
+    parser.add_argument("--reverse", action="store_true")
+    parser.add_argument("--start", type=int, default=0, help="Bar awal backtest.")
+    parser.add_argument("--bars", type=int, default=None, help="Jumlah bar (default: sampai akhir data).")
+    parser.add_argument("--batch_size", type=int, default=DEFAULT_BATCH)
+    parser.add_argument("--benchmark", action="store_true", help="Bandingkan waktu env.step vs simulate lalu keluar.")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        _benchmark()
+        return
+    if not args.data:
+        parser.error("--data wajib diisi")
+    t0 = time.perf_counter()
+    result = backtest_model(args.model, args.data, args.spread, args.commission, args.reverse,
+                            args.start, args.bars, args.batch_size)
+    for key, value in result.summary().items():
+        print(f"{key:<15} {value}")
+    print(f"Selesai dalam {time.perf_counter() - t0:.2f} detik")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Renderer gambar candlestick paralel untuk dataset bullish/bearish.
+
+Dulu `save_candlestick_images()` memanggil `mpf.plot` satu per satu untuk setiap
+window (20/50/100), masing-masing dengan copy `data.iloc[...].set_index('Date')`.
+Di sini:
+- array OHLC + waktu ditaruh SEKALI di shared memory; worker (process pool)
+  hanya memetakannya, tanpa pickling data per tugas,
+- tugas berupa rentang kerja (window_size, start, stop) sehingga overhead IPC
+  per gambar hampir nol,
+- file yang sudah ada dilewati (skip_existing) sehingga render bisa dilanjutkan,
+- fmt="npz" merender langsung ke array RGB uint8 dan menyimpannya per rentang
+  sebagai shard .npz (images, starts, labels) alih-alih ribuan file PNG.
+
+Label sama dengan versi lama: bullish jika return window > threshold dan Close
+terakhir di atas MA(window_size), bearish jika return < -threshold dan di bawah MA.
+`label_windows()` menghitung label semua window untuk semua window_size secara
+vectorized, dan hasilnya disimpan sebagai label index kompak
+({output_dir}/labels.npy: start, window, label). Renderer hanya mengunjungi window
+berlabel; training bisa memuat label lewat `load_label_index()` tanpa menelusuri folder.
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from feature_engine import rolling_mean  # noqa: E402
+
+OHLC_COLUMNS = ("Open", "High", "Low", "Close")
+LABELS = ("bullish", "bearish")
+DEFAULT_WINDOW_SIZES = (20, 50, 100)
+# Rentang start window per tugas worker
+DEFAULT_TASK_SIZE = 256
+LABEL_INDEX_FILE = "labels.npy"
+# Satu baris per window berlabel; label 1 = bullish, -1 = bearish
+LABEL_DTYPE = np.dtype([("start", "<i8"), ("window", "<i4"), ("label", "i1")])
+
+# State per proses worker (diisi oleh _init_worker)
+_worker: Dict = {}
+
+
+def _init_worker(ohlc_name: str, time_name: str, n: int, options: Dict) -> None:
+    import matplotlib  # type: ignore
+    matplotlib.use("Agg")
+    ohlc_shm = shared_memory.SharedMemory(name=ohlc_name)
+    time_shm = shared_memory.SharedMemory(name=time_name)
+    _worker["shm"] = (ohlc_shm, time_shm)  # referensi dijaga agar buffer tetap hidup
+    _worker["ohlc"] = np.ndarray((4, n), dtype=np.float64, buffer=ohlc_shm.buf)
+    _worker["time"] = np.ndarray((n,), dtype="<M8[ns]", buffer=time_shm.buf)
+    _worker["options"] = options
+
+
+def label_windows(open_: np.ndarray, close: np.ndarray, window_sizes: Sequence[int],
+                  return_threshold: float = 0.002) -> np.ndarray:
+    """
+    Label semua window [i, i + w) untuk i < n - w dan setiap w di window_sizes.
+    Return structured array LABEL_DTYPE berisi window berlabel saja, urut (window, start).
+    """
+    open_ = np.asarray(open_, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    parts = []
+    for w in window_sizes:
+        count = n - w
+        if count <= 0:
+            continue
+        last = np.arange(count) + w - 1
+        close_last = close[last]
+        ma_last = rolling_mean(close, w)[last]
+        ret = close_last / open_[:count] - 1
+        label = np.where((ret > return_threshold) & (close_last > ma_last), 1,
+                         np.where((ret < -return_threshold) & (close_last < ma_last), -1, 0))
+        starts = np.flatnonzero(label)
+        part = np.empty(len(starts), dtype=LABEL_DTYPE)
+        part["start"] = starts
+        part["window"] = w
+        part["label"] = label[starts]
+        parts.append(part)
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=LABEL_DTYPE)
+
+
+def save_label_index(output_dir: str, labels: np.ndarray) -> str:
+    path = os.path.join(output_dir, LABEL_INDEX_FILE)
+    np.save(path, labels)
+    return path
+
+
+def load_label_index(output_dir: str) -> np.ndarray:
+    """Label index (start, window, label) hasil render terakhir."""
+    return np.load(os.path.join(output_dir, LABEL_INDEX_FILE))
+
+
+def _window_frame(i: int, window_size: int) -> pd.DataFrame:
+    ohlc = _worker["ohlc"]
+    sl = slice(i, i + window_size)
+    return pd.DataFrame(
+        {name: ohlc[k, sl] for k, name in enumerate(OHLC_COLUMNS)},
+        index=pd.DatetimeIndex(_worker["time"][sl], name="Date"),
+    )
+
+
+def _render_array(frame: pd.DataFrame, figsize: Tuple[float, float], dpi: int) -> np.ndarray:
+    import matplotlib.pyplot as plt  # type: ignore
+    import mplfinance as mpf  # type: ignore
+
+    fig, _ = mpf.plot(frame, type="candle", style="charles", returnfig=True, figsize=figsize)
+    fig.set_dpi(dpi)
+    fig.canvas.draw()
+    image = np.asarray(fig.canvas.buffer_rgba())[..., :3].copy()
+    plt.close(fig)
+    return image
+
+
+def _render_range(task: Tuple[int, int, int, np.ndarray, np.ndarray]) -> Tuple[int, int]:
+    """Render window berlabel dalam satu rentang kerja. Return (jumlah dirender, jumlah dilewati)."""
+    import mplfinance as mpf  # type: ignore
+
+    window_size, start, stop, starts, labels = task
+    opt = _worker["options"]
+    rendered = skipped = 0
+
+    if opt["fmt"] == "npz":
+        # Nama shard memuat start & stop: rentang terakhir yang bertambah (data baru) dirender ulang
+        path = os.path.join(opt["output_dir"], "npz", f"candles_{window_size}_{start:09d}_{stop:09d}.npz")
+        if opt["skip_existing"] and os.path.exists(path):
+            return 0, len(starts)
+        images = [_render_array(_window_frame(int(i), window_size), opt["figsize"], opt["dpi"]) for i in starts]
+        # Shard tetap ditulis walau kosong agar rentang ini dilewati di run berikutnya
+        np.savez_compressed(path, images=np.stack(images) if images else np.zeros((0, 0, 0, 3), dtype=np.uint8),
+                            starts=np.asarray(starts, dtype=np.int64),
+                            labels=np.asarray(labels, dtype=np.int8), window=window_size)
+        return len(images), 0
+
+    for i, lab in zip(starts, labels):
+        label = LABELS[0] if lab > 0 else LABELS[1]
+        filename = os.path.join(opt["output_dir"], f"{label}_{window_size}", f"candlestick_{window_size}_{i}.png")
+        if opt["skip_existing"] and os.path.exists(filename):
+            skipped += 1
+            continue
+        mpf.plot(_window_frame(int(i), window_size), type="candle", style="charles", savefig=filename)
+        rendered += 1
+    return rendered, skipped
+
+
+def make_tasks(n: int, labels: np.ndarray, task_size: int = DEFAULT_TASK_SIZE) -> List[Tuple]:
+    """
+    Rentang kerja (window_size, start, stop, starts, labels): window berlabel dari
+    label index dikelompokkan per rentang start [start, stop) sepanjang task_size.
+    """
+    tasks = []
+    for w in np.unique(labels["window"]):
+        w = int(w)
+        sel = labels[labels["window"] == w]
+        bucket = sel["start"] // task_size
+        bounds = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1], True])
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            lo = int(bucket[a]) * task_size
+            tasks.append((w, lo, min(lo + task_size, n - w), sel["start"][a:b], sel["label"][a:b]))
+    return tasks
+
+
+def render_candlesticks(
+    data: pd.DataFrame,
+    output_dir: str = "candlestick_images",
+    window_sizes: Sequence[int] = DEFAULT_WINDOW_SIZES,
+    return_threshold: float = 0.002,
+    workers: Optional[int] = None,
+    skip_existing: bool = True,
+    fmt: str = "png",
+    task_size: int = DEFAULT_TASK_SIZE,
+    figsize: Tuple[float, float] = (4.0, 3.0),
+    dpi: int = 64,
+) -> Tuple[int, int]:
+    """
+    Render gambar candlestick berlabel secara paralel.
+
+    Args:
+        data: DataFrame dengan kolom Date, Open, High, Low, Close
+        output_dir: folder output (subfolder {label}_{window} untuk PNG, npz/ untuk shard,
+            label index labels.npy)
+        window_sizes: panjang window yang dirender
+        return_threshold: ambang return untuk label bullish/bearish
+        workers: jumlah proses (None = jumlah CPU)
+        skip_existing: lewati file/shard yang sudah ada
+        fmt: "png" (file per gambar, sama dengan versi lama) atau "npz" (shard array RGB)
+        task_size: jumlah window per tugas worker
+        figsize, dpi: ukuran gambar untuk fmt="npz" (semua array berukuran sama)
+
+    Return: (jumlah dirender, jumlah dilewati)
+    """
+    if fmt not in ("png", "npz"):
+        raise ValueError(f"Format gambar tidak dikenal: {fmt}")
+    os.makedirs(output_dir, exist_ok=True)
+    if fmt == "png":
+        for w in window_sizes:
+            for label in LABELS:
+                os.makedirs(os.path.join(output_dir, f"{label}_{w}"), exist_ok=True)
+    else:
+        os.makedirs(os.path.join(output_dir, "npz"), exist_ok=True)
+
+    n = len(data)
+    ohlc = np.ascontiguousarray(np.vstack([data[c].to_numpy(dtype=np.float64) for c in OHLC_COLUMNS]))
+    times = np.ascontiguousarray(pd.to_datetime(data["Date"]).to_numpy(dtype="<M8[ns]"))
+    labels = label_windows(ohlc[0], ohlc[3], window_sizes, return_threshold)
+    save_label_index(output_dir, labels)
+    tasks = make_tasks(n, labels, task_size)
+    if not tasks:
+        return 0, 0
+
+    ohlc_shm = shared_memory.SharedMemory(create=True, size=max(1, ohlc.nbytes))
+    time_shm = shared_memory.SharedMemory(create=True, size=max(1, times.nbytes))
+    try:
+        np.ndarray(ohlc.shape, dtype=ohlc.dtype, buffer=ohlc_shm.buf)[:] = ohlc
+        np.ndarray(times.shape, dtype=times.dtype, buffer=time_shm.buf)[:] = times
+        options = {
+            "output_dir": output_dir,
+            "skip_existing": bool(skip_existing),
+            "fmt": fmt,
+            "figsize": tuple(figsize),
+            "dpi": int(dpi),
+        }
+        rendered = skipped = 0
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(ohlc_shm.name, time_shm.name, n, options)) as pool:
+            for r, s in pool.map(_render_range, tasks):
+                rendered += r
+                skipped += s
+        return rendered, skipped
+    finally:
+        ohlc_shm.close()
+        ohlc_shm.unlink()
+        time_shm.close()
+        time_shm.unlink()
+
+
+def load_npz_images(output_dir: str, window_size: int):
+    """Gabungkan semua shard .npz satu window_size -> (images, starts, labels)."""
+    folder = os.path.join(output_dir, "npz")
+    prefix = f"candles_{window_size}_"
+    # Per start hanya shard dengan stop terbesar yang dipakai (shard lama yang lebih pendek diabaikan)
+    latest: Dict[int, Tuple[int, str]] = {}
+    for name in os.listdir(folder) if os.path.isdir(folder) else []:
+        if not (name.startswith(prefix) and name.endswith(".npz")):
+            continue
+        start, stop = (int(x) for x in name[len(prefix):-4].split("_"))
+        if start not in latest or stop > latest[start][0]:
+            latest[start] = (stop, name)
+    shards = [np.load(os.path.join(folder, latest[k][1])) for k in sorted(latest)]
+    shards = [s for s in shards if len(s["starts"])]
+    if not shards:
+        return np.zeros((0, 0, 0, 3), dtype=np.uint8), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int8)
+    return (np.concatenate([s["images"] for s in shards]),
+            np.concatenate([s["starts"] for s in shards]),
+            np.concatenate([s["labels"] for s in shards]))
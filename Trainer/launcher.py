@@ -12,7 +12,7 @@ def ask(prompt, default=None, type_=str):
 
 def main():
     print("=== PPO Trainer Launcher ===")
-    csv = ask("Path ke CSV data", "data.csv", str)
+    csv = ask("Path ke data (store .cols atau CSV)", "data.csv", str)
     window = ask("Window observasi", 4, int)
     spread = ask("Spread", 0.0, float)
     commission = ask("Komisi", 0.0, float)
@@ -31,12 +31,16 @@ def main():
     vf_coef = ask("Value function coef", 0.5, float)
     gae_lambda = ask("GAE lambda", 0.95, float)
     max_grad_norm = ask("Max grad norm", 0.5, float)
+    n_envs = ask("Jumlah env paralel", 1, int)
+    vec_backend = ask("Backend env (dummy/subproc/batched)", "dummy", str)
+    episode_length = ask("Panjang episode (0 = sampai akhir data)", 0, int)
+    eval_episodes = ask("Jumlah episode evaluasi", 5, int)
     reverse = ask("Reverse trading? (y/n)", "n", str).lower() == "y"
     output = ask("Nama file output model", "PPO_agent.zip", str)
 
     cmd = [
         "python", "3_ppo_trainer_bisa_reverse.py",
-        "--csv", csv,
+        "--data", csv,
         "--window", str(window),
         "--spread", str(spread),
         "--commission", str(commission),
@@ -55,6 +59,10 @@ def main():
         "--vf_coef", str(vf_coef),
         "--gae_lambda", str(gae_lambda),
         "--max_grad_norm", str(max_grad_norm),
+        "--n_envs", str(n_envs),
+        "--vec_backend", vec_backend,
+        "--episode_length", str(episode_length),
+        "--eval_episodes", str(eval_episodes),
         "--output", output,
     ]
     if reverse:
@@ -0,0 +1,86 @@
+"""
+Pemuat data harga & fitur untuk trainer PPO dan backtest.
+
+Sumber data bisa berupa store kolumnar (.cols, lihat column_store.py; kolom
+di-memory-map tanpa parsing) atau CSV.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# column_store.py ada di root repo (dipakai bersama dengan import & preprocessing)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from column_store import ColumnStore, is_store  # noqa: E402
+
+# Kandidat umum nama kolom harga termasuk header dataset yang sering dipakai
+PRICE_COLUMN_CANDIDATES = [
+    "Close", "close", "close_price", "ClosePrice", "CLOSE",
+    "Adj Close", "adj_close", "AdjClose",
+]
+
+
+def load_close_prices(data_path: str, price_column: str = "Close") -> np.ndarray:
+    """
+    Memuat kolom harga Close dari store kolumnar (memmap, tanpa parsing) atau CSV.
+    Fleksibel terhadap beberapa variasi nama.
+    Jika tidak ditemukan, fallback ke kolom numerik terakhir.
+
+    Selalu float32: env trading memakai float32, jadi konversi dilakukan SEKALI di
+    sini. Store menyimpan Close sebagai float64 (presisi harga asli untuk preprocessing),
+    sehingga hasilnya satu salinan float32; slice yang diteruskan ke env / SharedPrices
+    lalu berupa view, bukan salinan per env.
+    """
+    if is_store(data_path):
+        store = ColumnStore(data_path)
+        col = next((c for c in [price_column] + PRICE_COLUMN_CANDIDATES if c in store), None)
+        if col is None:
+            raise ValueError(f"Store {data_path} tidak memiliki kolom harga Close.")
+        series = store.column(col)
+        nan = np.isnan(series)
+        # Satu copy float32 (dan buang NaN) tanpa parsing teks
+        if nan.any():
+            series = series[~nan]
+        return np.asarray(series, dtype=np.float32)
+    df = pd.read_csv(data_path)
+    candidates = [price_column] + PRICE_COLUMN_CANDIDATES
+    col = None
+    for c in candidates:
+        if c in df.columns:
+            col = c
+            break
+    if col is None:
+        numeric_cols = [c for c in df.columns if np.issubdtype(df[c].dtype, np.number)]
+        if not numeric_cols:
+            raise ValueError(
+                "Tidak menemukan kolom numerik untuk harga. Pastikan CSV memiliki kolom 'Close'."
+            )
+        col = numeric_cols[-1]
+    series = df[col].dropna().values
+    return series.astype(np.float32)
+
+
+def load_feature_matrix(data_path: str, columns, price_column: str = "Close"):
+    """
+    Memuat kolom fitur (N, F) float32 + harga Close (N,) yang sejajar dari store
+    kolumnar atau CSV. Baris dengan NaN di salah satu kolom dibuang.
+    """
+    names = list(dict.fromkeys([price_column] + list(columns)))
+    if is_store(data_path):
+        store = ColumnStore(data_path)
+        missing = [c for c in names if c not in store]
+        data = {c: store.column(c) for c in names if c in store}
+    else:
+        df = pd.read_csv(data_path)
+        missing = [c for c in names if c not in df.columns]
+        data = {c: df[c].to_numpy() for c in names if c in df.columns}
+    if missing:
+        raise ValueError(f"Kolom {missing} tidak ada di {data_path}")
+    features = np.column_stack([np.asarray(data[c], dtype=np.float32) for c in columns])
+    prices = np.asarray(data[price_column], dtype=np.float32)
+    valid = np.isfinite(features).all(axis=1) & np.isfinite(prices)
+    if not valid.all():
+        features, prices = features[valid], prices[valid]
+    return prices, features
@@ -0,0 +1,521 @@
+"""
+Environment trading untuk trainer PPO.
+
+- `SimpleTradingEnv`: env gymnasium scalar (satu posisi, satu bar per `step()`).
+- `BatchTradingVecEnv`: VecEnv SB3 native yang menjalankan N env sekaligus di atas
+  array close yang sama dengan operasi array NumPy (posisi, harga entry, reward,
+  spread/komisi, reverse mapping). Reward identik dengan `SimpleTradingEnv.step`
+  untuk aksi yang sama; start episode diacak (seeded) per env.
+
+Dengan DummyVecEnv, tiap step PPO berarti N panggilan `step()` Python dengan cabang
+scalar; di sini satu `step_wait()` memproses semua env sehingga throughput rollout
+naik seiring N.
+
+Episode bisa dibatasi `episode_length` step dengan start acak (seeded) agar rollout
+lebih pendek & beragam; akhir karena batas panjang dilaporkan sebagai truncated.
+`eval_starts()` memberi sejumlah start tetap untuk evaluasi yang terbatas & berulang.
+
+Observasi dibangun SEKALI per env lewat `build_observations()` (baris k = observasi
+pada idx = k + window): mode "close" berupa view `sliding_window_view` tanpa copy,
+mode lain berupa matriks float32 kontigu. Dengan matriks fitur (N, F) dari
+processed store, observasi = window baris x F kolom di-flatten per baris
+(layout yang sama dibangun ulang live bot lewat observation_spec.py). `_obs()` hanya mengindeks baris, tanpa
+slicing + astype per step, sehingga fitur observasi bisa bertambah tanpa
+memperlambat step.
+
+Untuk SubprocVecEnv, `SharedPrices` menaruh array harga sekali di shared memory;
+yang di-pickle ke tiap subprocess hanya nama segmen + panjang, dan
+`SliceEnvFactory` membangun env di atas slice [start, stop) dari array itu.
+
+Benchmark throughput (paritas reward diuji di tests/test_trading_env.py):
+    python trading_env.py --n_envs 16 --steps 20000
+"""
+
+from multiprocessing import shared_memory
+from typing import Any, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import gymnasium as gym
+from gymnasium import spaces
+from numpy.lib.stride_tricks import sliding_window_view
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv, VecEnvIndices
+
+
+# Mode observasi: close mentah (sama dengan live bot), return, atau keduanya
+OBS_MODES = ("close", "returns", "close_returns")
+
+
+def build_observations(prices: np.ndarray, window: int, mode: str = "close",
+                       features: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Matriks observasi (len - window + 1, dim). Baris k berisi fitur bar [k, k + window).
+
+    - close: harga close mentah (view zero-copy)
+    - returns: return per bar close[t] / close[t-1] - 1 (0 untuk bar pertama data)
+    - close_returns: gabungan keduanya, dim = 2 * window
+    - features (N, F): bar [k, k + window) x F kolom di-flatten per baris, dim = window * F
+    """
+    if features is not None:
+        if mode != "close":
+            raise ValueError("Matriks fitur hanya mendukung obs_mode close")
+        features = np.asarray(features, dtype=np.float32)
+        view = sliding_window_view(features, window, axis=0)  # (M, F, window)
+        return np.ascontiguousarray(view.transpose(0, 2, 1)).reshape(len(view), -1)
+    prices = np.asarray(prices, dtype=np.float32)
+    close = sliding_window_view(prices, window)
+    if mode == "close":
+        return close
+    if mode not in OBS_MODES:
+        raise ValueError(f"Mode observasi tidak dikenal: {mode}")
+    ret = np.zeros(len(prices), dtype=np.float32)
+    ret[1:] = prices[1:] / prices[:-1] - 1
+    returns = sliding_window_view(ret, window)
+    if mode == "returns":
+        return np.ascontiguousarray(returns)
+    return np.concatenate([close, returns], axis=1)
+
+
+def observation_space_for(window: int, mode: str = "close", n_features: Optional[int] = None) -> spaces.Box:
+    if n_features is not None:
+        return spaces.Box(low=-np.finfo(np.float32).max, high=np.finfo(np.float32).max,
+                          shape=(window * n_features,), dtype=np.float32)
+    if mode == "close":
+        return spaces.Box(low=0, high=np.finfo(np.float32).max, shape=(window,), dtype=np.float32)
+    dim = window if mode == "returns" else 2 * window
+    return spaces.Box(low=-np.finfo(np.float32).max, high=np.finfo(np.float32).max, shape=(dim,), dtype=np.float32)
+
+
+def start_range(n: int, window: int, episode_length: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Rentang idx awal episode [lo, hi] (inklusif). Dengan episode_length, start dibatasi
+    agar episode penuh muat di data; tanpa itu minimal satu step tersisa.
+    """
+    hi = n - episode_length if episode_length else n - 1
+    return window, max(window, hi)
+
+
+def eval_starts(n: int, window: int, episode_length: Optional[int], n_episodes: int) -> List[int]:
+    """Start episode evaluasi yang tetap, tersebar rata di data (satu start jika tanpa episode_length)."""
+    if not episode_length:
+        return [window]
+    lo, hi = start_range(n, window, episode_length)
+    return sorted(set(np.linspace(lo, hi, max(1, n_episodes)).astype(np.int64).tolist()))
+
+
+class SimpleTradingEnv(gym.Env):
+    """
+    Environment single-asset minimalis untuk PPO.
+
+    - Observation: last N close prices (raw), shape=(N,); obs_mode lain lihat build_observations()
+    - Actions: 0=Hold, 1=Buy (long), 2=Sell (short)
+    - Position: -1 short, 0 flat, 1 long (maks 1 unit)
+    - Reward: position * price_change + biaya saat open/flip
+    - reverse=True akan memetakan aksi 1<->2 saat step()
+    - episode_length: batas step per episode (None = sampai akhir data)
+    - random_start: idx awal diacak dengan self.np_random (seed lewat reset(seed=...))
+    - start: idx awal tetap (mis. episode evaluasi); reset(options={"start": i}) juga bisa
+    - features: matriks fitur (N, F) sejajar close_prices untuk observasi multi-fitur
+    """
+    metadata = {"render_modes": []}
+
+    def __init__(
+        self,
+        close_prices: np.ndarray,
+        window: int = 4,
+        spread: float = 0.0,
+        commission: float = 0.0,
+        reverse: bool = False,
+        episode_length: Optional[int] = None,
+        random_start: bool = False,
+        start: Optional[int] = None,
+        obs_mode: str = "close",
+        features: Optional[np.ndarray] = None,
+    ):
+        super().__init__()
+        assert close_prices.ndim == 1 and len(close_prices) > window + 2, \
+            "Need 1D close prices longer than window."
+        # Tanpa copy jika input sudah float32 (mis. memmap dari store kolumnar).
+        # Bukan `self.close` agar tidak menimpa method close() milik gym.Env/VecEnv.
+        self.prices = np.asarray(close_prices, dtype=np.float32)
+        self.window = int(window)
+        self.spread = float(spread)
+        self.commission = float(commission)
+        self.reverse = bool(reverse)
+        self.episode_length = int(episode_length) if episode_length else None
+        self.random_start = bool(random_start)
+        self.fixed_start = start
+        self.obs_mode = obs_mode
+        if features is not None:
+            assert len(features) == len(self.prices), "features harus sejajar dengan close_prices"
+        self._observations = build_observations(self.prices, self.window, obs_mode, features)
+
+        self.action_space = spaces.Discrete(3)  # 0 hold, 1 buy, 2 sell
+        self.observation_space = observation_space_for(
+            self.window, obs_mode, None if features is None else features.shape[1])
+
+        self.reset(seed=None, options=None)
+
+    def _obs(self):
+        # View baris matriks observasi (read-only), tanpa alokasi per step
+        return self._observations[self.idx - self.window]
+
+    def reset(self, seed=None, options=None):
+        super().reset(seed=seed)
+        if options and "start" in options:
+            self.start = int(options["start"])
+        elif self.fixed_start is not None:
+            self.start = int(self.fixed_start)
+        elif self.random_start:
+            lo, hi = start_range(len(self.prices), self.window, self.episode_length)
+            self.start = int(self.np_random.integers(lo, hi + 1))
+        else:
+            self.start = self.window
+        self.idx = self.start
+        self.position = 0   # -1 short, 0 flat, 1 long
+        self.entry_price = 0.0
+        self.total_reward = 0.0
+        return self._obs(), {}
+
+    def step(self, action: int):
+        # Reverse mapping jika diaktifkan: 1<->2; 0 tetap
+        if self.reverse:
+            action = 2 if action == 1 else (1 if action == 2 else 0)
+
+        prev_price = float(self.prices[self.idx - 1])
+        self.idx += 1
+        done = self.idx >= len(self.prices)
+        truncated = not done and self.episode_length is not None and self.idx - self.start >= self.episode_length
+        curr_price = float(self.prices[self.idx - 1])
+        price_change = curr_price - prev_price
+
+        reward = 0.0
+
+        # Trading dan biaya
+        if action == 1:  # Buy/Long
+            if self.position == 0:
+                self.position = 1
+                self.entry_price = curr_price + self.spread
+                reward -= self.commission
+            elif self.position == -1:
+                # tutup short
+                reward += (self.entry_price - (curr_price + self.spread))
+                reward -= self.commission
+                # buka long
+                self.position = 1
+                self.entry_price = curr_price + self.spread
+                reward -= self.commission
+
+        elif action == 2:  # Sell/Short
+            if self.position == 0:
+                self.position = -1
+                self.entry_price = curr_price - self.spread
+                reward -= self.commission
+            elif self.position == 1:
+                # tutup long
+                reward += ((curr_price - self.spread) - self.entry_price)
+                reward -= self.commission
+                # buka short
+                self.position = -1
+                self.entry_price = curr_price - self.spread
+                reward -= self.commission
+
+        # Hold: tidak ada biaya tambahan
+
+        # Shaped reward: unrealized PnL dari perubahan harga berjalan
+        if self.position == 1:
+            reward += price_change
+        elif self.position == -1:
+            reward -= price_change
+
+        self.total_reward += reward
+
+        obs = self._obs()
+        info = {
+            "idx": self.idx,
+            "position": self.position,
+            "entry_price": self.entry_price,
+            "total_reward": self.total_reward,
+        }
+        return obs, float(reward), done, truncated, info
+
+    def close_position(self):
+        if self.position == 0:
+            return 0.0
+        curr_price = float(self.prices[self.idx - 1])
+        pnl = 0.0
+        if self.position == 1:
+            pnl = (curr_price - self.spread) - self.entry_price
+        elif self.position == -1:
+            pnl = self.entry_price - (curr_price + self.spread)
+        self.position = 0
+        self.entry_price = 0.0
+        return pnl
+
+
+class BatchTradingVecEnv(VecEnv):
+    """
+    N env `SimpleTradingEnv` yang di-step bersamaan dengan NumPy.
+
+    Env yang selesai (idx mencapai akhir data) langsung di-reset ke start baru;
+    observasi terakhirnya ada di info["terminal_observation"] seperti DummyVecEnv.
+
+    Args:
+        close_prices: array close 1D (dipakai bersama semua env, tanpa copy jika float32)
+        n_envs: jumlah env paralel
+        window: panjang window observasi
+        spread: biaya spread saat membuka posisi
+        commission: komisi flat saat open/flip (per sisi)
+        reverse: flip aksi Buy<->Sell
+        random_start: True = idx awal episode diacak (lihat start_range), False = selalu window
+        seed: seed RNG start episode
+        episode_length: batas step per episode (None = sampai akhir data)
+        obs_mode: mode observasi (lihat build_observations)
+        features: matriks fitur (N, F) sejajar close_prices untuk observasi multi-fitur
+    """
+
+    def __init__(
+        self,
+        close_prices: np.ndarray,
+        n_envs: int = 8,
+        window: int = 4,
+        spread: float = 0.0,
+        commission: float = 0.0,
+        reverse: bool = False,
+        random_start: bool = True,
+        seed: Optional[int] = None,
+        episode_length: Optional[int] = None,
+        obs_mode: str = "close",
+        features: Optional[np.ndarray] = None,
+    ):
+        close = np.asarray(close_prices, dtype=np.float32)
+        assert close.ndim == 1 and len(close) > window + 2, "Need 1D close prices longer than window."
+        self.prices = close
+        self.window = int(window)
+        self.spread = float(spread)
+        self.commission = float(commission)
+        self.reverse = bool(reverse)
+        self.random_start = bool(random_start)
+        self.episode_length = int(episode_length) if episode_length else None
+        self.obs_mode = obs_mode
+        if features is not None:
+            assert len(features) == len(close), "features harus sejajar dengan close_prices"
+        self._observations = build_observations(close, self.window, obs_mode, features)
+        self._rng = np.random.default_rng(seed)
+
+        observation_space = observation_space_for(
+            self.window, obs_mode, None if features is None else features.shape[1])
+        self.render_mode = None
+        super().__init__(n_envs, observation_space, spaces.Discrete(3))
+
+        self.idx = np.full(n_envs, self.window, dtype=np.int64)
+        self.start = self.idx.copy()
+        self.position = np.zeros(n_envs, dtype=np.int64)
+        self.entry_price = np.zeros(n_envs, dtype=np.float64)
+        self.total_reward = np.zeros(n_envs, dtype=np.float64)
+        self._actions = np.zeros(n_envs, dtype=np.int64)
+
+    def _start_indices(self, count: int) -> np.ndarray:
+        if self.random_start:
+            lo, hi = start_range(len(self.prices), self.window, self.episode_length)
+            return self._rng.integers(lo, hi + 1, size=count)
+        return np.full(count, self.window, dtype=np.int64)
+
+    def _reset_envs(self, mask: np.ndarray) -> None:
+        self.idx[mask] = self._start_indices(int(mask.sum()))
+        self.start[mask] = self.idx[mask]
+        self.position[mask] = 0
+        self.entry_price[mask] = 0.0
+        self.total_reward[mask] = 0.0
+
+    def _obs(self) -> np.ndarray:
+        return self._observations[self.idx - self.window]
+
+    def seed(self, seed: Optional[int] = None) -> Sequence[Optional[int]]:
+        self._rng = np.random.default_rng(seed)
+        return [seed] * self.num_envs
+
+    def reset(self) -> np.ndarray:
+        self._reset_envs(np.ones(self.num_envs, dtype=bool))
+        self.reset_infos = [{} for _ in range(self.num_envs)]
+        return self._obs()
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self._actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self):
+        action = self._actions
+        if self.reverse:
+            action = np.where(action == 1, 2, np.where(action == 2, 1, 0))
+
+        close = self.prices
+        prev_price = close[self.idx - 1].astype(np.float64)
+        self.idx += 1
+        curr_price = close[self.idx - 1].astype(np.float64)
+        price_change = curr_price - prev_price
+        pos = self.position
+
+        buy = action == 1
+        sell = action == 2
+        opened = (buy | sell) & (pos == 0)
+        flip = (buy & (pos == -1)) | (sell & (pos == 1))
+        # Urutan operasi sama dengan versi scalar agar reward identik sampai bit terakhir
+        reward = np.where(buy & flip, self.entry_price - (curr_price + self.spread), 0.0)
+        reward = np.where(sell & flip, (curr_price - self.spread) - self.entry_price, reward)
+        reward = reward - np.where(opened | flip, self.commission, 0.0)
+        reward = reward - np.where(flip, self.commission, 0.0)
+
+        trade = opened | flip
+        new_pos = np.where(buy, 1, -1)
+        self.entry_price = np.where(trade, np.where(buy, curr_price + self.spread, curr_price - self.spread),
+                                    self.entry_price)
+        self.position = np.where(trade, new_pos, pos)
+
+        # Shaped reward: unrealized PnL dari perubahan harga berjalan
+        reward = np.where(self.position == 1, reward + price_change,
+                          np.where(self.position == -1, reward - price_change, reward))
+        self.total_reward += reward
+
+        terminated = self.idx >= len(close)
+        if self.episode_length is not None:
+            truncated = ~terminated & (self.idx - self.start >= self.episode_length)
+            dones = terminated | truncated
+        else:
+            truncated = np.zeros_like(terminated)
+            dones = terminated
+        obs = self._obs()
+        # tolist() sekali per array jauh lebih murah daripada konversi scalar per env
+        infos: List[dict] = [
+            {"idx": i, "position": p, "entry_price": e, "total_reward": t}
+            for i, p, e, t in zip(self.idx.tolist(), self.position.tolist(),
+                                  self.entry_price.tolist(), self.total_reward.tolist())
+        ]
+        if dones.any():
+            for k in np.flatnonzero(dones):
+                infos[k]["terminal_observation"] = obs[k]
+                infos[k]["TimeLimit.truncated"] = bool(truncated[k])
+            self._reset_envs(dones)
+            obs = self._obs()
+        return obs, reward.astype(np.float32), dones, infos
+
+    def close(self) -> None:
+        pass
+
+    def get_attr(self, attr_name: str, indices: VecEnvIndices = None) -> List[Any]:
+        value = getattr(self, attr_name)
+        return [value for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name: str, value: Any, indices: VecEnvIndices = None) -> None:
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name: str, *method_args, indices: VecEnvIndices = None, **method_kwargs) -> List[Any]:
+        method = getattr(self, method_name)
+        return [method(*method_args, **method_kwargs) for _ in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices: VecEnvIndices = None) -> List[bool]:
+        return [False for _ in self._get_indices(indices)]
+
+
+class SharedPrices:
+    """
+    Array float32 (harga 1D atau matriks fitur 2D) di shared memory. Saat di-pickle
+    (mis. ke SubprocVecEnv) hanya nama segmen & shape yang dikirim; proses tujuan
+    memetakan segmen yang sama.
+
+    Args:
+        prices: array yang disalin sekali ke shared memory
+    """
+
+    def __init__(self, prices: np.ndarray):
+        prices = np.asarray(prices, dtype=np.float32)
+        self.shape = prices.shape
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, prices.nbytes))
+        self.name = self._shm.name
+        self._owner = True
+        self.array[:] = prices
+
+    @property
+    def array(self) -> np.ndarray:
+        return np.ndarray(self.shape, dtype=np.float32, buffer=self._shm.buf)
+
+    def __getstate__(self):
+        return {"name": self.name, "shape": self.shape}
+
+    def __setstate__(self, state) -> None:
+        self.name = state["name"]
+        self.shape = tuple(state["shape"])
+        self._shm = shared_memory.SharedMemory(name=self.name)
+        self._owner = False
+
+    def release(self) -> None:
+        """Lepas segmen; pemilik (proses pembuat) juga menghapusnya."""
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+def split_slices(n: int, n_envs: int, window: int) -> List[Tuple[int, int]]:
+    """
+    Bagi [0, n) menjadi n_envs slice berurutan yang tidak saling tumpang tindih
+    (kecuali `window` bar di depan agar observasi pertama tiap slice valid).
+    """
+    bounds = np.linspace(0, n, n_envs + 1).astype(np.int64)
+    slices = [(max(0, int(lo) - window), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:])]
+    if any(hi - lo <= window + 2 for lo, hi in slices):
+        raise ValueError(f"Data ({n} bar) terlalu pendek untuk {n_envs} env dengan window {window}")
+    return slices
+
+
+class SliceEnvFactory:
+    """
+    Pembuat SimpleTradingEnv di atas slice [start, stop) dari array harga (dan matriks
+    fitur jika ada); np.ndarray untuk DummyVecEnv, SharedPrices untuk SubprocVecEnv.
+    """
+
+    def __init__(self, prices: Union[np.ndarray, SharedPrices], start: int, stop: int,
+                 features: Union[np.ndarray, SharedPrices, None] = None, **env_kwargs):
+        self.prices = prices
+        self.features = features
+        self.start = int(start)
+        self.stop = int(stop)
+        self.env_kwargs = env_kwargs
+
+    def __call__(self) -> SimpleTradingEnv:
+        sl = slice(self.start, self.stop)
+        features = _as_array(self.features)
+        env = SimpleTradingEnv(_as_array(self.prices)[sl], features=None if features is None else features[sl],
+                               **self.env_kwargs)
+        # Jaga segmen shared memory tetap terpetakan selama env hidup
+        env.shared_arrays = (self.prices, self.features)
+        return env
+
+
+def _as_array(source):
+    return source.array if isinstance(source, SharedPrices) else source
+
+
+def _benchmark(n_envs: int, steps: int) -> None:
+    import time
+    from stable_baselines3.common.vec_env import DummyVecEnv
+
+    close = (2000 + np.cumsum(np.random.default_rng(1).normal(0, 1, 1_000_000))).astype(np.float32)
+    actions = np.random.default_rng(2).integers(0, 3, size=(steps, n_envs))
+    for name, venv in [
+        ("DummyVecEnv", DummyVecEnv([lambda: SimpleTradingEnv(close)] * n_envs)),
+        ("BatchTradingVecEnv", BatchTradingVecEnv(close, n_envs=n_envs, seed=0)),
+    ]:
+        venv.reset()
+        t0 = time.perf_counter()
+        for a in actions:
+            venv.step(a)
+        dt = time.perf_counter() - t0
+        print(f"{name:<20} {n_envs} env: {steps * n_envs / dt:12,.0f} env-step/s")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark BatchTradingVecEnv")
+    parser.add_argument("--n_envs", type=int, default=16)
+    parser.add_argument("--steps", type=int, default=20_000)
+    bench_args = parser.parse_args()
+    _benchmark(bench_args.n_envs, bench_args.steps)
@@ -0,0 +1,161 @@
+"""
+Logger CSV asinkron dengan batching untuk log transaksi bot.
+
+Pemanggil (hot loop) hanya memasukkan baris ke antrean berukuran tetap; thread
+latar belakang memegang SATU file handle yang terbuka sepanjang sesi dan menulis
+baris secara batch (flush jika batch penuh atau interval waktu terlewati).
+
+Kebijakan saat antrean penuh:
+- "drop"  : baris baru dibuang (tidak pernah mem-blok order), jumlahnya dicatat
+- "block" : pemanggil menunggu maksimal `block_timeout` detik (backpressure), lalu dibuang
+"""
+
+import atexit
+import csv
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+
+_STOP = object()
+
+
+class AsyncCsvLogger:
+    """
+    Penulis CSV berbasis thread dengan antrean terbatas.
+
+    Args:
+        path: path file CSV
+        fieldnames: urutan kolom CSV
+        max_queue: kapasitas antrean (baris)
+        batch_size: jumlah baris maksimal per batch tulis
+        flush_interval: batas waktu (detik) sebelum batch yang belum penuh ditulis
+        policy: "drop" atau "block" saat antrean penuh
+        block_timeout: waktu tunggu maksimal untuk policy "block"
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fieldnames: List[str],
+        max_queue: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+        policy: str = "drop",
+        block_timeout: float = 0.01,
+    ):
+        if policy not in ("drop", "block"):
+            raise ValueError(f"Policy logger tidak dikenal: {policy}")
+        self.path = path
+        self.fieldnames = list(fieldnames)
+        self.batch_size = int(batch_size)
+        self.flush_interval = float(flush_interval)
+        self.policy = policy
+        self.block_timeout = float(block_timeout)
+        self.dropped = 0
+        self.written = 0
+        self._reported_dropped = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._closed = False
+
+        write_header = not os.path.isfile(path) or os.path.getsize(path) == 0
+        self._file = open(path, mode="a", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames)
+        if write_header:
+            self._writer.writeheader()
+            self._file.flush()
+
+        self._thread = threading.Thread(target=self._run, name=f"AsyncCsvLogger[{os.path.basename(path)}]", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, row: Dict) -> bool:
+        """Masukkan satu baris ke antrean. Return False jika baris dibuang."""
+        if self._closed:
+            return False
+        try:
+            if self.policy == "block":
+                self._queue.put(row, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self, timeout: Optional[float] = 5.0) -> None:
+        """Tunggu sampai semua baris yang sudah diantrekan ditulis ke disk."""
+        if self._closed:
+            return
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return
+        done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        Tulis sisa antrean, hentikan thread dan tutup file.
+
+        Menunggu maksimal `timeout` detik: jika thread penulis macet (antrean tetap penuh),
+        sisa baris ditinggalkan agar shutdown bot tidak menggantung.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        deadline = time.monotonic() + timeout
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        if self._thread.is_alive():
+            print(f"[PERINGATAN] Logger {self.path} tidak selesai dalam {timeout:.1f}s, "
+                  f"{self._queue.qsize()} baris log tidak ditulis.")
+        try:
+            self._file.close()
+        except Exception:
+            pass
+
+    def _write_batch(self, batch: List[Dict]) -> None:
+        if batch:
+            try:
+                self._writer.writerows(batch)
+                self._file.flush()
+                self.written += len(batch)
+            except Exception as e:
+                print(f"[ERROR] Gagal mencatat log ke CSV: {e}")
+            batch.clear()
+        if self.dropped != self._reported_dropped:
+            print(f"[PERINGATAN] Antrean log penuh, {self.dropped - self._reported_dropped} baris log dibuang.")
+            self._reported_dropped = self.dropped
+
+    def _run(self) -> None:
+        batch: List[Dict] = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._write_batch(batch)
+                deadline = None
+                continue
+
+            if item is _STOP:
+                self._write_batch(batch)
+                return
+            if isinstance(item, threading.Event):
+                self._write_batch(batch)
+                deadline = None
+                item.set()
+                continue
+
+            batch.append(item)
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+            if len(batch) >= self.batch_size:
+                self._write_batch(batch)
+                deadline = None
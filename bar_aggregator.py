@@ -0,0 +1,210 @@
+"""
+Resampler OHLCV incremental: membangun bar M5/M15/M30/H1 dari ring buffer M1.
+
+`TimeframeAggregator.on_m1(bar)` bekerja O(1) per bar M1:
+- agregat bar M1 yang sudah final di bucket aktif disimpan terpisah (`_partial`),
+- bar M1 terakhir (mungkin masih terbentuk) digabung di atasnya setiap update,
+sehingga update berulang pada bar M1 yang sama tidak menghitung volume dua kali.
+
+`MultiTimeframeBars` mengambil histori native tiap timeframe SEKALI dari terminal
+(seed), lalu hanya diberi makan bar M1 baru dari `BarRingBuffer`. Tidak ada
+round-trip terminal tambahan per tick.
+
+`resample_rates()` adalah versi batch (NumPy, vectorized) untuk histori panjang.
+
+Benchmark vs pandas.DataFrame.resample (1 tahun bar M1 sintetis; paritas: tests/test_bar_aggregator.py):
+    python bar_aggregator.py --days 365
+"""
+
+from typing import Dict, Optional
+
+import numpy as np  # type: ignore
+
+from bar_buffer import RATES_DTYPE, BarRing
+
+# Nama timeframe -> durasi bar (detik)
+TIMEFRAMES = {"M5": 300, "M15": 900, "M30": 1800, "H1": 3600}
+
+
+def resample_rates(rates: np.ndarray, period_seconds: int) -> np.ndarray:
+    """
+    Resample batch bar (RATES_DTYPE, urut waktu) ke periode yang lebih besar.
+    Bucket disejajarkan ke kelipatan `period_seconds` seperti bar MT5.
+    """
+    if len(rates) == 0:
+        return np.zeros(0, dtype=RATES_DTYPE)
+    bucket = rates["time"] - rates["time"] % period_seconds
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(rates)] - 1
+    out = np.zeros(len(starts), dtype=RATES_DTYPE)
+    out["time"] = bucket[starts]
+    out["open"] = rates["open"][starts]
+    out["high"] = np.maximum.reduceat(rates["high"], starts)
+    out["low"] = np.minimum.reduceat(rates["low"], starts)
+    out["close"] = rates["close"][ends]
+    out["tick_volume"] = np.add.reduceat(rates["tick_volume"], starts)
+    out["spread"] = rates["spread"][ends]
+    out["real_volume"] = np.add.reduceat(rates["real_volume"], starts)
+    return out
+
+
+class TimeframeAggregator:
+    """
+    Args:
+        period_seconds: durasi bar target (mis. 300 untuk M5)
+        capacity: jumlah bar target yang disimpan
+    """
+
+    def __init__(self, period_seconds: int, capacity: int = 120):
+        self.period = int(period_seconds)
+        self.bars = BarRing(capacity)
+        self._partial: Optional[dict] = None    # agregat M1 final di bucket aktif
+        self._last_m1: Optional[dict] = None    # bar M1 terakhir (mungkin masih terbentuk)
+        self._min_bucket: Optional[int] = None  # bucket sebelum ini sudah final dari seed
+
+    def seed(self, rates: np.ndarray) -> None:
+        """
+        Isi histori dari bar native terminal. Bar terakhir (bucket yang masih
+        terbentuk) dibuang; bucket itu dibangun ulang dari bar M1.
+        """
+        self.bars.clear()
+        self._partial = None
+        self._last_m1 = None
+        complete = rates[:-1] if len(rates) else rates
+        for bar in complete:
+            self.bars.push(bar)
+        self._min_bucket = self.bars.last_time + self.period if len(complete) else None
+
+    def on_m1(self, bar) -> None:
+        """Masukkan satu bar M1 baru atau versi terbaru dari bar M1 terakhir."""
+        t = int(bar["time"])
+        bucket = t - t % self.period
+        if self._min_bucket is not None and bucket < self._min_bucket:
+            return
+        last = self._last_m1
+        if last is not None:
+            if t < last["time"]:
+                return
+            if t > last["time"]:
+                # Bar M1 sebelumnya sudah final: lipat ke partial (atau mulai bucket baru)
+                last_bucket = last["time"] - last["time"] % self.period
+                self._partial = self._merge(self._partial, last, bucket) if last_bucket == bucket else None
+        self._last_m1 = {name: bar[name] for name in RATES_DTYPE.names}
+        self.bars.push(self._merge(self._partial, self._last_m1, bucket))
+
+    @staticmethod
+    def _merge(agg: Optional[dict], bar: dict, bucket: int) -> dict:
+        if agg is None:
+            out = dict(bar)
+            out["time"] = bucket
+            return out
+        return {
+            "time": bucket,
+            "open": agg["open"],
+            "high": max(agg["high"], bar["high"]),
+            "low": min(agg["low"], bar["low"]),
+            "close": bar["close"],
+            "tick_volume": agg["tick_volume"] + bar["tick_volume"],
+            "spread": bar["spread"],
+            "real_volume": agg["real_volume"] + bar["real_volume"],
+        }
+
+
+class MultiTimeframeBars:
+    """
+    Bar M5/M15/M30/H1 yang dijaga tetap sinkron dengan ring buffer M1.
+
+    Args:
+        m1_buffer: BarRingBuffer M1 (harus mencakup minimal satu bucket timeframe terbesar)
+        mt5_module: modul MT5 untuk seed histori native (None = tanpa seed)
+        timeframes: dict nama -> detik (default TIMEFRAMES)
+        capacity: jumlah bar per timeframe
+    """
+
+    def __init__(self, m1_buffer, mt5_module=None, timeframes: Optional[Dict[str, int]] = None,
+                 capacity: int = 120):
+        self.m1 = m1_buffer
+        self.mt5 = mt5_module
+        self.timeframes = dict(timeframes or TIMEFRAMES)
+        self.capacity = int(capacity)
+        self.aggregators = {name: TimeframeAggregator(sec, capacity) for name, sec in self.timeframes.items()}
+        self._seeded = False
+        self._last_fed_time: Optional[int] = None
+
+    def seed(self) -> None:
+        """Ambil histori native tiap timeframe sekali (satu panggilan per timeframe)."""
+        if self.mt5 is not None:
+            for name, agg in self.aggregators.items():
+                tf = getattr(self.mt5, f"TIMEFRAME_{name}", None)
+                if tf is None:
+                    continue
+                rates = self.mt5.copy_rates_from_pos(self.m1.symbol, tf, 0, self.capacity + 1)
+                if rates is not None and len(rates):
+                    agg.seed(rates)
+        self._seeded = True
+        self._last_fed_time = None
+
+    def update(self) -> None:
+        """Teruskan bar M1 baru/berubah sejak update terakhir ke semua aggregator."""
+        if not self._seeded:
+            self.seed()
+        if len(self.m1) == 0:
+            return
+        cols = self.m1.columns()
+        times = cols["time"]
+        start = 0
+        if self._last_fed_time is not None:
+            start = int(np.searchsorted(times, self._last_fed_time, side="left"))
+        for i in range(start, len(times)):
+            bar = {name: col[i] for name, col in cols.items()}
+            for agg in self.aggregators.values():
+                agg.on_m1(bar)
+        self._last_fed_time = int(times[-1])
+
+    def columns(self, name: str) -> Dict[str, np.ndarray]:
+        """Dict kolom view zero-copy untuk timeframe `name` (mis. "M5")."""
+        return self.aggregators[name].bars.columns()
+
+
+def _benchmark(days: int) -> None:
+    import time
+    import pandas as pd  # type: ignore
+    import fake_mt5
+
+    n = days * 24 * 60
+    rates = fake_mt5.synthetic_rates(1_700_000_000 - 1_700_000_000 % 86400, n)
+    print(f"Benchmark resample {n} bar M1 ({days} hari)")
+
+    df = pd.DataFrame(rates)
+    df.index = pd.to_datetime(df["time"], unit="s")
+    agg_rules = {"open": "first", "high": "max", "low": "min", "close": "last", "tick_volume": "sum"}
+    for name, sec in TIMEFRAMES.items():
+        t0 = time.perf_counter()
+        pdr = df.resample(f"{sec}s").agg(agg_rules).dropna()
+        t_pd = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        npr = resample_rates(rates, sec)
+        t_np = time.perf_counter() - t0
+        print(f"{name:<4} pandas.resample={t_pd * 1000:8.1f} ms  numpy batch={t_np * 1000:7.1f} ms "
+              f"({len(pdr)} -> {len(npr)} bar)")
+
+    # Incremental: biaya per bar M1 baru untuk keempat timeframe sekaligus
+    aggs = [TimeframeAggregator(sec, capacity=120) for sec in TIMEFRAMES.values()]
+    sample = rates[: min(n, 200_000)]
+    bars = [{name: row[name] for name in RATES_DTYPE.names} for row in sample]
+    t0 = time.perf_counter()
+    for bar in bars:
+        for agg in aggs:
+            agg.on_m1(bar)
+    per_bar = (time.perf_counter() - t0) / len(bars)
+    print(f"Incremental 4 timeframe: {per_bar * 1e6:.2f} us per bar M1")
+    print("pandas.resample per update harus memproses ulang seluruh histori; incremental O(1) per bar.")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark resampler incremental vs pandas.resample")
+    parser.add_argument("--days", type=int, default=365)
+    bench_args = parser.parse_args()
+    _benchmark(bench_args.days)
@@ -0,0 +1,167 @@
+"""
+Ring buffer bar OHLCV berbasis NumPy, di-update incremental dari MetaTrader5.
+
+Dulu setiap iterasi mengambil 120 bar M1 empat kali (`copy_rates_from_pos`) lalu
+membuat empat DataFrame baru. `BarRingBuffer` mengambil histori penuh SEKALI,
+kemudian setiap update hanya meminta 2 bar terbaru (bar yang sedang terbentuk
++ bar sebelumnya) dan menimpa/menambah slot di ring. Jika update terlewat lebih
+dari satu bar, jendela diperlebar sampai bar terakhir di buffer agar versi
+finalnya tetap masuk.
+
+Tiap kolom disimpan dalam array ganda (2 x capacity) dan setiap bar ditulis di
+dua posisi, sehingga `column()` selalu mengembalikan view NumPy yang kontigu
+(zero-copy) berurutan dari bar terlama ke terbaru. Penyimpanan ini (`BarRing`)
+juga dipakai bar_aggregator.py untuk timeframe yang lebih tinggi.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np  # type: ignore
+
+# Layout sama dengan array hasil mt5.copy_rates_*
+RATES_DTYPE = np.dtype([
+    ("time", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("tick_volume", "<u8"),
+    ("spread", "<i4"),
+    ("real_volume", "<u8"),
+])
+
+
+class BarRing:
+    """
+    Penyimpanan ring bar OHLCV (struktur kolom) tanpa akses terminal.
+
+    `push(bar)` menimpa bar terakhir jika waktunya sama (bar yang sedang terbentuk),
+    menambah jika lebih baru, dan mengabaikan bar yang lebih lama.
+    """
+
+    def __init__(self, capacity: int = 120):
+        if capacity < 2:
+            raise ValueError("capacity minimal 2")
+        self.capacity = int(capacity)
+        self._cols: Dict[str, np.ndarray] = {
+            name: np.zeros(2 * self.capacity, dtype=RATES_DTYPE[name]) for name in RATES_DTYPE.names
+        }
+        self._head = 0   # index slot bar terlama
+        self._size = 0
+        self.appended = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_time(self) -> Optional[int]:
+        if self._size == 0:
+            return None
+        return int(self._cols["time"][self._head + self._size - 1])
+
+    def column(self, name: str) -> np.ndarray:
+        """View kontigu (read-only) kolom `name`, urut dari bar terlama ke terbaru."""
+        view = self._cols[name][self._head:self._head + self._size]
+        view.flags.writeable = False
+        return view
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Semua kolom sebagai dict view zero-copy."""
+        return {name: self.column(name) for name in RATES_DTYPE.names}
+
+    def clear(self) -> None:
+        self._head = 0
+        self._size = 0
+
+    def push(self, bar) -> None:
+        t = int(bar["time"])
+        last = self.last_time
+        if last is not None and t < last:
+            return  # bar lama yang sudah ada di buffer
+        if last is not None and t == last:
+            slot = self._head + self._size - 1  # bar yang sedang terbentuk: timpa
+        elif self._size < self.capacity:
+            slot = self._head + self._size
+            self._size += 1
+            self.appended += 1
+        else:
+            # Buffer penuh: geser head, bar terbaru menempati slot bar terlama
+            slot = self._head
+            self._head = (self._head + 1) % self.capacity
+            self.appended += 1
+        slot %= self.capacity
+        for name, col in self._cols.items():
+            col[slot] = bar[name]
+            col[slot + self.capacity] = bar[name]
+
+
+class BarRingBuffer(BarRing):
+    """
+    BarRing yang disinkronkan dengan terminal MetaTrader5.
+
+    Args:
+        mt5_module: modul MetaTrader5 (atau fake_mt5.FakeMT5)
+        symbol: simbol
+        timeframe: konstanta timeframe MT5 (mis. mt5.TIMEFRAME_M1)
+        capacity: jumlah bar yang disimpan
+        bar_seconds: durasi satu bar dalam detik (60 untuk M1), untuk menghitung bar yang terlewat
+        fetch_count: jumlah bar terbaru yang diambil per update (default 2)
+    """
+
+    def __init__(self, mt5_module, symbol: str, timeframe, capacity: int = 120,
+                 bar_seconds: int = 60, fetch_count: int = 2):
+        if fetch_count < 1:
+            raise ValueError("fetch_count minimal 1")
+        super().__init__(capacity)
+        self.mt5 = mt5_module
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.bar_seconds = int(bar_seconds)
+        self.fetch_count = int(fetch_count)
+        # Statistik untuk debugging / benchmark
+        self.full_fetches = 0
+        self.bars_fetched = 0
+
+    def update(self) -> bool:
+        """
+        Sinkronkan buffer dengan terminal. Return False jika data tidak tersedia.
+
+        Jendela yang diambil selalu mencakup bar terakhir di buffer (`last_time`), sehingga
+        bar yang tadinya masih terbentuk mendapat OHLC final walaupun beberapa update terlewat.
+        """
+        if self._size == 0:
+            return self._fetch_full()
+        rates = self._fetch(self.fetch_count)
+        if rates is None:
+            return False
+        if int(rates[0]["time"]) > self.last_time:
+            # Update terlewat >= fetch_count bar: ambil ulang sejak last_time (jumlah bar
+            # dari selisih waktu adalah batas atas, jadi jendela pasti mencapai last_time)
+            needed = (int(rates[-1]["time"]) - self.last_time) // self.bar_seconds + 1
+            if needed >= self.capacity:
+                return self._fetch_full()
+            rates = self._fetch(needed)
+            if rates is None:
+                return False
+            if int(rates[0]["time"]) > self.last_time:
+                return self._fetch_full()
+        for bar in rates:
+            self.push(bar)
+        return True
+
+    def _fetch(self, count: int) -> Optional[np.ndarray]:
+        rates = self.mt5.copy_rates_from_pos(self.symbol, self.timeframe, 0, count)
+        if rates is None or len(rates) == 0:
+            return None
+        self.bars_fetched += len(rates)
+        return rates
+
+    def _fetch_full(self) -> bool:
+        rates = self._fetch(self.capacity)
+        if rates is None:
+            return False
+        self.full_fetches += 1
+        self.clear()
+        for bar in rates[-self.capacity:]:
+            self.push(bar)
+        return True
@@ -0,0 +1,119 @@
+"""
+Jam (clock) yang bisa diinjeksikan untuk semua timing bot.
+
+trading_loop dulu mencampur `time.time()`, `datetime.now()` dan `time.sleep()`
+(termasuk loop `sleep(300)` menunggu jam 04:00). Semua timing kini lewat satu
+objek `Clock`:
+- `monotonic()` : interval (window ON/PAUSE, jeda open 1 detik, scheduler, report);
+                  tidak ikut lompat saat jam sistem disetel/NTP
+- `now()`       : waktu kalender lokal (jam trading, reset harian, target jam 04:00, timestamp log)
+- `sleep(s)`    : menunggu
+
+`SystemClock` dipakai di produksi. `VirtualClock` memajukan waktu tanpa tidur
+sehingga replay/test berjalan ribuan kali lebih cepat dari waktu nyata.
+
+Skrip bot mengambil jam lewat `get_clock()`; replay_harness.py memasang
+VirtualClock dengan `install_clock()` sebelum skrip dijalankan.
+"""
+
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Optional
+
+
+class ClockStopped(BaseException):
+    """
+    Dilempar VirtualClock saat waktu akhir tercapai. Turunan BaseException agar
+    tidak tertangkap blok `except Exception` di dalam trading_loop.
+    """
+
+
+class Clock(ABC):
+    """Antarmuka jam bot."""
+
+    @abstractmethod
+    def monotonic(self) -> float:
+        """Detik monotonic untuk perhitungan interval."""
+
+    @abstractmethod
+    def now(self) -> datetime:
+        """Waktu kalender lokal."""
+
+    @abstractmethod
+    def sleep(self, seconds: float) -> None:
+        """Tunggu `seconds` detik."""
+
+
+class SystemClock(Clock):
+    """Jam produksi: interval dari time.monotonic, kalender dari datetime.now."""
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(max(0.0, seconds))
+
+
+class VirtualClock(Clock):
+    """
+    Jam virtual: sleep() memajukan waktu tanpa benar-benar tidur.
+
+    Args:
+        start: waktu unix awal (dipakai untuk now() dan time())
+        end: waktu unix akhir; sleep yang mencapainya melempar ClockStopped
+        charge_compute: True = waktu komputasi nyata ikut memajukan jam (loop yang
+            lambat melewatkan tick seperti di live); False = deterministik
+    """
+
+    def __init__(self, start: float, end: Optional[float] = None, charge_compute: bool = False):
+        self._now = float(start)
+        self.end = end
+        self.charge_compute = charge_compute
+        self._mark = time.perf_counter()
+        self.sleeps = 0
+        self.slept = 0.0
+
+    def _charge(self) -> None:
+        if self.charge_compute:
+            mark = time.perf_counter()
+            self._now += mark - self._mark
+            self._mark = mark
+
+    def time(self) -> float:
+        """Waktu unix virtual (untuk fake_mt5 / feed tick)."""
+        self._charge()
+        return self._now
+
+    def monotonic(self) -> float:
+        return self.time()
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.time())
+
+    def sleep(self, seconds: float) -> None:
+        self._charge()
+        seconds = max(0.0, float(seconds))
+        self.sleeps += 1
+        self.slept += seconds
+        self._now += seconds
+        if self.end is not None and self._now >= self.end:
+            raise ClockStopped()
+
+
+_installed: Clock = SystemClock()
+
+
+def get_clock() -> Clock:
+    """Jam yang sedang terpasang (default SystemClock)."""
+    return _installed
+
+
+def install_clock(clock: Clock) -> Clock:
+    """Pasang `clock` sebagai jam global; return jam sebelumnya (untuk dipulihkan)."""
+    global _installed
+    previous, _installed = _installed, clock
+    return previous
@@ -0,0 +1,252 @@
+"""
+Store data pasar kolumnar yang di-memory-map, pengganti CSV antar langkah trainer
+(import MT5 -> preprocessing -> PPO trainer).
+
+Layout store (sebuah direktori, mis. data_XAUUSD_mt5.cols/):
+    manifest.json   {"version", "length", "columns": [{"name", "dtype", "categories"}]}
+    <kolom>.bin     isi kolom mentah (little-endian), `length` elemen
+
+File kolom sengaja berupa array biner mentah (bukan .npy) agar bisa di-append tanpa
+menulis ulang header; dtype & panjang dicatat di manifest. `ColumnStore.column()`
+mengembalikan np.memmap read-only (zero-copy, tanpa parsing). Kolom teks
+(mis. sr_zone) disimpan sebagai kode int16 + daftar kategori di manifest.
+
+Manifest adalah sumber kebenaran: byte di file kolom setelah `length` (mis. sisa
+proses yang terhenti sebelum manifest ditulis) dibuang saat store dibuka untuk append.
+
+CSV tetap tersedia, tapi hanya sebagai format ekspor (`export_csv`) dan untuk
+mengimpor data lama (`import_csv`).
+"""
+
+import json
+import os
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+
+STORE_VERSION = 1
+MANIFEST = "manifest.json"
+STORE_SUFFIX = ".cols"
+_CODE_DTYPE = np.dtype("<i2")
+
+
+def is_store(path: str) -> bool:
+    """True jika `path` adalah direktori store kolumnar."""
+    return os.path.isfile(os.path.join(path, MANIFEST))
+
+
+def store_path_for(path: str) -> str:
+    """data_X_mt5.csv -> data_X_mt5.cols (path store pasangan sebuah file CSV)."""
+    root, ext = os.path.splitext(path)
+    return path if ext == STORE_SUFFIX else root + STORE_SUFFIX
+
+
+def _column_file(path: str, name: str) -> str:
+    return os.path.join(path, f"{name}.bin")
+
+
+def _read_manifest(path: str) -> Dict:
+    with open(os.path.join(path, MANIFEST), "r") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != STORE_VERSION:
+        raise ValueError(f"Versi store {manifest.get('version')} tidak didukung (butuh {STORE_VERSION}): {path}")
+    return manifest
+
+
+class ColumnStore:
+    """
+    Pembaca store kolumnar (read-only, memory-mapped).
+
+    Args:
+        path: direktori store
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        manifest = _read_manifest(path)
+        self.length = int(manifest["length"])
+        self._meta = {c["name"]: c for c in manifest["columns"]}
+        self.columns: List[str] = [c["name"] for c in manifest["columns"]]
+        self._maps: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._meta
+
+    def column(self, name: str) -> np.ndarray:
+        """Kolom `name` sebagai memmap read-only (kode int untuk kolom teks)."""
+        arr = self._maps.get(name)
+        if arr is None:
+            dtype = np.dtype(self._meta[name]["dtype"])
+            if self.length == 0:
+                arr = np.zeros(0, dtype=dtype)
+            else:
+                arr = np.memmap(_column_file(self.path, name), dtype=dtype, mode="r", shape=(self.length,))
+            self._maps[name] = arr
+        return arr
+
+    def last(self, name: str):
+        """Elemen terakhir kolom `name` dibaca langsung dari file (tanpa memmap yang tertinggal)."""
+        if self.length == 0:
+            return None
+        dtype = np.dtype(self._meta[name]["dtype"])
+        return np.fromfile(_column_file(self.path, name), dtype=dtype, count=1,
+                           offset=(self.length - 1) * dtype.itemsize)[0]
+
+    def values(self, name: str, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """Nilai kolom [start:stop]; kolom teks di-decode ke array string (copy)."""
+        arr = self.column(name)[start:stop]
+        categories = self._meta[name].get("categories")
+        if categories is None:
+            return arr
+        return np.asarray(categories, dtype=object)[arr]
+
+    def frame(self, start: int = 0, stop: Optional[int] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """DataFrame untuk baris [start:stop] (tanpa parsing teks)."""
+        cols = columns or self.columns
+        return pd.DataFrame({name: self.values(name, start, stop) for name in cols})
+
+    def iter_frames(self, chunksize: int, start: int = 0, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        for lo in range(start, self.length, chunksize):
+            yield self.frame(lo, min(lo + chunksize, self.length), columns)
+
+    def export_csv(self, csv_path: str, chunksize: int = 200_000, columns: Optional[List[str]] = None) -> None:
+        """Ekspor ke CSV (per chunk, tanpa index)."""
+        with open(csv_path, "w", newline="") as f:
+            header = True
+            for frame in self.iter_frames(chunksize, columns=columns):
+                frame.to_csv(f, index=False, header=header)
+                header = False
+            if header:
+                pd.DataFrame(columns=columns or self.columns).to_csv(f, index=False)
+
+
+class ColumnStoreWriter:
+    """
+    Penulis store kolumnar, mendukung append per chunk.
+
+    Args:
+        path: direktori store
+        append: True = lanjutkan store yang ada, False = buat ulang dari kosong
+    """
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._columns: Optional[List[Dict]] = None
+        self.length = 0
+        self._files: Dict = {}
+        if append and is_store(path):
+            manifest = _read_manifest(path)
+            self._columns = manifest["columns"]
+            self.length = int(manifest["length"])
+            # Buang byte setelah `length` dari proses sebelumnya yang terhenti
+            self.truncate(self.length)
+        else:
+            manifest_path = os.path.join(path, MANIFEST)
+            if os.path.isfile(manifest_path):
+                os.remove(manifest_path)
+            for name in os.listdir(path):
+                if name.endswith(".bin"):
+                    os.remove(os.path.join(path, name))
+
+    def __enter__(self) -> "ColumnStoreWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def append(self, frame: pd.DataFrame) -> None:
+        """Tambahkan baris `frame` (kolom sama dengan chunk pertama; index diabaikan)."""
+        if self._columns is None:
+            self._columns = [self._describe(name, frame[name]) for name in frame.columns]
+        names = [c["name"] for c in self._columns]
+        if list(frame.columns) != names:
+            raise ValueError(f"Kolom chunk {list(frame.columns)} tidak sama dengan store {names}")
+        for meta in self._columns:
+            data = self._encode(meta, frame[meta["name"]])
+            self._file(meta["name"]).write(data.tobytes())
+        self.length += len(frame)
+
+    def truncate(self, length: int) -> None:
+        """Potong store menjadi `length` baris pertama."""
+        if self._columns is None:
+            return
+        for meta in self._columns:
+            itemsize = np.dtype(meta["dtype"]).itemsize
+            f = self._file(meta["name"])
+            f.flush()
+            f.truncate(length * itemsize)
+        self.length = min(self.length, length)
+
+    def close(self) -> None:
+        """Flush file kolom lalu tulis manifest (atomic)."""
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+        manifest = {"version": STORE_VERSION, "length": self.length, "columns": self._columns or []}
+        tmp = os.path.join(self.path, MANIFEST + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, os.path.join(self.path, MANIFEST))
+
+    def _file(self, name: str):
+        f = self._files.get(name)
+        if f is None:
+            f = open(_column_file(self.path, name), "ab")
+            self._files[name] = f
+        return f
+
+    @staticmethod
+    def _describe(name: str, series: pd.Series) -> Dict:
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return {"name": name, "dtype": "<M8[ns]"}
+        if pd.api.types.is_bool_dtype(series):
+            return {"name": name, "dtype": "|b1"}
+        if pd.api.types.is_numeric_dtype(series):
+            return {"name": name, "dtype": np.dtype(series.dtype).newbyteorder("<").str}
+        return {"name": name, "dtype": _CODE_DTYPE.str, "categories": []}
+
+    @staticmethod
+    def _encode(meta: Dict, series: pd.Series) -> np.ndarray:
+        categories = meta.get("categories")
+        if categories is None:
+            return np.ascontiguousarray(series.to_numpy(), dtype=np.dtype(meta["dtype"]))
+        values = series.astype(str).to_numpy()
+        known = set(categories)
+        categories.extend(v for v in pd.unique(values) if v not in known)
+        if len(categories) > np.iinfo(_CODE_DTYPE).max:
+            raise ValueError(f"Terlalu banyak kategori di kolom {meta['name']}")
+        return pd.Categorical(values, categories=categories).codes.astype(_CODE_DTYPE)
+
+
+def load_frame(path: str) -> pd.DataFrame:
+    """Seluruh data dari store kolumnar, atau dari CSV (parse kolom Date) untuk data lama."""
+    if is_store(path):
+        return ColumnStore(path).frame()
+    return pd.read_csv(path, parse_dates=["Date"])
+
+
+def iter_frames(path: str, chunksize: int, start: int = 0) -> Iterator[pd.DataFrame]:
+    """Chunk DataFrame dari store kolumnar (mulai baris `start`) atau dari CSV."""
+    if is_store(path):
+        yield from ColumnStore(path).iter_frames(chunksize, start=start)
+        return
+    skipped = 0
+    for chunk in pd.read_csv(path, parse_dates=["Date"], chunksize=chunksize):
+        if skipped + len(chunk) <= start:
+            skipped += len(chunk)
+            continue
+        yield chunk.iloc[max(0, start - skipped):]
+        skipped += len(chunk)
+
+
+def import_csv(csv_path: str, store_path: str, chunksize: int = 200_000) -> int:
+    """Konversi CSV lama (dengan kolom Date) ke store kolumnar. Return jumlah baris."""
+    with ColumnStoreWriter(store_path) as writer:
+        for chunk in pd.read_csv(csv_path, parse_dates=["Date"], chunksize=chunksize):
+            writer.append(chunk)
+        return writer.length
@@ -0,0 +1,190 @@
+"""
+Akumulator profit harian (closed) yang incremental untuk log_transaksi.csv.
+
+Dulu `get_daily_closed_profit()` membaca ulang dan mem-parsing SELURUH log di
+setiap iterasi (O(n) per tick, O(n^2) per hari). `DailyProfitTracker` menyimpan
+total berjalan di memori. Saat bot berjalan total di-update in-process oleh
+`record()`, dipanggil log_to_csv bersamaan dengan baris yang diantrekan ke logger
+asinkron, sehingga batas profit/loss harian tidak tertinggal sebesar
+--log_flush_interval.
+
+Checkpoint JSON kecil menyimpan total + offset file pada pembacaan terakhir:
+- checkpoint hari ini valid -> lanjut dari total checkpoint, baca log dari offset
+- selain itu -> cari awal baris hari ini dengan scan mundur per blok, lalu satu
+  pass streaming hanya atas baris hari ini
+
+Checkpoint dimajukan berkala dari `record()` (paling sering tiap `save_interval`
+detik) dan saat `close()`, dengan membaca hanya bagian log yang baru sejak
+checkpoint sebelumnya. Total dan offset di checkpoint selalu berasal dari isi
+file yang sama, jadi baris yang masih di antrean logger tidak terhitung dua kali.
+"""
+
+import csv
+import json
+import os
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+# Aturan sama dengan get_daily_closed_profit versi lama
+CLOSE_ACTIONS = ("Close Trade", "Profit Target", "Daily Target")
+_SCAN_BLOCK = 64 * 1024
+
+
+def parse_closed_profit(row) -> Optional[float]:
+    """Ambil nilai profit dari baris log close yang sukses, atau None jika bukan baris profit."""
+    if row["action"] not in CLOSE_ACTIONS or row["status"] != "Successful":
+        return None
+    details = row["details"]
+    # Contoh details: "Profit: $12.34" atau "Position: 123456, Volume: 0.05"
+    if "Profit:" not in details:
+        return None
+    try:
+        return float(details.split("Profit: $")[-1].split()[0])
+    except (ValueError, IndexError):
+        return None
+
+
+def find_day_start(path: str, day: str) -> int:
+    """
+    Offset byte baris pertama milik `day` (YYYY-MM-DD) pada log kronologis.
+    Scan mundur per blok sehingga hanya ~1 blok di luar hari ini yang dibaca.
+    """
+    day_b = day.encode()
+    with open(path, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            pos = max(0, pos - _SCAN_BLOCK)
+            f.seek(pos)
+            if pos > 0:
+                f.readline()  # lewati baris terpotong
+            start = f.tell()
+            line = f.readline()
+            if not line:
+                continue
+            # Header / baris tanpa tanggal dianggap lebih lama dari hari ini
+            if not line[:4].isdigit() or line[:10] < day_b:
+                return start
+        return 0
+
+
+class DailyProfitTracker:
+    """
+    Total profit closed hari ini: dibangun dari log saat startup, lalu di-update lewat record().
+
+    Args:
+        log_file: path log_transaksi.csv
+        checkpoint_file: path checkpoint JSON {date, total, offset}
+        now: sumber waktu (bisa diganti saat replay/test)
+        save_interval: jeda minimum (detik) antar penyimpanan checkpoint dari record()
+        clock: jam monotonic untuk save_interval
+    """
+
+    def __init__(self, log_file: str, checkpoint_file: str, now: Callable[[], datetime] = datetime.now,
+                 save_interval: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.log_file = log_file
+        self.checkpoint_file = checkpoint_file
+        self.now = now
+        self.save_interval = float(save_interval)
+        self.clock = clock
+        self.date: Optional[str] = None
+        self._total = 0.0
+        # Total baris log sampai _offset (pasangan yang disimpan di checkpoint)
+        self._file_total = 0.0
+        self._offset = 0
+        self._last_save = clock()
+        self._load_checkpoint()
+
+    def total(self) -> float:
+        """Total profit closed hari ini (tanpa membaca file)."""
+        self._roll()
+        return self._total
+
+    def record(self, row) -> None:
+        """Tambahkan baris log (dict timestamp/action/status/details) yang baru diantrekan."""
+        profit = parse_closed_profit(row)
+        if profit is not None:
+            self._roll()
+            if str(row["timestamp"]).startswith(self.date):
+                self._total += profit
+        if self.clock() - self._last_save >= self.save_interval:
+            self.save()
+
+    def save(self) -> None:
+        """Majukan checkpoint sampai akhir log saat ini lalu simpan ke disk."""
+        self._roll()
+        size = os.path.getsize(self.log_file) if os.path.isfile(self.log_file) else 0
+        if size < self._offset:
+            # Log dipotong / diganti: hitung ulang baris hari ini dari awal file
+            self._offset = 0
+            self._file_total = 0.0
+        self._read_tail(size)
+
+    def close(self) -> None:
+        """Simpan checkpoint terakhir (panggil setelah logger transaksi ditutup)."""
+        self.save()
+
+    def _roll(self) -> None:
+        # Hari berganti: log belum punya baris hari ini selain yang di-record setelah ini.
+        # Offset tetap; baris hari sebelumnya setelah offset dilewati oleh _consume.
+        today = self.now().strftime("%Y-%m-%d")
+        if today != self.date:
+            self.date = today
+            self._total = 0.0
+            self._file_total = 0.0
+
+    def _load_checkpoint(self) -> None:
+        today = self.now().strftime("%Y-%m-%d")
+        size = os.path.getsize(self.log_file) if os.path.isfile(self.log_file) else 0
+        try:
+            with open(self.checkpoint_file, "r") as f:
+                cp = json.load(f)
+            if cp.get("date") == today and 0 <= int(cp.get("offset", -1)) <= size:
+                self.date = today
+                self._file_total = float(cp.get("total", 0.0))
+                self._offset = int(cp["offset"])
+                self._read_tail(size)
+                self._total = self._file_total
+                return
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        self.date = today
+        self._file_total = 0.0
+        self._offset = find_day_start(self.log_file, today) if size else 0
+        self._read_tail(size)
+        self._total = self._file_total
+
+    def _read_tail(self, size: int) -> None:
+        """Tambahkan baris lengkap antara offset checkpoint dan akhir file, lalu simpan checkpoint."""
+        if size > self._offset:
+            with open(self.log_file, "rb") as f:
+                f.seek(self._offset)
+                data = f.read(size - self._offset)
+            # Baris terakhir yang belum selesai ditulis dibaca lagi di startup berikutnya
+            consumed = data.rfind(b"\n") + 1
+            self._consume(data[:consumed])
+            self._offset += consumed
+        self._save_checkpoint()
+
+    def _save_checkpoint(self) -> None:
+        self._last_save = self.clock()
+        try:
+            with open(self.checkpoint_file, "w") as f:
+                json.dump({"date": self.date, "total": self._file_total, "offset": self._offset}, f)
+        except OSError as e:
+            print(f"[ERROR] Gagal menyimpan checkpoint profit harian: {e}")
+
+    def _consume(self, data: bytes) -> None:
+        day_b = self.date.encode()
+        fieldnames = ["timestamp", "action", "status", "details"]
+        for line in data.splitlines():
+            # Filter murah sebelum parsing CSV
+            if not line.startswith(day_b) or b"Profit:" not in line:
+                continue
+            values = next(csv.reader([line.decode("utf-8", errors="replace")]), None)
+            if not values or len(values) < len(fieldnames):
+                continue
+            profit = parse_closed_profit(dict(zip(fieldnames, values)))
+            if profit is not None:
+                self._file_total += profit
@@ -0,0 +1,565 @@
+"""
+Feature engine bersama untuk trainer, preprocessing dan live bot.
+
+Setiap indikator punya dua implementasi dengan hasil yang sama:
+- batch (NumPy, vectorized)  -> `compute_features(...)` untuk histori panjang
+- streaming (O(1) per bar)   -> `FeatureStream.update(...)` untuk loop live
+
+Semantik mengikuti indikator yang dulu dipakai di 2_preprocessing_data.py
+(pandas rolling + library `ta`):
+- MA_3, MA_15       : rolling mean (min_periods = window)
+- stoch_k, stoch_d  : Stochastic 14 / smooth 3
+- RSI_14            : Wilder RSI (ewm alpha=1/14, adjust=False, min_periods=14)
+- ATR_14            : Wilder ATR, 0.0 sebelum bar ke-14 (seperti `ta`)
+- SR_min, SR_max    : rolling min/max Close 50 bar
+- dist_to_support, dist_to_resistance, log_return
+- count_touches     : jumlah Close dalam 200 bar terakhir yang "menyentuh" level SR
+
+Benchmark batch vs streaming dan count_touches (paritas diuji di tests/test_feature_engine.py):
+    python feature_engine.py
+"""
+
+import math
+from collections import deque
+from typing import Dict, Optional
+
+import numpy as np  # type: ignore
+from numpy.lib.stride_tricks import sliding_window_view  # type: ignore
+
+MA_FAST = 3
+MA_SLOW = 15
+STOCH_WINDOW = 14
+STOCH_SMOOTH = 3
+RSI_WINDOW = 14
+ATR_WINDOW = 14
+SR_WINDOW = 50
+TOUCH_LOOKBACK = 200
+TOUCH_THRESH = 0.002   # 0.2% dari level = "touch"
+
+FEATURE_COLUMNS = [
+    "MA_3", "MA_15", "stoch_k", "stoch_d", "RSI_14", "ATR_14",
+    "SR_min", "SR_max", "dist_to_support", "dist_to_resistance", "log_return",
+]
+
+# Panjang blok untuk ewm vectorized; (1-alpha)^-64 tetap kecil sehingga presisi terjaga
+_EWM_BLOCK = 64
+
+
+# ============================
+#  BATCH (NumPy)
+# ============================
+def rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """Rolling mean dengan min_periods=window; NaN di dalam window -> NaN."""
+    x = np.asarray(x, dtype=np.float64)
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        out[window - 1:] = sliding_window_view(x, window).mean(axis=1)
+    return out
+
+
+def rolling_min(x: np.ndarray, window: int) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        out[window - 1:] = sliding_window_view(x, window).min(axis=1)
+    return out
+
+
+def rolling_max(x: np.ndarray, window: int) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        out[window - 1:] = sliding_window_view(x, window).max(axis=1)
+    return out
+
+
+def ewm_adjust_false(x: np.ndarray, alpha: float, init: Optional[float] = None) -> np.ndarray:
+    """
+    y_t = (1 - alpha) * y_{t-1} + alpha * x_t, dengan y_{-1} = init (default x_0,
+    sama seperti pandas ewm(adjust=False)).
+
+    Dihitung per blok: solusi lokal tiap blok vectorized, lalu hanya nilai carry
+    antar blok (n / 64 skalar) yang dihitung berurutan.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    n = len(x)
+    if n == 0:
+        return x.copy()
+    r = 1.0 - alpha
+    carry = float(x[0]) if init is None else float(init)
+    b = _EWM_BLOCK
+    m = -(-n // b)
+    padded = np.zeros(m * b)
+    padded[:n] = x
+    blocks = padded.reshape(m, b)
+    powers = r ** np.arange(b)                    # r^t
+    # Solusi lokal dengan y_{-1}=0: y_t = r^t * cumsum(alpha * x_j * r^-j)
+    local = powers * np.cumsum(alpha * blocks / powers, axis=1)
+    decay = r ** np.arange(1, b + 1)              # pengaruh carry ke posisi t: r^(t+1)
+    carries = np.empty(m)
+    last_local = local[:, -1]
+    r_block = r ** b
+    for i in range(m):
+        carries[i] = carry
+        carry = r_block * carry + last_local[i]
+    out = local + carries[:, None] * decay
+    return out.reshape(-1)[:n]
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True range; bar pertama = high - low."""
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    tr = high - low
+    if len(tr) > 1:
+        prev = close[:-1]
+        tr[1:] = np.maximum.reduce([tr[1:], np.abs(high[1:] - prev), np.abs(low[1:] - prev)])
+    return tr
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = ATR_WINDOW) -> np.ndarray:
+    tr = true_range(high, low, close)
+    out = np.zeros(len(tr))
+    if len(tr) >= window:
+        first = tr[:window].mean()
+        out[window - 1] = first
+        if len(tr) > window:
+            out[window:] = ewm_adjust_false(tr[window:], 1.0 / window, init=first)
+    return out
+
+
+def _rsi_from_ema(ema_up: np.ndarray, ema_down: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(ema_down == 0, 100.0, 100.0 - 100.0 / (1.0 + ema_up / ema_down))
+
+
+def rsi(close: np.ndarray, window: int = RSI_WINDOW) -> np.ndarray:
+    close = np.asarray(close, dtype=np.float64)
+    diff = np.zeros(len(close))
+    diff[1:] = np.diff(close)
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+    out = _rsi_from_ema(ewm_adjust_false(up, 1.0 / window), ewm_adjust_false(down, 1.0 / window))
+    out[: window - 1] = np.nan
+    return out
+
+
+def stochastic(high, low, close, window: int = STOCH_WINDOW, smooth: int = STOCH_SMOOTH):
+    """Return (stoch_k, stoch_d)."""
+    close = np.asarray(close, dtype=np.float64)
+    smin = rolling_min(low, window)
+    smax = rolling_max(high, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = 100.0 * (close - smin) / (smax - smin)
+    return k, rolling_mean(k, smooth)
+
+
+def compute_features(open_, high, low, close) -> Dict[str, np.ndarray]:
+    """Semua kolom FEATURE_COLUMNS secara batch (float64, NaN selama warm-up)."""
+    close = np.asarray(close, dtype=np.float64)
+    feats: Dict[str, np.ndarray] = {}
+    feats["MA_3"] = rolling_mean(close, MA_FAST)
+    feats["MA_15"] = rolling_mean(close, MA_SLOW)
+    feats["stoch_k"], feats["stoch_d"] = stochastic(high, low, close)
+    feats["RSI_14"] = rsi(close)
+    feats["ATR_14"] = atr(high, low, close)
+    feats["SR_min"] = rolling_min(close, SR_WINDOW)
+    feats["SR_max"] = rolling_max(close, SR_WINDOW)
+    feats["dist_to_support"] = np.abs(close - feats["SR_min"]) / feats["SR_min"]
+    feats["dist_to_resistance"] = np.abs(close - feats["SR_max"]) / feats["SR_max"]
+    log_ret = np.full(len(close), np.nan)
+    if len(close) > 1:
+        log_ret[1:] = np.log(close[1:] / close[:-1])
+    feats["log_return"] = log_ret
+    return feats
+
+
+def count_touches(close, level, lookback: int = TOUCH_LOOKBACK, thresh: float = TOUCH_THRESH,
+                  chunk: int = 16384) -> np.ndarray:
+    """
+    Untuk setiap bar i: jumlah close[max(0, i-lookback+1) : i+1] dengan
+    |close - level[i]| / level[i] <= thresh. level NaN -> 0.
+
+    Close di-pad NaN di depan sehingga setiap bar punya window `lookback` penuh
+    (NaN tidak pernah dihitung sebagai touch), lalu dibandingkan per chunk baris
+    lewat sliding_window_view agar memori tetap O(chunk * lookback).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    level = np.asarray(level, dtype=np.float64)
+    n = len(close)
+    out = np.zeros(n, dtype=np.int64)
+    if n == 0:
+        return out
+    padded = np.concatenate([np.full(lookback - 1, np.nan), close])
+    windows = sliding_window_view(padded, lookback)   # (n, lookback), zero-copy
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for start in range(0, n, chunk):
+            stop = min(start + chunk, n)
+            lvl = level[start:stop, None]
+            hit = np.abs(windows[start:stop] - lvl) / lvl <= thresh
+            out[start:stop] = hit.sum(axis=1)
+    return out
+
+
+class ChunkedFeatures:
+    """
+    compute_features + count_touches per chunk untuk histori yang tidak muat di
+    memori. Hasil per chunk sama dengan menghitung seluruh histori sekaligus.
+
+    State yang dibawa antar chunk:
+    - `context` bar OHLC terakhir (default 199 = lookback touch - 1), cukup untuk
+      semua window terbatas (MA 15, Stochastic 14+3, SR 50, touch 200, log_return)
+    - nilai EMA terakhir untuk RSI (up/down) dan ATR (rekursif, window tak terbatas)
+
+    Selama total bar yang sudah dilihat <= context, seluruh histori masih ada di
+    context sehingga chunk dihitung ulang secara batch penuh.
+    """
+
+    TOUCH_COLUMNS = ["support_touches", "resistance_touches"]
+
+    def __init__(self, context: int = TOUCH_LOOKBACK - 1):
+        self.context = int(context)
+        self._tail: Optional[Dict[str, np.ndarray]] = None
+        self._seen = 0
+        self._ema_up = 0.0
+        self._ema_down = 0.0
+        self._atr = 0.0
+
+    def state(self) -> Dict:
+        """State yang bisa diserialisasi JSON (untuk melanjutkan proses di run berikutnya)."""
+        return {
+            "context": self.context,
+            "seen": self._seen,
+            "ema_up": self._ema_up,
+            "ema_down": self._ema_down,
+            "atr": self._atr,
+            "tail": None if self._tail is None else {k: v.tolist() for k, v in self._tail.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "ChunkedFeatures":
+        obj = cls(state["context"])
+        obj._seen = int(state["seen"])
+        obj._ema_up = float(state["ema_up"])
+        obj._ema_down = float(state["ema_down"])
+        obj._atr = float(state["atr"])
+        tail = state.get("tail")
+        if tail is not None:
+            obj._tail = {k: np.asarray(v, dtype=np.float64) for k, v in tail.items()}
+        return obj
+
+    def update(self, open_, high, low, close) -> Dict[str, np.ndarray]:
+        """Fitur (FEATURE_COLUMNS + TOUCH_COLUMNS) untuk bar di chunk ini saja."""
+        new = {
+            "open": np.asarray(open_, dtype=np.float64),
+            "high": np.asarray(high, dtype=np.float64),
+            "low": np.asarray(low, dtype=np.float64),
+            "close": np.asarray(close, dtype=np.float64),
+        }
+        n = len(new["close"])
+        if n == 0:
+            return {col: np.zeros(0) for col in FEATURE_COLUMNS + self.TOUCH_COLUMNS}
+        if self._tail is None:
+            comb, k = new, 0
+        else:
+            comb = {name: np.concatenate([self._tail[name], new[name]]) for name in new}
+            k = len(self._tail["close"])
+        c = comb["close"]
+        feats = compute_features(comb["open"], comb["high"], comb["low"], c)
+
+        diff = np.zeros(len(c))
+        diff[1:] = np.diff(c)
+        up = np.where(diff > 0, diff, 0.0)
+        down = np.where(diff < 0, -diff, 0.0)
+        tr = true_range(comb["high"], comb["low"], c)
+        alpha_rsi = 1.0 / RSI_WINDOW
+        alpha_atr = 1.0 / ATR_WINDOW
+        if self._seen == k:
+            # Seluruh histori ada di comb: hasil batch sudah tepat, ambil state EMA-nya
+            self._ema_up = float(ewm_adjust_false(up, alpha_rsi)[-1])
+            self._ema_down = float(ewm_adjust_false(down, alpha_rsi)[-1])
+            self._atr = float(feats["ATR_14"][-1])
+        else:
+            # Lanjutkan rekursi EMA dari state chunk sebelumnya
+            ema_up = ewm_adjust_false(up[k:], alpha_rsi, init=self._ema_up)
+            ema_down = ewm_adjust_false(down[k:], alpha_rsi, init=self._ema_down)
+            atr_new = ewm_adjust_false(tr[k:], alpha_atr, init=self._atr)
+            feats["RSI_14"][k:] = _rsi_from_ema(ema_up, ema_down)
+            feats["ATR_14"][k:] = atr_new
+            self._ema_up, self._ema_down = float(ema_up[-1]), float(ema_down[-1])
+            self._atr = float(atr_new[-1])
+
+        feats["support_touches"] = count_touches(c, feats["SR_min"])
+        feats["resistance_touches"] = count_touches(c, feats["SR_max"])
+        self._seen += n
+        self._tail = {name: col[-self.context:].copy() for name, col in comb.items()}
+        return {col: feats[col][k:] for col in FEATURE_COLUMNS + self.TOUCH_COLUMNS}
+
+
+# ============================
+#  STREAMING (O(1) per bar)
+# ============================
+# Semua kelas streaming punya update(x, commit=True). commit=False menghitung nilai
+# untuk bar yang masih terbentuk tanpa mengubah state (dipanggil berulang per tick).
+
+def _div(a: float, b: float) -> float:
+    """Pembagian dengan semantik float NumPy (x/0 -> +-inf, 0/0 -> nan)."""
+    if b == 0:
+        if a == 0 or math.isnan(a):
+            return math.nan
+        return math.copysign(math.inf, a) * (math.copysign(1.0, b))
+    return a / b
+
+
+class StreamingMean:
+    """Rolling mean O(1) dengan min_periods=window; NaN di window -> NaN."""
+
+    # Jumlah commit sebelum sum dihitung ulang dari window (mencegah drift floating point)
+    RESUM_EVERY = 4096
+
+    def __init__(self, window: int):
+        self.window = window
+        self._values: deque = deque()
+        self._sum = 0.0
+        self._nans = 0
+        self._commits = 0
+
+    def update(self, x: float, commit: bool = True) -> float:
+        x = float(x)
+        is_nan = math.isnan(x)
+        s, nans, size = self._sum, self._nans, len(self._values) + 1
+        if not is_nan:
+            s += x
+        else:
+            nans += 1
+        if size > self.window:
+            old = self._values[0]
+            if math.isnan(old):
+                nans -= 1
+            else:
+                s -= old
+            size -= 1
+        if commit:
+            self._values.append(x)
+            if len(self._values) > self.window:
+                self._values.popleft()
+            self._sum, self._nans = s, nans
+            self._commits += 1
+            if self._commits % self.RESUM_EVERY == 0:
+                self._sum = sum(v for v in self._values if not math.isnan(v))
+        if size < self.window or nans:
+            return math.nan
+        return s / self.window
+
+
+class StreamingExtreme:
+    """Rolling min (mode="min") atau max (mode="max") O(1) amortized via monotonic deque."""
+
+    def __init__(self, window: int, mode: str = "min"):
+        self.window = window
+        self._better = (lambda a, b: a <= b) if mode == "min" else (lambda a, b: a >= b)
+        self._dq: deque = deque()   # (index, value), nilai monoton
+        self._i = 0
+
+    def update(self, x: float, commit: bool = True) -> float:
+        x = float(x)
+        i = self._i
+        start = i - self.window + 1
+        if not commit:
+            best = x
+            # Entri valid pertama di deque adalah ekstrem dari sisa window
+            for j, v in self._dq:
+                if j >= start:
+                    if self._better(v, best):
+                        best = v
+                    break
+            return best if i >= self.window - 1 else math.nan
+        while self._dq and self._better(x, self._dq[-1][1]):
+            self._dq.pop()
+        self._dq.append((i, x))
+        while self._dq[0][0] < start:
+            self._dq.popleft()
+        self._i += 1
+        return self._dq[0][1] if i >= self.window - 1 else math.nan
+
+
+class StreamingEwm:
+    """ewm(alpha, adjust=False).mean() dengan min_periods."""
+
+    def __init__(self, alpha: float, min_periods: int = 0):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self._y: Optional[float] = None
+        self._count = 0
+
+    def update(self, x: float, commit: bool = True) -> float:
+        x = float(x)
+        y = x if self._y is None else (1.0 - self.alpha) * self._y + self.alpha * x
+        count = self._count + 1
+        if commit:
+            self._y, self._count = y, count
+        return y if count >= self.min_periods else math.nan
+
+
+class StreamingRSI:
+    def __init__(self, window: int = RSI_WINDOW):
+        self._up = StreamingEwm(1.0 / window, min_periods=window)
+        self._down = StreamingEwm(1.0 / window, min_periods=window)
+        self._prev: Optional[float] = None
+
+    def update(self, close: float, commit: bool = True) -> float:
+        diff = 0.0 if self._prev is None else close - self._prev
+        up = self._up.update(diff if diff > 0 else 0.0, commit)
+        down = self._down.update(-diff if diff < 0 else 0.0, commit)
+        if commit:
+            self._prev = close
+        if down == 0:
+            return 100.0
+        if math.isnan(down):
+            return math.nan
+        return 100.0 - 100.0 / (1.0 + _div(up, down))
+
+
+class StreamingATR:
+    def __init__(self, window: int = ATR_WINDOW):
+        self.window = window
+        self._prev_close: Optional[float] = None
+        self._warmup = []
+        self._atr: Optional[float] = None
+
+    def update(self, high: float, low: float, close: float, commit: bool = True) -> float:
+        tr = high - low
+        if self._prev_close is not None:
+            tr = max(tr, abs(high - self._prev_close), abs(low - self._prev_close))
+        if self._atr is None:
+            warm = self._warmup + [tr]
+            value = sum(warm) / self.window if len(warm) == self.window else 0.0
+            if commit:
+                self._warmup = warm if len(warm) < self.window else []
+                if len(warm) == self.window:
+                    self._atr = value
+        else:
+            value = (self._atr * (self.window - 1) + tr) / float(self.window)
+            if commit:
+                self._atr = value
+        if commit:
+            self._prev_close = close
+        return value
+
+
+class FeatureStream:
+    """
+    Menghitung FEATURE_COLUMNS bar demi bar dengan biaya O(1).
+
+    update(..., commit=True) untuk bar yang sudah close;
+    update(..., commit=False) untuk bar yang masih terbentuk (state tidak berubah).
+    """
+
+    def __init__(self):
+        self._ma_fast = StreamingMean(MA_FAST)
+        self._ma_slow = StreamingMean(MA_SLOW)
+        self._low_min = StreamingExtreme(STOCH_WINDOW, "min")
+        self._high_max = StreamingExtreme(STOCH_WINDOW, "max")
+        self._stoch_d = StreamingMean(STOCH_SMOOTH)
+        self._rsi = StreamingRSI(RSI_WINDOW)
+        self._atr = StreamingATR(ATR_WINDOW)
+        self._sr_min = StreamingExtreme(SR_WINDOW, "min")
+        self._sr_max = StreamingExtreme(SR_WINDOW, "max")
+        self._prev_close: Optional[float] = None
+        self.count = 0
+
+    def update(self, open_: float, high: float, low: float, close: float, commit: bool = True) -> Dict[str, float]:
+        high, low, close = float(high), float(low), float(close)
+        f: Dict[str, float] = {}
+        f["MA_3"] = self._ma_fast.update(close, commit)
+        f["MA_15"] = self._ma_slow.update(close, commit)
+        smin = self._low_min.update(low, commit)
+        smax = self._high_max.update(high, commit)
+        f["stoch_k"] = 100.0 * _div(close - smin, smax - smin)
+        f["stoch_d"] = self._stoch_d.update(f["stoch_k"], commit)
+        f["RSI_14"] = self._rsi.update(close, commit)
+        f["ATR_14"] = self._atr.update(high, low, close, commit)
+        f["SR_min"] = self._sr_min.update(close, commit)
+        f["SR_max"] = self._sr_max.update(close, commit)
+        f["dist_to_support"] = _div(abs(close - f["SR_min"]), f["SR_min"])
+        f["dist_to_resistance"] = _div(abs(close - f["SR_max"]), f["SR_max"])
+        f["log_return"] = math.log(close / self._prev_close) if self._prev_close is not None else math.nan
+        if commit:
+            self._prev_close = close
+            self.count += 1
+        return f
+
+
+class RingFeatureTracker:
+    """
+    Menjaga FeatureStream tetap sinkron dengan ring buffer bar (mis. BarRingBuffer M1).
+
+    Bar yang sudah close di-commit tepat sekali; bar terakhir (masih terbentuk)
+    dihitung dengan commit=False di setiap update sehingga nilai fitur selalu
+    mengikuti tick terbaru tanpa membangun ulang DataFrame.
+
+    Dict hasil update() juga memuat Open/High/Low/Close bar tersebut.
+
+    Args:
+        history: jumlah baris fitur bar yang sudah close yang disimpan di `self.history`
+            (mis. untuk observasi PPO multi-bar, lihat observation_spec.py); 0 = tidak disimpan
+    """
+
+    def __init__(self, history: int = 0):
+        self.stream = FeatureStream()
+        self.last_committed_time: Optional[int] = None
+        self.history: deque = deque(maxlen=max(1, history))
+        self._keep_history = history > 0
+
+    def update(self, bars) -> Dict[str, float]:
+        if len(bars) == 0:
+            return {}
+        t = bars.column("time")
+        o, h, l, c = (bars.column(k) for k in ("open", "high", "low", "close"))
+        start = 0
+        if self.last_committed_time is not None:
+            start = int(np.searchsorted(t, self.last_committed_time, side="right"))
+        for i in range(start, len(t) - 1):
+            row = self.stream.update(o[i], h[i], l[i], c[i])
+            self.last_committed_time = int(t[i])
+            if self._keep_history:
+                self.history.append(_with_ohlc(row, o[i], h[i], l[i], c[i]))
+        i = len(t) - 1
+        return _with_ohlc(self.stream.update(o[i], h[i], l[i], c[i], commit=False), o[i], h[i], l[i], c[i])
+
+
+def _with_ohlc(row: Dict[str, float], open_, high, low, close) -> Dict[str, float]:
+    row["Open"], row["High"], row["Low"], row["Close"] = float(open_), float(high), float(low), float(close)
+    return row
+
+
+def _benchmark(n: int = 20000) -> None:
+    """Waktu batch vs streaming per update dan count_touches vectorized."""
+    import time
+    import fake_mt5
+
+    rates = fake_mt5.synthetic_rates(1_700_000_000, n, step=1.0)
+    o, h, l, c = (rates[k].astype(np.float64) for k in ("open", "high", "low", "close"))
+
+    t0 = time.perf_counter()
+    batch = compute_features(o, h, l, c)
+    t_batch = time.perf_counter() - t0
+
+    stream = FeatureStream()
+    t0 = time.perf_counter()
+    for i in range(n):
+        # bar terbentuk dulu (commit=False) lalu close (commit=True), seperti di loop live
+        stream.update(o[i], h[i], l[i], c[i], commit=False)
+        stream.update(o[i], h[i], l[i], c[i])
+    t_stream = (time.perf_counter() - t0) / (2 * n)
+    print(f"Batch {n} bar: {t_batch * 1000:.1f} ms; streaming: {t_stream * 1e6:.1f} us per update")
+
+    for name in ("SR_min", "SR_max"):
+        t0 = time.perf_counter()
+        count_touches(c, batch[name])
+        print(f"count_touches {name} ({n} bar): {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,108 @@
+"""
+Artifact scaler preprocessing yang di-fit sekali lalu dipakai ulang.
+
+Dulu `preprocess_data()` mem-fit StandardScaler/MinMaxScaler baru atas seluruh
+dataset di setiap run lalu membuangnya, sehingga live bot tidak bisa memakai
+normalisasi yang sama dan menambah data baru selalu berarti fit ulang semua baris.
+
+`ScalerArtifact` menyimpan parameter scaler (mean/scale StandardScaler untuk
+kolom harga & indikator, min/scale MinMaxScaler untuk Volume) dalam JSON kecil
+berversi di samping dataset hasil preprocessing, misalnya:
+    processed_data_BTCUSDm.csv  ->  processed_data_BTCUSDm_scalers.json
+
+Transform memakai NumPy saja (tanpa sklearn) sehingga bisa dipakai live bot.
+Artifact juga membawa `stream_state` (state rolling indikator + baris terakhir
+yang belum punya target) untuk mode incremental "transform only".
+"""
+
+import json
+import os
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np  # type: ignore
+
+SCALER_VERSION = 1
+
+
+def scaler_path_for(processed_file: str) -> str:
+    """Path artifact scaler untuk file dataset hasil preprocessing."""
+    root, _ = os.path.splitext(processed_file)
+    return f"{root}_scalers.json"
+
+
+@dataclass
+class ScalerArtifact:
+    """
+    Args:
+        price_cols: kolom yang di-scale StandardScaler (urutan kolom parameter)
+        price_mean: StandardScaler.mean_
+        price_scale: StandardScaler.scale_
+        volume_min: MinMaxScaler.min_ untuk Volume (None jika tidak ada Volume)
+        volume_scale: MinMaxScaler.scale_ untuk Volume
+        n_samples: jumlah baris saat fit
+        created: waktu fit (ISO)
+        stream_state: state untuk mode incremental (lihat 2_preprocessing_data.py)
+    """
+
+    price_cols: List[str]
+    price_mean: List[float]
+    price_scale: List[float]
+    volume_min: Optional[float] = None
+    volume_scale: Optional[float] = None
+    n_samples: int = 0
+    created: str = ""
+    stream_state: Optional[Dict] = None
+    version: int = SCALER_VERSION
+
+    @classmethod
+    def from_sklearn(cls, scaler_price, price_cols: List[str], scaler_vol=None) -> "ScalerArtifact":
+        """Bangun artifact dari StandardScaler (dan MinMaxScaler Volume) yang sudah di-fit."""
+        return cls(
+            price_cols=list(price_cols),
+            price_mean=[float(v) for v in scaler_price.mean_],
+            price_scale=[float(v) for v in scaler_price.scale_],
+            volume_min=float(scaler_vol.min_[0]) if scaler_vol is not None else None,
+            volume_scale=float(scaler_vol.scale_[0]) if scaler_vol is not None else None,
+            n_samples=int(scaler_price.n_samples_seen_),
+            created=datetime.now().isoformat(timespec="seconds"),
+        )
+
+    @property
+    def has_volume(self) -> bool:
+        return self.volume_scale is not None
+
+    def transform_prices(self, values: np.ndarray) -> np.ndarray:
+        """(N, len(price_cols)) -> nilai ter-scale, sama dengan StandardScaler.transform."""
+        values = np.asarray(values, dtype=np.float64)
+        return (values - np.asarray(self.price_mean)) / np.asarray(self.price_scale)
+
+    def transform_column(self, name: str, values: np.ndarray) -> np.ndarray:
+        """Scale satu kolom harga (mis. "Close" untuk observasi PPO di live bot)."""
+        i = self.price_cols.index(name)
+        return (np.asarray(values, dtype=np.float64) - self.price_mean[i]) / self.price_scale[i]
+
+    def transform_volume(self, values: np.ndarray) -> np.ndarray:
+        """Sama dengan MinMaxScaler.transform (feature_range 0..1)."""
+        if not self.has_volume:
+            raise ValueError("Artifact tidak memiliki scaler Volume")
+        return np.asarray(values, dtype=np.float64) * self.volume_scale + self.volume_min
+
+    def save(self, path: str) -> None:
+        # Tulis ke file sementara lalu rename agar artifact tidak pernah setengah tertulis
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(asdict(self), f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "ScalerArtifact":
+        with open(path, "r") as f:
+            raw = json.load(f)
+        version = raw.get("version")
+        if version != SCALER_VERSION:
+            raise ValueError(f"Versi artifact scaler {version} tidak didukung (butuh {SCALER_VERSION}): {path}")
+        known = set(cls.__dataclass_fields__)
+        return cls(**{k: v for k, v in raw.items() if k in known})
+
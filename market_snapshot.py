@@ -0,0 +1,91 @@
+"""
+Snapshot pasar/akun per iterasi trading_loop.
+
+Satu iterasi dulu memanggil `positions_get` 4x, `account_info` berkali-kali
+(di setiap print/log) dan `symbol_info` 2x. `MarketSnapshot` mengambil semua
+data tersebut SEKALI per iterasi lalu diteruskan ke semua risk check, logger
+dan fungsi order.
+
+Ukur pengurangan panggilan IPC (replay_harness + fake_mt5, jumlah panggilan dihitung
+CountingMT5 pada trading_loop sungguhan, bukan diperkirakan):
+    git show <revisi sebelum snapshot>:Aventa_Hybrid_PPO_v9.py > bot_lama.py
+    python market_snapshot.py --ppo_model_path PPO_agent.zip --before bot_lama.py
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """Data immutable satu iterasi: akun, posisi (sudah difilter magic), tick, info simbol."""
+    account: Any
+    positions: Tuple[Any, ...]
+    tick: Any
+    symbol_info: Any
+
+    @property
+    def floating_profit(self) -> float:
+        """Total floating profit posisi milik bot."""
+        return sum(p.profit for p in self.positions)
+
+    @property
+    def spread(self) -> Optional[float]:
+        """Spread aktual (ask - bid) atau None jika tick tidak tersedia."""
+        if self.tick is None:
+            return None
+        return self.tick.ask - self.tick.bid
+
+
+def take_snapshot(mt5_module, symbol: str, magic: int, tick=None) -> MarketSnapshot:
+    """
+    Mengambil snapshot dengan jumlah panggilan terminal minimal.
+
+    Args:
+        mt5_module: modul MetaTrader5 (atau pengganti fake)
+        symbol: simbol trading
+        magic: magic number posisi milik bot
+        tick: tick yang sudah diambil (mis. dari TickScheduler) agar tidak diambil ulang
+
+    Returns:
+        MarketSnapshot
+    """
+    account = mt5_module.account_info()
+    positions = mt5_module.positions_get(symbol=symbol)
+    positions = tuple(p for p in positions if p.magic == magic) if positions else ()
+    if tick is None:
+        tick = mt5_module.symbol_info_tick(symbol)
+    symbol_info = mt5_module.symbol_info(symbol)
+    return MarketSnapshot(account=account, positions=positions, tick=tick, symbol_info=symbol_info)
+
+
+def _demo(model_path: str, before_script: str, after_script: Optional[str] = None, hours: float = 0.25) -> None:
+    """
+    Ukur panggilan MT5 per iterasi trading_loop dua revisi bot dengan replay_harness
+    (fake_mt5 + CountingMT5, tick sintetis yang sama untuk keduanya).
+    """
+    import replay_harness
+
+    ticks, history = replay_harness.synthetic_data(hours)
+    bot_args = ["--ppo_model_path", model_path, "--start_trading_hour", "0", "--end_trading_hour", "24"]
+    for label, script in (("Sebelum", before_script), ("Sesudah", after_script or replay_harness.BOT_SCRIPT)):
+        report = replay_harness.run_replay(bot_args, ticks, history, bot_script=os.path.abspath(script))
+        summary = report.summary()
+        iterations = max(summary["iterations"], 1)
+        top = sorted(report.mt5_calls.items(), key=lambda kv: -kv[1])[:6]
+        print(f"{label:<8} {summary['mt5_calls_per_iteration']:>6.2f} panggilan/iterasi "
+              f"({summary['iterations']} iterasi, {summary['opened']} open); per fungsi termasuk polling: "
+              + ", ".join(f"{name}={count / iterations:.2f}" for name, count in top))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ukur panggilan MT5 per iterasi: revisi bot lama vs sekarang.")
+    parser.add_argument("--ppo_model_path", type=str, required=True)
+    parser.add_argument("--before", type=str, required=True, help="Skrip bot revisi lama (sebelum MarketSnapshot).")
+    parser.add_argument("--after", type=str, default=None, help="Skrip bot pembanding (default: bot sekarang).")
+    parser.add_argument("--hours", type=float, default=0.25, help="Durasi replay (jam virtual).")
+    demo_args = parser.parse_args()
+    _demo(demo_args.ppo_model_path, demo_args.before, demo_args.after, demo_args.hours)
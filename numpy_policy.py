@@ -0,0 +1,226 @@
+"""
+Runtime policy PPO murni NumPy (tanpa torch / stable_baselines3).
+
+Untuk inferensi bot hanya butuh forward pass MLP actor, tapi `PPO.load` menarik
+stable_baselines3 + torch (startup beberapa detik, ratusan MB RSS). Langkah export
+mengambil bobot actor dari PPO_agent.zip ke file `.npz` kecil:
+
+    FlattenExtractor -> mlp_extractor.policy_net (Linear + aktivasi)* -> action_net (logit)
+
+`NumpyPolicy.predict` menjalankan forward pass yang sama dengan NumPy float32:
+deterministic=True memilih argmax logit (sama dengan SB3), deterministic=False
+mengambil sampel dari distribusi kategorikal (default `predict` SB3, dipakai bot).
+Observation spec model (lihat observation_spec.py) ikut disalin ke dalam `.npz`,
+jadi `ObservationSpec.load_from_model("PPO_agent.npz")` tetap bekerja.
+
+Bot dan policy_server.py memakai runtime ini otomatis jika --ppo_model_path
+berakhiran .npz (lihat policy_server.load_policy).
+
+Contoh:
+    python numpy_policy.py PPO_agent.zip                  (tulis PPO_agent.npz)
+    python numpy_policy.py PPO_agent.zip --benchmark      (export + waktu startup/predict vs SB3)
+"""
+
+import argparse
+import os
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import numpy as np  # type: ignore
+
+from observation_spec import ObservationSpec
+
+POLICY_VERSION = 1
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    z = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return z / z.sum(axis=1, keepdims=True)
+
+
+# Aktivasi yang didukung (nama -> fungsi); nama diambil dari kelas modul torch saat export
+ACTIVATIONS = {
+    "tanh": np.tanh,
+    "relu": lambda x: np.maximum(x, 0),
+    "elu": lambda x: np.where(x > 0, x, np.expm1(np.minimum(x, 0))),
+    "leakyrelu": lambda x: np.where(x > 0, x, 0.01 * x),
+    "sigmoid": lambda x: 1 / (1 + np.exp(-x)),
+    "identity": lambda x: x,
+}
+
+
+class NumpyPolicy:
+    """
+    Args:
+        weights: bobot Linear per layer, bentuk (out, in) seperti torch
+        biases: bias per layer
+        activations: nama aktivasi setelah setiap layer ("identity" untuk layer logit)
+        obs_shape: bentuk observation space model
+        seed: seed sampling untuk predict(deterministic=False)
+    """
+
+    def __init__(self, weights: List[np.ndarray], biases: List[np.ndarray], activations: List[str],
+                 obs_shape, seed: Optional[int] = None):
+        unknown = [a for a in activations if a not in ACTIVATIONS]
+        if unknown:
+            raise ValueError(f"Aktivasi {unknown} tidak didukung (pilih dari {list(ACTIVATIONS)})")
+        # Disimpan transpose agar forward pass cukup x @ W + b
+        self.weights = [np.ascontiguousarray(w.T, dtype=np.float32) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+        self.activations = list(activations)
+        self.obs_shape = tuple(int(d) for d in obs_shape)
+        self.obs_dim = int(np.prod(self.obs_shape))
+        self.n_actions = int(self.biases[-1].shape[0])
+        self._rng = np.random.default_rng(seed)
+        self._observation_space = None
+
+    @property
+    def observation_space(self):
+        """Box gymnasium (jika terinstal) atau objek minimal dengan `shape`/`dtype`, seperti `PPO.observation_space`."""
+        if self._observation_space is None:
+            try:
+                from gymnasium import spaces  # type: ignore
+                self._observation_space = spaces.Box(-np.inf, np.inf, self.obs_shape, dtype=np.float32)
+            except ImportError:
+                self._observation_space = SimpleNamespace(shape=self.obs_shape, dtype=np.dtype(np.float32))
+        return self._observation_space
+
+    @classmethod
+    def load(cls, path: str, seed: Optional[int] = None) -> "NumpyPolicy":
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data["version"])
+            if version != POLICY_VERSION:
+                raise ValueError(f"Versi policy {version} tidak didukung (butuh {POLICY_VERSION}): {path}")
+            n = int(data["n_layers"])
+            weights = [data[f"weight_{i}"] for i in range(n)]
+            biases = [data[f"bias_{i}"] for i in range(n)]
+            activations = [str(a) for a in data["activations"]]
+            obs_shape = data["obs_shape"]
+        return cls(weights, biases, activations, obs_shape, seed=seed)
+
+    def logits(self, observation) -> np.ndarray:
+        """Logit aksi untuk batch observasi (N, obs_dim)."""
+        x = np.asarray(observation, dtype=np.float32).reshape(-1, self.obs_dim)
+        for w, b, act in zip(self.weights, self.biases, self.activations):
+            x = ACTIVATIONS[act](x @ w + b)
+        return x
+
+    def predict(self, observation, deterministic: bool = False):
+        """Sama dengan `PPO.predict` untuk action space Discrete: (actions, None)."""
+        obs = np.asarray(observation, dtype=np.float32)
+        single = obs.shape == self.obs_shape
+        logits = self.logits(obs)
+        if deterministic:
+            actions = logits.argmax(axis=1)
+        else:
+            cdf = np.cumsum(_softmax(logits.astype(np.float64)), axis=1)
+            u = self._rng.random((len(cdf), 1)) * cdf[:, -1:]
+            actions = np.minimum((cdf < u).sum(axis=1), self.n_actions - 1)
+        return (actions[0] if single else actions), None
+
+
+def _activation_name(module) -> str:
+    return type(module).__name__.lower()
+
+
+def export_policy(model_path: str, out_path: Optional[str] = None) -> str:
+    """
+    Export actor MLP + observation spec dari zip SB3 ke `.npz` (butuh torch sekali di sini).
+    Return path file `.npz`.
+    """
+    from stable_baselines3 import PPO  # type: ignore
+
+    model = PPO.load(model_path, device="cpu")
+    policy = model.policy
+    if type(policy.features_extractor).__name__ != "FlattenExtractor":
+        raise ValueError(f"Features extractor {type(policy.features_extractor).__name__} tidak didukung")
+    if not hasattr(model.action_space, "n"):
+        raise ValueError(f"Hanya action space Discrete yang didukung, dapat {model.action_space}")
+
+    layers: List[Dict] = []
+    for module in policy.mlp_extractor.policy_net:
+        if type(module).__name__ == "Linear":
+            layers.append({"linear": module, "activation": "identity"})
+        elif layers:
+            layers[-1]["activation"] = _activation_name(module)
+        else:
+            raise ValueError(f"Modul {module} sebelum layer Linear pertama tidak didukung")
+    layers.append({"linear": policy.action_net, "activation": "identity"})
+
+    arrays = {
+        "version": np.array(POLICY_VERSION),
+        "n_layers": np.array(len(layers)),
+        "activations": np.array([layer["activation"] for layer in layers]),
+        "obs_shape": np.array(model.observation_space.shape, dtype=np.int64),
+    }
+    for i, layer in enumerate(layers):
+        arrays[f"weight_{i}"] = layer["linear"].weight.detach().cpu().numpy().astype(np.float32)
+        arrays[f"bias_{i}"] = layer["linear"].bias.detach().cpu().numpy().astype(np.float32)
+
+    out_path = out_path or os.path.splitext(model_path)[0] + ".npz"
+    tmp = out_path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+    spec = ObservationSpec.load_from_model(model_path)
+    if spec is not None:
+        spec.save_to_model(tmp)
+    os.replace(tmp, out_path)
+    return out_path
+
+
+def _benchmark(model_path: str, npz_path: str, seed: int = 0) -> None:
+    """Waktu load & predict NumpyPolicy vs SB3 (paritas aksi diuji di tests/test_numpy_policy.py)."""
+    import subprocess
+    import sys
+    import time
+
+    from stable_baselines3 import PPO  # type: ignore
+
+    model = PPO.load(model_path, device="cpu")
+    policy = NumpyPolicy.load(npz_path)
+    single = np.random.default_rng(seed).normal(0, 2, (1,) + policy.obs_shape).astype(np.float32)
+
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        model.predict(single, deterministic=True)
+    t_sb3 = (time.perf_counter() - t0) / 1000
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        policy.predict(single, deterministic=True)
+    t_np = (time.perf_counter() - t0) / 1000
+
+    # Startup proses baru: import + load model saja
+    # (RSS dari /proc, Linux saja: ru_maxrss ikut terbawa dari proses induk lewat fork+exec)
+    code = ("import time; t=time.perf_counter(); {}; print(time.perf_counter()-t); "
+            "print(next(int(l.split()[1]) // 1024 for l in open('/proc/self/status') if l.startswith('VmRSS')))")
+    here = os.path.dirname(os.path.abspath(__file__))
+    startup = {}
+    for name, stmt in (("SB3", f"from stable_baselines3 import PPO; PPO.load({model_path!r}, device='cpu')"),
+                       ("NumPy", f"import sys; sys.path.insert(0, {here!r}); from numpy_policy import NumpyPolicy; "
+                                 f"NumpyPolicy.load({npz_path!r})")):
+        try:
+            out = subprocess.run([sys.executable, "-c", code.format(stmt)], capture_output=True, text=True,
+                                 check=True).stdout.split()
+            startup[name] = f"{float(out[0]):.2f} s, RSS {out[1]} MB"
+        except (subprocess.CalledProcessError, IndexError, ValueError):
+            startup[name] = "tidak terukur"
+
+    print(f"predict 1 observasi : SB3 {t_sb3 * 1e6:.0f} us, NumPy {t_np * 1e6:.0f} us")
+    print(f"startup (import+load): SB3 {startup['SB3']}; NumPy {startup['NumPy']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export policy PPO (zip SB3) ke runtime NumPy (.npz).")
+    parser.add_argument("model", type=str, help="Path model PPO (.zip).")
+    parser.add_argument("--out", type=str, default=None, help="Path output .npz (default: nama model + .npz).")
+    parser.add_argument("--benchmark", action="store_true", help="Ukur startup/latensi NumPy vs SB3.")
+    args = parser.parse_args()
+
+    out_path = export_policy(args.model, args.out)
+    print(f"Policy NumPy ditulis ke {out_path} ({os.path.getsize(out_path) / 1024:.1f} KB)")
+    if args.benchmark:
+        _benchmark(args.model, out_path)
+
+
+if __name__ == "__main__":
+    main()
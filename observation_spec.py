@@ -0,0 +1,140 @@
+"""
+Spesifikasi observasi PPO yang disimpan DI DALAM model (PPO_agent.zip).
+
+Dulu trainer hanya memakai kolom Close, dan live bot selalu menyuapkan
+`close_prices[-4:]` mentah tanpa tahu observasi apa yang dipakai saat training.
+`ObservationSpec` mencatat kolom fitur (urutan tetap), panjang window, mode
+observasi dan parameter scaling per kolom. Trainer menulisnya sebagai entri
+`observation_spec.json` di zip model; `PPO.load` mengabaikan entri tambahan ini.
+
+Layout observasi (sama dengan trading_env.build_observations):
+    mode "close"          : window baris x F kolom, di-flatten per baris -> (window * F,)
+    mode "returns"        : return per bar kolom tunggal -> (window,)
+    mode "close_returns"  : gabungan keduanya -> (2 * window,)
+
+Live bot membangun observasi yang sama secara incremental dari
+`RingFeatureTracker(history=spec.window)`: baris fitur bar yang sudah close disimpan
+di tracker, bar yang masih terbentuk dihitung ulang per tick. Biayanya hanya
+beberapa lookup dict per update, jauh di bawah anggaran loop 50 ms.
+
+Paritas observasi live vs observasi training diuji di tests/test_observation_spec.py.
+"""
+
+import json
+import os
+import zipfile
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np  # type: ignore
+
+from feature_engine import FEATURE_COLUMNS
+
+SPEC_VERSION = 1
+SPEC_FILE = "observation_spec.json"
+# Kolom yang bisa dihitung live oleh FeatureStream (OHLC + indikator feature_engine)
+LIVE_COLUMNS = ["Open", "High", "Low", "Close"] + list(FEATURE_COLUMNS)
+
+
+@dataclass
+class ObservationSpec:
+    """
+    Args:
+        columns: kolom fitur observasi, urutan kolom matriks (N, F)
+        window: jumlah bar per observasi
+        obs_mode: "close", "returns" atau "close_returns" (dua terakhir hanya untuk satu kolom)
+        scale: kolom -> [mean, scale] seperti StandardScaler; kolom tanpa entri tidak di-scale
+    """
+
+    columns: List[str]
+    window: int
+    obs_mode: str = "close"
+    scale: Dict[str, List[float]] = field(default_factory=dict)
+    version: int = SPEC_VERSION
+
+    def __post_init__(self) -> None:
+        unknown = [c for c in self.columns if c not in LIVE_COLUMNS]
+        if unknown:
+            raise ValueError(f"Kolom {unknown} tidak bisa dihitung live (pilih dari {LIVE_COLUMNS})")
+        if self.obs_mode != "close" and len(self.columns) != 1:
+            raise ValueError(f"obs_mode {self.obs_mode} hanya untuk satu kolom fitur")
+        self._mean = np.array([self.scale.get(c, [0.0, 1.0])[0] for c in self.columns], dtype=np.float64)
+        self._std = np.array([self.scale.get(c, [0.0, 1.0])[1] for c in self.columns], dtype=np.float64)
+
+    @classmethod
+    def from_scaler(cls, columns: Sequence[str], window: int, obs_mode: str = "close",
+                    scaler=None) -> "ObservationSpec":
+        """Spec dengan parameter scaling dari ScalerArtifact preprocessing (jika ada)."""
+        scale = {}
+        if scaler is not None:
+            for i, name in enumerate(scaler.price_cols):
+                if name in columns:
+                    scale[name] = [scaler.price_mean[i], scaler.price_scale[i]]
+        return cls(columns=list(columns), window=int(window), obs_mode=obs_mode, scale=scale)
+
+    @property
+    def rows_needed(self) -> int:
+        """Jumlah baris fitur terakhir yang dibutuhkan satu observasi."""
+        return self.window + (1 if self.obs_mode != "close" else 0)
+
+    def transform(self, rows: np.ndarray) -> np.ndarray:
+        """Scale baris fitur mentah (R, F) dengan parameter spec."""
+        return (np.asarray(rows, dtype=np.float64) - self._mean) / self._std
+
+    def observation(self, rows: np.ndarray) -> np.ndarray:
+        """Observasi dari `rows_needed` baris fitur ter-scale terakhir (urut lama -> baru)."""
+        rows = np.asarray(rows, dtype=np.float32)
+        if self.obs_mode == "close":
+            return rows[-self.window:].ravel()
+        x = rows[:, 0]
+        returns = x[1:] / x[:-1] - 1
+        if self.obs_mode == "returns":
+            return returns
+        return np.concatenate([x[1:], returns])
+
+    def live_observation(self, tracker, current: Dict[str, float]) -> Optional[np.ndarray]:
+        """
+        Observasi untuk live bot dari RingFeatureTracker(history >= rows_needed - 1) dan
+        dict bar terbaru hasil `tracker.update(...)`. None jika histori belum cukup/fitur NaN.
+        """
+        need = self.rows_needed - 1
+        if len(tracker.history) < need:
+            return None
+        history = list(tracker.history)[len(tracker.history) - need:] if need else []
+        raw = [[row[c] for c in self.columns] for row in history] + [[current[c] for c in self.columns]]
+        rows = self.transform(raw)
+        if not np.isfinite(rows).all():
+            return None
+        return self.observation(rows).reshape(1, -1)
+
+    def save_to_model(self, model_path: str) -> None:
+        """Tulis spec sebagai entri di zip model SB3 (menimpa spec lama jika ada)."""
+        data = json.dumps(asdict(self), indent=1)
+        with zipfile.ZipFile(model_path, "r") as zf:
+            has_spec = SPEC_FILE in zf.namelist()
+        if has_spec:
+            _rewrite_zip_without(model_path, SPEC_FILE)
+        with zipfile.ZipFile(model_path, "a", compression=zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr(SPEC_FILE, data)
+
+    @classmethod
+    def load_from_model(cls, model_path: str) -> Optional["ObservationSpec"]:
+        """Spec dari zip model, atau None untuk model lama (observasi Close mentah 4 bar)."""
+        with zipfile.ZipFile(model_path, "r") as zf:
+            if SPEC_FILE not in zf.namelist():
+                return None
+            raw = json.loads(zf.read(SPEC_FILE))
+        version = raw.get("version")
+        if version != SPEC_VERSION:
+            raise ValueError(f"Versi observation spec {version} tidak didukung (butuh {SPEC_VERSION}): {model_path}")
+        known = {"columns", "window", "obs_mode", "scale", "version"}
+        return cls(**{k: v for k, v in raw.items() if k in known})
+
+
+def _rewrite_zip_without(path: str, name: str) -> None:
+    tmp = f"{path}.tmp"
+    with zipfile.ZipFile(path, "r") as src, zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as dst:
+        for item in src.infolist():
+            if item.filename != name:
+                dst.writestr(item, src.read(item.filename))
+    os.replace(tmp, path)
@@ -0,0 +1,451 @@
+"""
+Daemon inferensi PPO bersama untuk semua bot di satu host.
+
+Setiap proses bot dulu memanggil `PPO.load(ppo_model_path)` dan membawa runtime
+torch sendiri (~300-500 MB RSS per bot) hanya untuk MLP kecil. `PolicyServer`
+memuat setiap model SEKALI, mengumpulkan request `predict` dari semua bot dalam
+jendela singkat (`max_delay`, micro-batch) lalu menjalankan satu forward pass per
+model. `PolicyClient` punya API `predict()` yang sama dengan model SB3, dan
+otomatis kembali ke inferensi in-process jika daemon tidak tersedia (koneksi
+dicoba ulang setiap `retry_interval` detik). Saat konek, klien meminta daemon
+memuat model lebih dulu (op "load"), jadi request predict pertama tidak ikut
+menunggu import torch / PPO.load di daemon.
+
+Transport memakai multiprocessing.connection: named pipe di Windows (tempat
+terminal MT5 berjalan) dan Unix socket di Linux. Pesan berupa header JSON + array
+mentah (tanpa pickle).
+
+Keamanan: model .zip SB3 di-deserialize dengan cloudpickle, jadi MEMUAT model
+sama dengan menjalankan kode dari file itu. Karena itu:
+- setiap koneksi wajib lolos autentikasi HMAC (`authkey`) memakai kunci dari
+  `--key_file` (default DEFAULT_KEY_FILE, dibuat daemon dengan mode 0600); bot
+  membaca file kunci yang sama,
+- daemon hanya memuat model (.zip/.npz) di bawah direktori `--model_dir` yang
+  ditentukan saat daemon start (path di-resolve, symlink/.. tidak bisa keluar).
+Hanya masukkan direktori berisi model tepercaya ke --model_dir.
+
+Contoh:
+    python policy_server.py --model_dir .                     (jalankan daemon di DEFAULT_ADDRESS)
+    python Aventa_Hybrid_PPO_v9.py ... --policy_server        (bot memakai daemon)
+    python policy_server.py --benchmark --model PPO_agent.zip (in-process vs daemon, 8 klien)
+"""
+
+import argparse
+import json
+import os
+import queue
+import secrets
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np  # type: ignore
+
+DEFAULT_ADDRESS = r"\\.\pipe\aventa_policy" if sys.platform == "win32" else "/tmp/aventa_policy.sock"
+DEFAULT_KEY_FILE = os.path.join(os.path.expanduser("~"), ".aventa_policy.key")
+MODEL_EXTENSIONS = (".zip", ".npz")
+_HEADER = struct.Struct("<I")
+
+
+def load_authkey(path: str = DEFAULT_KEY_FILE, create: bool = False) -> bytes:
+    """Kunci HMAC bersama daemon & bot. create=True: buat file acak (mode 0600) jika belum ada."""
+    if create and not os.path.exists(path):
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(secrets.token_hex(32).encode("ascii"))
+    with open(path, "rb") as f:
+        key = f.read().strip()
+    if not key:
+        raise ValueError(f"File kunci {path} kosong")
+    return key
+
+
+def daemon_running(address: str) -> bool:
+    """True jika ada proses yang menerima koneksi di `address`."""
+    try:
+        Client(address).close()
+    except OSError:
+        return False
+    return True
+
+
+def load_policy(model_path: str, device: str = "auto"):
+    """
+    Model untuk inferensi: `.npz` hasil numpy_policy.py dimuat tanpa torch; selain itu
+    PPO.load dengan import stable_baselines3 (dan torch) hanya saat benar-benar dibutuhkan.
+    """
+    if model_path.endswith(".npz"):
+        from numpy_policy import NumpyPolicy
+        return NumpyPolicy.load(model_path)
+    from stable_baselines3 import PPO  # type: ignore
+    return PPO.load(model_path, device=device)
+
+
+def _pack(header: Dict, array: Optional[np.ndarray] = None) -> bytes:
+    if array is not None:
+        array = np.ascontiguousarray(array)
+        header = dict(header, dtype=array.dtype.str, shape=list(array.shape))
+    raw = json.dumps(header).encode("utf-8")
+    return _HEADER.pack(len(raw)) + raw + (array.tobytes() if array is not None else b"")
+
+
+def _unpack(data: bytes) -> Tuple[Dict, Optional[np.ndarray]]:
+    (size,) = _HEADER.unpack_from(data)
+    header = json.loads(data[_HEADER.size:_HEADER.size + size].decode("utf-8"))
+    if "dtype" not in header:
+        return header, None
+    array = np.frombuffer(data, dtype=np.dtype(header["dtype"]), offset=_HEADER.size + size)
+    return header, array.reshape(header["shape"])
+
+
+@dataclass
+class _Request:
+    model: str
+    deterministic: bool
+    obs: np.ndarray
+    done: threading.Event = field(default_factory=threading.Event)
+    reply: bytes = b""
+
+
+class PolicyServer:
+    """
+    Args:
+        address: alamat listener (path Unix socket atau nama pipe Windows)
+        authkey: kunci HMAC yang wajib dipakai klien (lihat load_authkey)
+        model_dirs: hanya model di bawah direktori ini yang boleh dimuat
+        max_batch: jumlah request maksimum per micro-batch
+        max_delay: jendela pengumpulan request (detik) setelah request pertama tiba
+        device: device torch untuk model
+        loader: fungsi (path, device) -> model dengan `predict(obs, deterministic)`
+    """
+
+    def __init__(self, address: str, authkey: bytes, model_dirs: Sequence[str], max_batch: int = 64,
+                 max_delay: float = 0.002, device: str = "cpu", loader: Callable = load_policy):
+        if not authkey:
+            raise ValueError("authkey wajib diisi")
+        if not model_dirs:
+            raise ValueError("Minimal satu direktori model (model_dirs) wajib diisi")
+        self.address = address
+        self.authkey = bytes(authkey)
+        self.model_dirs = [os.path.realpath(d) for d in model_dirs]
+        self.max_batch = int(max_batch)
+        self.max_delay = float(max_delay)
+        self.device = device
+        self.loader = loader
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._models: Dict[str, Tuple[float, object]] = {}
+        self._models_lock = threading.Lock()
+        self._listener: Optional[Listener] = None
+        self._closed = threading.Event()
+        # Statistik
+        self.requests = 0
+        self.batches = 0
+
+    def start(self) -> "PolicyServer":
+        """Buka listener dan jalankan thread batch + accept di latar belakang."""
+        if daemon_running(self.address):
+            raise RuntimeError(f"Policy server lain sudah berjalan di {self.address}")
+        if sys.platform != "win32" and os.path.exists(self.address):
+            os.remove(self.address)  # socket sisa daemon sebelumnya yang berhenti tidak bersih
+        self._listener = Listener(self.address, authkey=self.authkey)
+        threading.Thread(target=self._batch_loop, name="policy-batch", daemon=True).start()
+        threading.Thread(target=self._accept_loop, name="policy-accept", daemon=True).start()
+        return self
+
+    def serve_forever(self) -> None:
+        self.start()
+        print(f"Policy server aktif di {self.address} (max_batch={self.max_batch}, "
+              f"max_delay={self.max_delay * 1000:.1f} ms), model dari: {self.model_dirs}")
+        try:
+            while not self._closed.wait(60.0):
+                if self.batches:
+                    print(f"{self.requests} request dalam {self.batches} batch "
+                          f"(rata-rata {self.requests / self.batches:.1f} per batch), model: {list(self._models)}")
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._closed.set()
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+
+    def _accept_loop(self) -> None:
+        while not self._closed.is_set():
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError, AttributeError, AuthenticationError):
+                # Termasuk klien tanpa kunci yang benar (ditolak saat handshake HMAC)
+                if self._closed.is_set():
+                    return
+                continue
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn) -> None:
+        """Satu thread per bot: terima request, antrekan ke batcher, kirim balasan."""
+        try:
+            while True:
+                header, obs = _unpack(conn.recv_bytes())
+                if header.get("op") == "load":
+                    conn.send_bytes(self._load_reply(header["model"]))
+                    continue
+                request = _Request(header["model"], bool(header.get("deterministic", False)),
+                                   np.asarray(obs, dtype=np.float32))
+                self._queue.put(request)
+                request.done.wait()
+                conn.send_bytes(request.reply)
+        except (EOFError, OSError, ValueError, KeyError):
+            pass
+        finally:
+            conn.close()
+
+    def _batch_loop(self) -> None:
+        while not self._closed.is_set():
+            try:
+                batch = [self._queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._run(batch)
+
+    def _run(self, batch: List[_Request]) -> None:
+        self.batches += 1
+        self.requests += len(batch)
+        groups: Dict[Tuple[str, bool], List[_Request]] = {}
+        for request in batch:
+            groups.setdefault((request.model, request.deterministic), []).append(request)
+        for (path, deterministic), requests in groups.items():
+            try:
+                model = self._model(path)
+                obs = np.concatenate([r.obs for r in requests])
+                actions, _ = model.predict(obs, deterministic=deterministic)
+                actions = np.asarray(actions).reshape(len(obs), -1)
+                bounds = np.cumsum([len(r.obs) for r in requests])[:-1]
+                for request, part in zip(requests, np.split(actions, bounds)):
+                    request.reply = _pack({"ok": True}, part)
+            except Exception as e:
+                for request in requests:
+                    request.reply = _pack({"ok": False, "error": f"{type(e).__name__}: {e}"})
+            for request in requests:
+                request.done.set()
+
+    def _load_reply(self, path: str) -> bytes:
+        try:
+            self._model(path)
+            return _pack({"ok": True})
+        except Exception as e:
+            return _pack({"ok": False, "error": f"{type(e).__name__}: {e}"})
+
+    def _allowed_path(self, path: str) -> str:
+        """Path asli model jika berada di bawah salah satu model_dirs; selain itu PermissionError."""
+        real = os.path.realpath(path)
+        inside = any(os.path.commonpath([real, root]) == root for root in self.model_dirs)
+        if not inside or not real.endswith(MODEL_EXTENSIONS):
+            raise PermissionError(f"Model {path} ditolak: harus file {'/'.join(MODEL_EXTENSIONS)} di bawah "
+                                  f"{self.model_dirs}")
+        return real
+
+    def _model(self, path: str):
+        """Model dari cache; dimuat ulang jika file model berubah (mis. hasil training baru)."""
+        path = self._allowed_path(path)
+        mtime = os.path.getmtime(path)
+        with self._models_lock:
+            cached = self._models.get(path)
+            if cached is None or cached[0] != mtime:
+                print(f"Memuat model {path}...")
+                cached = (mtime, self.loader(path, self.device))
+                self._models[path] = cached
+        return cached[1]
+
+
+class PolicyClient:
+    """
+    Pengganti model SB3 di bot: `predict()` lewat daemon, fallback in-process.
+
+    Args:
+        model_path: path model PPO (.zip)
+        address: alamat PolicyServer
+        authkey: kunci HMAC daemon; None = baca DEFAULT_KEY_FILE (tanpa file kunci -> langsung in-process)
+        timeout: batas tunggu balasan predict dari daemon (detik) sebelum fallback
+        load_timeout: batas tunggu daemon memuat model saat konek (detik)
+        retry_interval: jeda (detik) sebelum mencoba konek ulang ke daemon
+        loader: fungsi path -> model untuk fallback in-process (dimuat sekali saat pertama dibutuhkan)
+    """
+
+    def __init__(self, model_path: str, address: str = DEFAULT_ADDRESS, authkey: Optional[bytes] = None,
+                 timeout: float = 0.25, load_timeout: float = 30.0, retry_interval: float = 30.0,
+                 loader: Callable = load_policy):
+        self.model_path = os.path.abspath(model_path)
+        self.address = address
+        self.last_error: Optional[str] = None
+        if authkey is None:
+            try:
+                authkey = load_authkey()
+            except (OSError, ValueError) as e:
+                self.last_error = f"Kunci policy server tidak terbaca: {e}"
+        self.authkey = authkey
+        self.timeout = float(timeout)
+        self.load_timeout = float(load_timeout)
+        self.retry_interval = float(retry_interval)
+        self.loader = loader
+        self._conn = None
+        self._next_connect = 0.0
+        self._local = None
+        # Statistik
+        self.remote_calls = 0
+        self.local_calls = 0
+        self._connect()
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None
+
+    def predict(self, observation, deterministic: bool = False):
+        """Sama dengan `PPO.predict`: (actions, None)."""
+        obs = np.asarray(observation, dtype=np.float32)
+        single = obs.ndim == 1
+        actions = self._remote(obs.reshape(1, -1) if single else obs, deterministic)
+        if actions is None:
+            self.local_calls += 1
+            if self._local is None:
+                self._local = self.loader(self.model_path)
+            return self._local.predict(observation, deterministic=deterministic)
+        self.remote_calls += 1
+        actions = actions.reshape(len(actions)) if actions.shape[-1] == 1 else actions
+        return (actions[0] if single else actions), None
+
+    def _connect(self) -> bool:
+        """Konek ke daemon dan pastikan model sudah dimuat di sana."""
+        if time.monotonic() < self._next_connect or not self.authkey:
+            return False
+        try:
+            self._conn = Client(self.address, authkey=self.authkey)
+        except (OSError, EOFError, AuthenticationError) as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            self._next_connect = time.monotonic() + self.retry_interval
+            return False
+        header, _ = self._call({"op": "load", "model": self.model_path}, None, self.load_timeout)
+        if header is None or not header.get("ok"):
+            if header is not None:
+                self.last_error = header.get("error")
+            self.close()
+            self._next_connect = time.monotonic() + self.retry_interval
+            return False
+        return True
+
+    def _call(self, header: Dict, array: Optional[np.ndarray], timeout: float):
+        try:
+            self._conn.send_bytes(_pack(header, array))
+            if not self._conn.poll(timeout):
+                raise TimeoutError(f"tidak ada balasan dalam {timeout} detik")
+            return _unpack(self._conn.recv_bytes())
+        except (OSError, EOFError, ValueError) as e:
+            # Balasan yang terlambat akan merusak urutan pesan: tutup koneksi, coba lagi nanti
+            self.last_error = str(e)
+            self.close()
+            self._next_connect = time.monotonic() + self.retry_interval
+            return None, None
+
+    def _remote(self, obs: np.ndarray, deterministic: bool) -> Optional[np.ndarray]:
+        if self._conn is None and not self._connect():
+            return None
+        header, actions = self._call({"model": self.model_path, "deterministic": deterministic}, obs, self.timeout)
+        if header is None or not header.get("ok"):
+            if header is not None:
+                self.last_error = header.get("error")
+            return None
+        return actions
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except OSError:
+                pass
+            self._conn = None
+
+
+def _benchmark(model_path: str, clients: int = 8, requests: int = 500, max_delay: float = 0.002) -> bool:
+    """Inferensi in-process vs daemon (klien berupa thread) + cek aksi deterministik identik."""
+    address = DEFAULT_ADDRESS + f".bench{os.getpid()}"
+    model = load_policy(model_path, device="cpu")
+    dim = int(np.prod(model.observation_space.shape))
+    obs = np.random.default_rng(0).normal(0, 1, (clients, requests, dim)).astype(np.float32)
+
+    t0 = time.perf_counter()
+    expected = np.array([[model.predict(o.reshape(1, -1), deterministic=True)[0][0] for o in row] for row in obs])
+    t_local = time.perf_counter() - t0
+
+    authkey = secrets.token_bytes(32)
+    server = PolicyServer(address, authkey, [os.path.dirname(os.path.abspath(model_path))], max_batch=clients,
+                          max_delay=max_delay, device="cpu", loader=lambda path, device: model).start()
+    got = np.zeros_like(expected)
+    latencies: List[float] = []
+
+    def run(k: int) -> None:
+        client = PolicyClient(model_path, address, authkey=authkey, timeout=5.0, loader=lambda path: model)
+        for i in range(requests):
+            t = time.perf_counter()
+            got[k, i] = client.predict(obs[k, i].reshape(1, -1), deterministic=True)[0][0]
+            latencies.append(time.perf_counter() - t)
+        client.close()
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=run, args=(k,)) for k in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    t_server = time.perf_counter() - t0
+    server.close()
+
+    same = bool(np.array_equal(got, expected))
+    total = clients * requests
+    p50, p99 = np.percentile(np.asarray(latencies) * 1000, [50, 99])
+    print(f"{clients} klien x {requests} predict, obs dim {dim}")
+    print(f"in-process berurutan : {t_local * 1000:8.0f} ms  ({t_local / total * 1e6:.0f} us/predict)")
+    print(f"policy server        : {t_server * 1000:8.0f} ms  (latensi p50 {p50:.2f} ms, p99 {p99:.2f} ms, "
+          f"{server.requests / max(server.batches, 1):.1f} request/batch)")
+    print(f"aksi identik: {same}")
+    return same
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Daemon inferensi PPO bersama (micro-batch) untuk semua bot.")
+    parser.add_argument("--address", type=str, default=DEFAULT_ADDRESS, help="Unix socket / named pipe.")
+    parser.add_argument("--model_dir", type=str, action="append", default=None,
+                        help="Direktori model tepercaya yang boleh dimuat (bisa diulang; default: direktori kerja).")
+    parser.add_argument("--key_file", type=str, default=DEFAULT_KEY_FILE,
+                        help="File kunci autentikasi (dibuat jika belum ada; bot memakai file yang sama).")
+    parser.add_argument("--max_batch", type=int, default=64, help="Request maksimum per micro-batch.")
+    parser.add_argument("--max_delay_ms", type=float, default=2.0, help="Jendela pengumpulan batch (ms).")
+    parser.add_argument("--device", type=str, default="cpu", help="Device torch (default cpu).")
+    parser.add_argument("--benchmark", action="store_true", help="Bandingkan in-process vs daemon lalu keluar.")
+    parser.add_argument("--model", type=str, default="PPO_agent.zip", help="Model untuk --benchmark.")
+    parser.add_argument("--clients", type=int, default=8, help="Jumlah klien untuk --benchmark.")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        _benchmark(args.model, clients=args.clients, max_delay=args.max_delay_ms / 1000.0)
+        return
+    PolicyServer(args.address, load_authkey(args.key_file, create=True), args.model_dir or [os.getcwd()],
+                 args.max_batch, args.max_delay_ms / 1000.0, args.device).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
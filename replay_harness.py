@@ -0,0 +1,403 @@
+"""
+Replay tick-level: menjalankan `trading_loop()` bot live secara offline.
+
+Semua logika keputusan (target profit, close_profit, counter drawdown, window
+ON/PAUSE, max_open_trades, jeda open 1 detik) hanya ada di trading_loop() dan
+dulu hanya bisa dijalankan melawan terminal sungguhan. Harness ini menjalankan
+skrip Aventa_Hybrid_PPO_v9.py apa adanya, dengan tiga pengganti:
+- `MetaTrader5` -> fake_mt5.FakeMT5 yang diberi tick rekaman (ReplayTickFeed):
+  fill instan di bid/ask, TP tereksekusi saat tick menyentuh harga TP, bar M1
+  dibangun dari tick (bar yang sedang terbentuk hanya memakai tick sampai "sekarang"),
+- jam bot -> bot_clock.VirtualClock (dipasang dengan install_clock): sleep()
+  memajukan waktu tanpa tidur,
+- `TickScheduler` -> subclass yang mencatat latensi nyata setiap iterasi loop.
+
+Pengganti modul hanya berlaku untuk skrip bot (lewat `__import__` di builtins
+skrip), modul lain tidak tersentuh. Modul `time` dan `datetime` skrip juga diarahkan
+ke jam virtual, sehingga revisi bot lama (sebelum bot_clock) bisa diputar ulang
+dengan --bot_script untuk perbandingan. File output bot (log_transaksi.csv, report, status
+window) ditulis ke `--workdir`, stdout bot ke `<workdir>/replay_stdout.log`.
+
+Tick rekaman: CSV/.npy dengan kolom time_msc (atau time, detik), bid, ask, mis.
+hasil `mt5.copy_ticks_range`. Histori bar M1 sebelum tick pertama (opsional, untuk
+warm-up 100 bar) lewat --rates: CSV/.npy kolom time, open, high, low, close, ...
+
+Contoh:
+    python replay_harness.py --ticks ticks_XAUUSD.csv --rates m1_XAUUSD.csv --ppo_model_path PPO_agent.zip
+    python replay_harness.py --synthetic_hours 24 --ppo_model_path PPO_agent.zip --close_profit 1.0
+Argumen yang tidak dikenal harness diteruskan ke bot; argumen wajib bot yang tidak
+diberikan diisi dengan BOT_DEFAULTS.
+"""
+
+import argparse
+import builtins
+import contextlib
+import os
+import signal
+import sys
+import tempfile
+import time
+import types
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+
+import fake_mt5
+from bar_buffer import RATES_DTYPE
+from bot_clock import ClockStopped, VirtualClock, get_clock, install_clock
+from tick_scheduler import TickScheduler
+
+BOT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Aventa_Hybrid_PPO_v9.py")
+# Argumen wajib bot yang diisi otomatis jika tidak diberikan
+BOT_DEFAULTS = {
+    "--mt5_path": "replay",
+    "--symbol": "XAUUSD",
+    "--lot_size": "0.01",
+    "--close_profit": "0.5",
+    "--max_open_trades": "5",
+    "--type_filling": "2",
+    "--max_spread": "1.0",
+}
+# Argumen bot berisi path file (dijadikan absolut karena bot dijalankan di workdir)
+BOT_PATH_ARGS = ("--ppo_model_path", "--scaler_path")
+SYNTHETIC_START = "2024-01-08 08:00"
+
+
+@dataclass
+class IterationProfile:
+    """Latensi nyata (detik) dan jumlah panggilan MT5 per iterasi trading_loop."""
+
+    latency: List[float] = field(default_factory=list)
+    new_tick: List[bool] = field(default_factory=list)
+    calls: List[int] = field(default_factory=list)
+
+
+class ProfiledScheduler(TickScheduler):
+    """
+    TickScheduler yang mengukur satu iterasi loop: dari event dikembalikan sampai
+    wait() berikutnya dipanggil. Polling di dalam wait() tidak ikut dihitung.
+    """
+
+    profile: IterationProfile = None
+
+    def __init__(self, *args, **kwargs):
+        # Revisi bot lama membuat scheduler tanpa clock/sleep: pakai jam yang terpasang
+        kwargs.setdefault("clock", get_clock().monotonic)
+        kwargs.setdefault("sleep", get_clock().sleep)
+        super().__init__(*args, **kwargs)
+
+    def wait(self):
+        entered = time.perf_counter()
+        total = getattr(self.mt5, "total_calls", 0)
+        if getattr(self, "_returned", None) is not None:
+            self.profile.latency.append(entered - self._returned)
+            self.profile.new_tick.append(self._last_new_tick)
+            self.profile.calls.append(total - self._calls_at_return)
+        event = super().wait()
+        self._last_new_tick = event.new_tick
+        self._calls_at_return = getattr(self.mt5, "total_calls", 0)
+        self._returned = time.perf_counter()
+        return event
+
+
+def _percentiles(values: np.ndarray) -> Dict[str, float]:
+    if not len(values):
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": float(p50), "p95": float(p95), "p99": float(p99), "max": float(values.max())}
+
+
+@dataclass
+class ReplayReport:
+    """
+    Args:
+        virtual_seconds: durasi pasar yang diputar ulang
+        wall_seconds: durasi nyata replay
+        profile: latensi per iterasi (ProfiledScheduler)
+        deals: deal fake_mt5 (open, close oleh bot, TP)
+        balance, equity: akun di akhir replay
+        stop_reason: alasan replay berhenti
+        mt5_calls: total panggilan per fungsi MT5 selama replay
+    """
+
+    virtual_seconds: float
+    wall_seconds: float
+    profile: IterationProfile
+    deals: list
+    balance: float
+    equity: float
+    stop_reason: str
+    mt5_calls: Dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> dict:
+        latency = np.asarray(self.profile.latency) * 1000.0
+        new_tick = np.asarray(self.profile.new_tick, dtype=bool)
+        calls = np.asarray(self.profile.calls)
+        closes = [d for d in self.deals if d.entry == fake_mt5.FakeMT5.DEAL_ENTRY_OUT]
+        out = {
+            "stop_reason": self.stop_reason,
+            "virtual_hours": round(self.virtual_seconds / 3600.0, 2),
+            "wall_seconds": round(self.wall_seconds, 2),
+            "speedup": round(self.virtual_seconds / self.wall_seconds, 1) if self.wall_seconds > 0 else 0.0,
+            "iterations": int(len(latency)),
+            "tick_iterations": int(new_tick.sum()),
+            "mt5_calls_per_iteration": round(float(calls.mean()), 2) if len(calls) else 0.0,
+            "opened": sum(1 for d in self.deals if d.entry == fake_mt5.FakeMT5.DEAL_ENTRY_IN),
+            "closed_by_bot": sum(1 for d in closes if d.reason == fake_mt5.FakeMT5.DEAL_REASON_EXPERT),
+            "tp_hits": sum(1 for d in closes if d.reason == fake_mt5.FakeMT5.DEAL_REASON_TP),
+            "closed_profit": round(sum(d.profit for d in closes), 2),
+            "balance": round(self.balance, 2),
+            "equity": round(self.equity, 2),
+        }
+        for name, mask in (("tick", new_tick), ("risk", ~new_tick)):
+            for key, value in _percentiles(latency[mask]).items():
+                out[f"{name}_latency_{key}_ms"] = round(value, 3)
+        return out
+
+
+def load_ticks(path: str) -> np.ndarray:
+    """Tick rekaman (.npy atau CSV) -> array TICK_DTYPE urut waktu (tick tanpa bid/ask dibuang)."""
+    if path.endswith(".npy"):
+        raw = np.load(path)
+        columns = {name: raw[name] for name in raw.dtype.names}
+    else:
+        frame = pd.read_csv(path)
+        columns = {name: frame[name].to_numpy() for name in frame.columns}
+    if "time_msc" in columns:
+        time_msc = np.asarray(columns["time_msc"], dtype=np.int64)
+    elif "time" in columns:
+        time_msc = _to_unix_seconds(columns["time"]) * 1000
+    else:
+        raise ValueError(f"File tick {path} butuh kolom time_msc atau time")
+    ticks = np.zeros(len(time_msc), dtype=fake_mt5.TICK_DTYPE)
+    ticks["time_msc"] = time_msc
+    ticks["bid"] = columns["bid"]
+    ticks["ask"] = columns["ask"]
+    ticks = ticks[(ticks["bid"] > 0) & (ticks["ask"] > 0)]
+    return ticks[np.argsort(ticks["time_msc"], kind="stable")]
+
+
+def load_rates(path: str) -> np.ndarray:
+    """Bar M1 (.npy atau CSV, kolom time + OHLC) -> array RATES_DTYPE urut waktu."""
+    if path.endswith(".npy"):
+        raw = np.load(path)
+        columns = {name: raw[name] for name in raw.dtype.names}
+    else:
+        frame = pd.read_csv(path)
+        columns = {name.lower(): frame[name].to_numpy() for name in frame.columns}
+    rates = np.zeros(len(columns["time"]), dtype=RATES_DTYPE)
+    rates["time"] = _to_unix_seconds(columns["time"])
+    for name in RATES_DTYPE.names[1:]:
+        if name in columns:
+            rates[name] = columns[name]
+    return rates[np.argsort(rates["time"], kind="stable")]
+
+
+def _to_unix_seconds(values) -> np.ndarray:
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.number):
+        return values.astype(np.int64)
+    return pd.to_datetime(values).astype("int64").to_numpy() // 1_000_000_000
+
+
+def synthetic_ticks(start: float, seconds: float, ticks_per_second: float = 2.0, start_price: float = 2000.0,
+                    spread: float = 0.2, step: float = 0.05, seed: int = 0) -> np.ndarray:
+    """Tick sintetis ter-seed: kedatangan Poisson, bid random walk +-step."""
+    rng = np.random.default_rng(seed)
+    count = int(seconds * ticks_per_second * 1.2) + 16
+    arrival = start + np.cumsum(rng.exponential(1.0 / ticks_per_second, count))
+    arrival = arrival[arrival < start + seconds]
+    bid = np.round(start_price + np.cumsum(rng.choice((-step, step), len(arrival))), 5)
+    ticks = np.zeros(len(arrival), dtype=fake_mt5.TICK_DTYPE)
+    ticks["time_msc"] = (arrival * 1000).astype(np.int64)
+    ticks["bid"] = bid
+    ticks["ask"] = np.round(bid + spread, 5)
+    return ticks
+
+
+def synthetic_data(hours: float, seed: int = 0):
+    """Tick sintetis selama `hours` jam mulai SYNTHETIC_START + 200 bar M1 histori untuk warm-up."""
+    start = datetime.strptime(SYNTHETIC_START, "%Y-%m-%d %H:%M").timestamp()
+    history = fake_mt5.synthetic_rates(int(start) - 200 * 60, 200, seed=seed)
+    ticks = synthetic_ticks(start, hours * 3600.0, start_price=float(history["close"][-1]), seed=seed)
+    return ticks, history
+
+
+def _virtual_time_module(clock: VirtualClock) -> types.ModuleType:
+    """Modul `time` untuk revisi bot lama yang masih memanggil time.time()/time.sleep() langsung."""
+    module = types.ModuleType("time")
+    module.__dict__.update(vars(time))
+    module.time = clock.time
+    module.monotonic = clock.monotonic
+    module.sleep = clock.sleep
+    return module
+
+
+def _virtual_datetime_module(clock: VirtualClock) -> types.ModuleType:
+    """Modul `datetime` dengan datetime.now() dari jam virtual (untuk revisi bot lama)."""
+    import datetime as real_datetime
+
+    class VirtualDateTime(real_datetime.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return real_datetime.datetime.fromtimestamp(clock.time(), tz)
+
+    module = types.ModuleType("datetime")
+    module.__dict__.update(vars(real_datetime))
+    module.datetime = VirtualDateTime
+    return module
+
+
+def with_bot_defaults(bot_args: Sequence[str]) -> List[str]:
+    """Lengkapi argumen wajib bot dan jadikan path model/scaler absolut."""
+    out = list(bot_args)
+    for i, arg in enumerate(out):
+        name, eq, value = arg.partition("=")
+        if name in BOT_PATH_ARGS:
+            if eq:
+                out[i] = f"{name}={os.path.abspath(value)}"
+            elif i + 1 < len(out):
+                out[i + 1] = os.path.abspath(out[i + 1])
+    given = {arg.partition("=")[0] for arg in out}
+    for name, value in BOT_DEFAULTS.items():
+        if name not in given:
+            out += [name, value]
+    return out
+
+
+def _bot_symbol(bot_args: Sequence[str]) -> str:
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--symbol", type=str)
+    return parser.parse_known_args(list(bot_args))[0].symbol
+
+
+def run_replay(
+    bot_args: Sequence[str],
+    ticks: np.ndarray,
+    history: Optional[np.ndarray] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    workdir: Optional[str] = None,
+    balance: float = 10000.0,
+    point: float = 0.01,
+    contract_size: float = 100.0,
+    charge_compute: bool = False,
+    bot_script: str = BOT_SCRIPT,
+) -> ReplayReport:
+    """
+    Jalankan skrip bot di atas tick rekaman dari `start` sampai `end` (waktu unix, default
+    rentang tick). Bar M1 dibangun dari tick; `history` (bar M1) menambah histori sebelum tick pertama.
+    """
+    bot_args = with_bot_defaults(bot_args)
+    start = float(ticks["time_msc"][0]) / 1000.0 if start is None else float(start)
+    end = float(ticks["time_msc"][-1]) / 1000.0 + 1.0 if end is None else float(end)
+    workdir = os.path.abspath(workdir or tempfile.mkdtemp(prefix="replay_"))
+    os.makedirs(workdir, exist_ok=True)
+
+    clock = VirtualClock(start, end, charge_compute=charge_compute)
+    rates = fake_mt5.ticks_to_rates(ticks, point)
+    if history is not None and len(history):
+        rates = np.concatenate((history[history["time"] < rates["time"][0]], rates))
+    feed = fake_mt5.ReplayTickFeed(_bot_symbol(bot_args), ticks, clock=clock.time)
+    fake = fake_mt5.FakeMT5(feed=feed, balance=balance, point=point, rates=rates, time_fn=clock.time,
+                            contract_size=contract_size)
+    profile = IterationProfile()
+    counting = fake_mt5.CountingMT5(fake)
+    scheduler_module = types.ModuleType("tick_scheduler")
+    scheduler_module.TickScheduler = type("TickScheduler", (ProfiledScheduler,), {"profile": profile})
+    overrides = {
+        "MetaTrader5": counting,
+        "tick_scheduler": scheduler_module,
+        "time": _virtual_time_module(clock),
+        "datetime": _virtual_datetime_module(clock),
+    }
+
+    def replay_import(name, globals=None, locals=None, fromlist=(), level=0):
+        if level == 0 and name in overrides:
+            return overrides[name]
+        return builtins.__import__(name, globals, locals, fromlist, level)
+
+    bot_builtins = dict(vars(builtins))
+    bot_builtins["__import__"] = replay_import
+    bot_globals = {"__name__": "__replay__", "__file__": bot_script, "__builtins__": bot_builtins}
+    with open(bot_script, "r", encoding="utf-8") as f:
+        code = compile(f.read(), bot_script, "exec")
+
+    saved = (list(sys.argv), os.getcwd(), signal.getsignal(signal.SIGINT), install_clock(clock))
+    bot_dir = os.path.dirname(os.path.abspath(bot_script))
+    if bot_dir not in sys.path:
+        sys.path.insert(0, bot_dir)
+    stop_reason = "akhir data"
+    t0 = time.perf_counter()
+    try:
+        sys.argv = [bot_script] + bot_args
+        os.chdir(workdir)
+        with open("replay_stdout.log", "w", encoding="utf-8") as out, contextlib.redirect_stdout(out):
+            exec(code, bot_globals)
+        stop_reason = "trading_loop selesai"
+    except ClockStopped:
+        pass
+    except SystemExit as e:
+        stop_reason = f"bot keluar (kode {e.code}), lihat {os.path.join(workdir, 'replay_stdout.log')}"
+    finally:
+        sys.argv, cwd, handler, previous_clock = saved
+        os.chdir(cwd)
+        signal.signal(signal.SIGINT, handler)
+        install_clock(previous_clock)
+    wall = time.perf_counter() - t0
+    account = fake.account_info()
+    return ReplayReport(
+        virtual_seconds=clock.time() - start,
+        wall_seconds=wall,
+        profile=profile,
+        deals=list(fake.deals),
+        balance=account.balance,
+        equity=account.equity,
+        stop_reason=stop_reason,
+        mt5_calls=dict(counting.calls),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay tick rekaman melalui trading_loop() bot dengan fake MT5 dan jam virtual.",
+        epilog="Argumen lain diteruskan ke Aventa_Hybrid_PPO_v9.py (mis. --ppo_model_path, --close_profit, --reverse).",
+    )
+    parser.add_argument("--ticks", type=str, help="Tick rekaman (.csv/.npy: time_msc|time, bid, ask).")
+    parser.add_argument("--rates", type=str, help="Histori bar M1 sebelum tick pertama (.csv/.npy), untuk warm-up.")
+    parser.add_argument("--synthetic_hours", type=float, default=0.0,
+                        help="Tanpa --ticks: replay tick sintetis selama N jam mulai SYNTHETIC_START.")
+    parser.add_argument("--hours", type=float, default=None, help="Batasi durasi replay (jam sejak tick pertama).")
+    parser.add_argument("--workdir", type=str, default=None, help="Folder output bot (default: folder temp baru).")
+    parser.add_argument("--balance", type=float, default=10000.0)
+    parser.add_argument("--point", type=float, default=0.01)
+    parser.add_argument("--contract_size", type=float, default=100.0)
+    parser.add_argument("--bot_script", type=str, default=BOT_SCRIPT,
+                        help="Skrip bot yang diputar ulang (mis. revisi lama dari git show).")
+    parser.add_argument("--charge_compute", action="store_true",
+                        help="Waktu komputasi nyata ikut memajukan jam virtual (latensi mempengaruhi hasil).")
+    args, bot_args = parser.parse_known_args()
+    if not any(a.partition("=")[0] == "--ppo_model_path" for a in bot_args):
+        parser.error("--ppo_model_path wajib diisi (diteruskan ke bot)")
+
+    history = load_rates(args.rates) if args.rates else None
+    if args.ticks:
+        ticks = load_ticks(args.ticks)
+    elif args.synthetic_hours > 0:
+        ticks, history = synthetic_data(args.synthetic_hours)
+    else:
+        parser.error("isi --ticks atau --synthetic_hours")
+    end = float(ticks["time_msc"][0]) / 1000.0 + args.hours * 3600.0 if args.hours else None
+
+    report = run_replay(bot_args, ticks, history, end=end, workdir=args.workdir, balance=args.balance,
+                        point=args.point, contract_size=args.contract_size, charge_compute=args.charge_compute,
+                        bot_script=os.path.abspath(args.bot_script))
+    for key, value in report.summary().items():
+        print(f"{key:<28} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Fixture bersama untuk test (pytest).
+
+Modul bot ada di root repo, modul trainer di Trainer/ (nama file seperti
+`1_import_data_mt5.py` hanya bisa diimport lewat importlib), jadi keduanya
+ditambahkan ke sys.path di sini.
+
+Jalankan dari root repo:
+    python -m pytest -q
+"""
+
+import importlib
+import os
+import sys
+
+import numpy as np  # type: ignore
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRAINER = os.path.join(ROOT, "Trainer")
+for _path in (TRAINER, ROOT):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+
+def trainer_module(name: str):
+    """Import modul Trainer/ berdasarkan nama file (mis. "2_preprocessing_data")."""
+    return importlib.import_module(name)
+
+
+def random_walk(n: int, seed: int = 0, start: float = 2000.0, step: float = 1.0) -> np.ndarray:
+    """Deret harga random walk float32 ter-seed."""
+    return (start + np.cumsum(np.random.default_rng(seed).normal(0, step, n))).astype(np.float32)
+
+
+@pytest.fixture
+def rates():
+    """Bar M1 sintetis (dtype rates MT5) sepanjang 3000 bar."""
+    import fake_mt5
+
+    return fake_mt5.synthetic_rates(1_700_000_000, 3_000, step=1.0)
@@ -0,0 +1,125 @@
+import csv
+import threading
+import time
+
+import pytest
+
+from async_logger import AsyncCsvLogger
+
+FIELDS = ["timestamp", "action", "status", "details"]
+
+
+class StalledLogger(AsyncCsvLogger):
+    """Logger yang thread penulisnya tertahan sampai `gate` di-set."""
+
+    def __init__(self, *args, **kwargs):
+        self.gate = threading.Event()
+        super().__init__(*args, **kwargs)
+
+    def _write_batch(self, batch):
+        self.gate.wait()
+        super()._write_batch(batch)
+
+
+def entry(i):
+    return {"timestamp": f"2024-03-02 10:00:{i % 60:02d}", "action": "Spread", "status": "Checked",
+            "details": f"row {i}"}
+
+
+def read_details(path):
+    with open(path, newline="") as f:
+        return [r["details"] for r in csv.DictReader(f)]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "log_transaksi.csv")
+
+
+@pytest.fixture
+def stalled(path):
+    """Logger dengan antrean 5 baris yang terisi penuh selagi penulis tertahan."""
+    logger = StalledLogger(path, FIELDS, max_queue=5, batch_size=1, flush_interval=60.0, policy="drop")
+    logger.log(entry(0))
+    deadline = time.monotonic() + 5.0
+    while not logger._queue.empty() and time.monotonic() < deadline:
+        time.sleep(0.001)  # tunggu thread mengambil baris pertama lalu tertahan
+    accepted = [logger.log(entry(i)) for i in range(1, 6)]
+    assert all(accepted) and logger._queue.full()
+    yield logger
+    logger.gate.set()
+    logger.close()
+
+
+def test_flush_writes_all_rows_in_order(path):
+    logger = AsyncCsvLogger(path, FIELDS, batch_size=64, flush_interval=60.0)
+    for i in range(1_000):
+        assert logger.log(entry(i))
+    logger.flush()
+    # flush tidak menunggu flush_interval, dan urutan antrean dipertahankan
+    assert read_details(path) == [f"row {i}" for i in range(1_000)]
+    assert logger.written == 1_000
+    logger.close()
+
+
+def test_close_drains_queue_and_rejects_later_rows(path):
+    logger = AsyncCsvLogger(path, FIELDS, batch_size=10_000, flush_interval=60.0)
+    for i in range(500):
+        logger.log(entry(i))
+    logger.close()
+    assert read_details(path) == [f"row {i}" for i in range(500)]
+    assert not logger.log(entry(500))
+    logger.close()  # idempoten
+
+
+def test_reopen_appends_without_second_header(path):
+    for start in (0, 3):
+        logger = AsyncCsvLogger(path, FIELDS)
+        for i in range(start, start + 3):
+            logger.log(entry(i))
+        logger.close()
+    assert read_details(path) == [f"row {i}" for i in range(6)]
+
+
+def test_drop_policy_never_blocks(path, stalled):
+    started = time.monotonic()
+    results = [stalled.log(entry(i)) for i in range(6, 106)]
+    assert time.monotonic() - started < 0.5
+    assert not any(results) and stalled.dropped == 100
+
+    stalled.gate.set()
+    stalled.close()
+    assert read_details(path) == [f"row {i}" for i in range(6)]
+
+
+def test_block_policy_waits_then_drops(path, stalled):
+    stalled.policy, stalled.block_timeout = "block", 0.05
+    started = time.monotonic()
+    assert not stalled.log(entry(6))
+    assert time.monotonic() - started >= 0.05
+    assert stalled.dropped == 1
+
+    # Penulis lanjut selama pemanggil menunggu: baris masuk antrean (backpressure)
+    stalled.block_timeout = 5.0
+    threading.Timer(0.05, stalled.gate.set).start()
+    assert stalled.log(entry(7))
+    stalled.close()
+    assert read_details(path) == [f"row {i}" for i in (0, 1, 2, 3, 4, 5, 7)]
+
+
+def test_close_with_stuck_writer_returns_within_timeout(stalled):
+    closed = threading.Event()
+
+    def close():
+        stalled.close(timeout=0.2)
+        closed.set()
+
+    started = time.monotonic()
+    threading.Thread(target=close, daemon=True).start()
+    assert closed.wait(timeout=3.0), "close() menggantung saat antrean penuh"
+    assert time.monotonic() - started < 1.0
+
+
+def test_rejects_unknown_policy(path):
+    with pytest.raises(ValueError):
+        AsyncCsvLogger(path, FIELDS, policy="wait")
@@ -0,0 +1,32 @@
+import numpy as np  # type: ignore
+import pytest
+
+from backtest import simulate
+from tests.conftest import random_walk
+from trading_env import SimpleTradingEnv
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+@pytest.mark.parametrize("hold_prob", [0.0, 0.7])
+def test_simulate_matches_env_step(reverse, hold_prob, n_bars=5_000, window=4):
+    """Reward per bar, total reward dan posisi akhir simulate() == SimpleTradingEnv.step bar demi bar."""
+    rng = np.random.default_rng(0)
+    prices = random_walk(n_bars)
+    # Aksi acak dengan periode hold agar semua kombinasi open/flip/hold muncul
+    actions = np.where(rng.random(n_bars - window) < hold_prob, 0, rng.integers(1, 3, n_bars - window))
+    result = simulate(prices, actions, window, spread=0.3, commission=0.05, reverse=reverse)
+
+    env = SimpleTradingEnv(prices, window=window, spread=0.3, commission=0.05, reverse=reverse)
+    env.reset()
+    rewards = np.empty(len(actions))
+    for k, a in enumerate(actions):
+        _, rewards[k], _, _, info = env.step(int(a))
+    assert np.array_equal(rewards, result.rewards)
+    assert info["total_reward"] == float(np.cumsum(result.rewards)[-1])
+    assert info["position"] == result.positions[-1]
+    assert info["entry_price"] == result.entry_prices[-1]
+
+
+def test_simulate_rejects_wrong_action_count():
+    with pytest.raises(ValueError):
+        simulate(random_walk(100), np.zeros(10, dtype=np.int64), window=4)
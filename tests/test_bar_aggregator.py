@@ -0,0 +1,58 @@
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+import pytest
+
+import fake_mt5
+from bar_aggregator import TIMEFRAMES, TimeframeAggregator, resample_rates
+from bar_buffer import RATES_DTYPE
+
+DAY = 86_400
+
+
+@pytest.fixture(scope="module")
+def m1():
+    return fake_mt5.synthetic_rates(1_700_000_000 - 1_700_000_000 % DAY, 3 * 24 * 60)
+
+
+def _as_dict(bar):
+    return {name: bar[name] for name in RATES_DTYPE.names}
+
+
+@pytest.mark.parametrize("name", list(TIMEFRAMES))
+def test_resample_matches_pandas(m1, name):
+    df = pd.DataFrame(m1)
+    df.index = pd.to_datetime(df["time"], unit="s")
+    rules = {"open": "first", "high": "max", "low": "min", "close": "last", "tick_volume": "sum"}
+    expected = df.resample(f"{TIMEFRAMES[name]}s").agg(rules).dropna()
+    got = resample_rates(m1, TIMEFRAMES[name])
+    assert np.array_equal(got["time"], expected.index.astype(np.int64) // 10**9)
+    for col in rules:
+        np.testing.assert_allclose(got[col], expected[col].values, err_msg=col)
+
+
+@pytest.mark.parametrize("name", list(TIMEFRAMES))
+def test_incremental_with_forming_updates_matches_batch(m1, name):
+    """Setiap bar M1 dikirim dulu sebagai versi terbentuk lalu versi final; volume tidak boleh ganda."""
+    agg = TimeframeAggregator(TIMEFRAMES[name], capacity=10_000)
+    for bar in m1:
+        forming = _as_dict(bar)
+        forming["close"], forming["tick_volume"] = bar["open"], 1
+        agg.on_m1(forming)
+        agg.on_m1(_as_dict(bar))
+    expected = resample_rates(m1, TIMEFRAMES[name])
+    for col in ("time", "open", "high", "low", "close", "tick_volume"):
+        assert np.array_equal(agg.bars.column(col), expected[col]), col
+
+
+def test_seed_drops_forming_bucket_and_ignores_older_m1(m1):
+    period = TIMEFRAMES["M5"]
+    native = resample_rates(m1[:600], period)
+    agg = TimeframeAggregator(period)
+    agg.seed(native)
+    assert agg.bars.last_time == native["time"][-2]
+    # Bucket yang masih terbentuk dibangun ulang dari M1; bar M1 lama diabaikan
+    start = int(np.searchsorted(m1["time"], native["time"][-1]))
+    for bar in m1[start - 20:600]:
+        agg.on_m1(_as_dict(bar))
+    assert np.array_equal(agg.bars.column("close")[-len(native):], native["close"])
+    assert agg.bars.column("tick_volume")[-1] == native["tick_volume"][-1]
@@ -0,0 +1,132 @@
+import numpy as np  # type: ignore
+import pytest
+
+import fake_mt5
+from bar_buffer import RATES_DTYPE, BarRing, BarRingBuffer
+from feature_engine import FEATURE_COLUMNS, RingFeatureTracker, compute_features
+
+SYMBOL = "XAUUSD"
+START = 1_700_000_000 - 1_700_000_000 % 60
+CAPACITY = 50
+FORMING_OFFSET = 7.5
+
+
+class Terminal:
+    """FakeMT5 dengan jam manual; bar M1 ke-`k` bisa diberi versi "masih terbentuk"."""
+
+    def __init__(self, n=400):
+        self.final = fake_mt5.synthetic_rates(START, n, step=1.0)
+        self.now = START
+        self.mt5 = fake_mt5.FakeMT5(rates=self.final.copy(), time_fn=lambda: self.now)
+
+    def at_bar(self, k, forming=True):
+        """Jam di tengah bar k; close bar k belum final (selisih FORMING_OFFSET) jika `forming`."""
+        self.mt5.rates[:] = self.final
+        self.now = START + 60 * k + 30
+        if forming:
+            self.mt5.rates["close"][k] -= FORMING_OFFSET
+
+
+def assert_matches_terminal(ring, terminal, last):
+    """Semua bar di ring == versi final bar terminal yang berakhir di bar `last`."""
+    expected = terminal.final[last + 1 - len(ring):last + 1]
+    for name in ("time", "open", "high", "low"):
+        assert np.array_equal(ring.column(name), expected[name]), name
+    # bar terakhir masih terbentuk: sisanya harus final
+    assert np.array_equal(ring.column("close")[:-1], expected["close"][:-1])
+
+
+@pytest.fixture
+def terminal():
+    return Terminal()
+
+
+def make_ring(terminal, k):
+    terminal.at_bar(k)
+    ring = BarRingBuffer(terminal.mt5, SYMBOL, fake_mt5.FakeMT5.TIMEFRAME_M1, capacity=CAPACITY)
+    assert ring.update()
+    return ring
+
+
+def test_every_bar_update_fetches_two_bars(terminal):
+    ring = make_ring(terminal, 100)
+    fetched = ring.bars_fetched
+    for k in range(101, 200):
+        terminal.at_bar(k)
+        assert ring.update()
+        assert_matches_terminal(ring, terminal, k)
+    assert ring.full_fetches == 1
+    assert ring.bars_fetched - fetched == 2 * 99
+
+
+@pytest.mark.parametrize("skipped", [1, 2, 3, 10, CAPACITY - 2])
+def test_skipped_updates_still_finalize_the_forming_bar(terminal, skipped):
+    ring = make_ring(terminal, 100)
+    assert ring.column("close")[-1] == terminal.final["close"][100] - FORMING_OFFSET
+    terminal.at_bar(100 + skipped)
+    assert ring.update()
+    assert ring.column("time")[-1 - skipped] == terminal.final["time"][100]
+    assert ring.column("close")[-1 - skipped] == terminal.final["close"][100], "bar lama tetap nilai terbentuk"
+    assert_matches_terminal(ring, terminal, 100 + skipped)
+    assert ring.full_fetches == 1, "celah kecil tidak perlu fetch penuh"
+
+
+def test_gap_longer_than_capacity_refetches_everything(terminal):
+    ring = make_ring(terminal, 100)
+    terminal.at_bar(100 + CAPACITY + 5)
+    assert ring.update()
+    assert ring.full_fetches == 2
+    assert len(ring) == CAPACITY
+    assert_matches_terminal(ring, terminal, 100 + CAPACITY + 5)
+
+
+def test_tracker_commits_final_values_after_skipped_updates(terminal):
+    """Bar yang di-commit ke FeatureStream harus versi final walau update M1 terlewat beberapa bar."""
+    ring = make_ring(terminal, 100)
+    tracker = RingFeatureTracker(history=400)
+    tracker.update(ring)
+    for k in (101, 103, 105, 108, 130, 131):  # celah 2 bar: kasus yang dulu lolos tanpa fetch ulang
+        terminal.at_bar(k)
+        ring.update()
+        tracker.update(ring)
+    # Tracker mulai dari bar pertama ring (bar 100 - CAPACITY + 1) dan sudah commit sampai bar 130
+    committed = list(tracker.history)
+    rates = terminal.final[131 - len(committed):131]
+    assert len(committed) == 131 - (100 - CAPACITY + 1)
+    batch = compute_features(rates["open"], rates["high"], rates["low"], rates["close"])
+    for col in FEATURE_COLUMNS:
+        got = np.array([row[col] for row in committed])
+        np.testing.assert_allclose(got, batch[col], rtol=1e-9, atol=1e-9, err_msg=col)
+
+
+def test_ring_push_overwrites_forming_bar_and_ignores_older_bars():
+    ring = BarRing(capacity=3)
+    bars = np.zeros(5, dtype=RATES_DTYPE)
+    bars["time"] = np.arange(5) * 60
+    bars["close"] = np.arange(5) + 100.0
+    for bar in bars:
+        ring.push(bar)
+    assert list(ring.column("time")) == [120, 180, 240] and ring.appended == 5
+    forming = bars[4].copy()
+    forming["close"] = 999.0
+    ring.push(forming)
+    ring.push(bars[0])
+    assert list(ring.column("close")) == [102.0, 103.0, 999.0] and ring.appended == 5
+
+
+def test_ring_columns_are_contiguous_read_only_views():
+    ring = BarRing(capacity=4)
+    for t in range(11):
+        bar = np.zeros(1, dtype=RATES_DTYPE)[0]
+        bar["time"] = t
+        ring.push(bar)
+    col = ring.column("time")
+    assert list(col) == [7, 8, 9, 10]
+    assert col.flags.c_contiguous and not col.flags.writeable and not col.flags.owndata
+
+
+def test_rejects_invalid_sizes():
+    with pytest.raises(ValueError):
+        BarRing(capacity=1)
+    with pytest.raises(ValueError):
+        BarRingBuffer(fake_mt5.FakeMT5(), SYMBOL, 1, fetch_count=0)
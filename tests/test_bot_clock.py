@@ -0,0 +1,52 @@
+from datetime import datetime
+
+import pytest
+
+import bot_clock
+from bot_clock import Clock, ClockStopped, SystemClock, VirtualClock
+
+START = 1_700_000_000.0
+
+
+def test_clock_is_abstract():
+    with pytest.raises(TypeError):
+        Clock()
+
+
+@pytest.mark.parametrize("clock", [SystemClock(), VirtualClock(START)], ids=["system", "virtual"])
+def test_implementations_satisfy_clock_interface(clock):
+    assert isinstance(clock, Clock)
+    assert isinstance(clock.monotonic(), float)
+    assert isinstance(clock.now(), datetime)
+    before = clock.monotonic()
+    clock.sleep(0.0)
+    clock.sleep(-1.0)  # durasi negatif diperlakukan sebagai 0
+    assert clock.monotonic() >= before
+
+
+def test_virtual_sleep_advances_time_without_sleeping():
+    clock = VirtualClock(START)
+    clock.sleep(300.0)
+    clock.sleep(0.5)
+    assert clock.monotonic() == START + 300.5
+    assert clock.now() == datetime.fromtimestamp(START + 300.5)
+    assert (clock.sleeps, clock.slept) == (2, 300.5)
+
+
+def test_virtual_clock_stops_at_end():
+    clock = VirtualClock(START, end=START + 10.0)
+    clock.sleep(9.0)
+    with pytest.raises(ClockStopped):
+        clock.sleep(1.0)
+    # BaseException: tidak tertangkap `except Exception` di trading_loop
+    assert not issubclass(ClockStopped, Exception)
+
+
+def test_install_clock_returns_previous():
+    virtual = VirtualClock(START)
+    previous = bot_clock.install_clock(virtual)
+    try:
+        assert bot_clock.get_clock() is virtual
+    finally:
+        assert bot_clock.install_clock(previous) is virtual
+    assert bot_clock.get_clock() is previous
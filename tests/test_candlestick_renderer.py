@@ -0,0 +1,47 @@
+import numpy as np  # type: ignore
+import pytest
+
+from candlestick_renderer import DEFAULT_WINDOW_SIZES, LABEL_DTYPE, label_windows, load_label_index, save_label_index
+
+
+def _label_windows_loop(open_, close, window_sizes, return_threshold):
+    """Versi loop lama (satu window per iterasi) sebagai oracle."""
+    rows = []
+    for w in window_sizes:
+        for i in range(len(close) - w):
+            last = i + w - 1
+            ma = close[i:last + 1].mean()
+            ret = close[last] / open_[i] - 1
+            if ret > return_threshold and close[last] > ma:
+                rows.append((i, w, 1))
+            elif ret < -return_threshold and close[last] < ma:
+                rows.append((i, w, -1))
+    return np.array(rows, dtype=LABEL_DTYPE)
+
+
+@pytest.fixture
+def ohlc():
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, 5_000))
+    open_ = np.r_[close[0], close[:-1]] + rng.normal(0, 0.1, len(close))
+    return open_, close
+
+
+@pytest.mark.parametrize("threshold", [0.0, 0.002, 0.01])
+def test_vectorized_labels_match_loop(ohlc, threshold):
+    open_, close = ohlc
+    expected = _label_windows_loop(open_, close, DEFAULT_WINDOW_SIZES, threshold)
+    got = label_windows(open_, close, DEFAULT_WINDOW_SIZES, threshold)
+    assert len(got) and {-1, 1} <= set(got["label"].tolist())
+    assert np.array_equal(got, expected)
+
+
+def test_series_shorter_than_window_has_no_labels(ohlc):
+    open_, close = ohlc
+    assert len(label_windows(open_[:20], close[:20], (20, 50))) == 0
+
+
+def test_label_index_round_trip(tmp_path, ohlc):
+    labels = label_windows(*ohlc, DEFAULT_WINDOW_SIZES)
+    save_label_index(str(tmp_path), labels)
+    assert np.array_equal(load_label_index(str(tmp_path)), labels)
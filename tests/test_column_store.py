@@ -0,0 +1,159 @@
+import json
+import os
+
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+import pytest
+
+import column_store
+from column_store import ColumnStore, ColumnStoreWriter, import_csv, iter_frames, load_frame
+from tests.conftest import trainer_module
+
+trading_data = trainer_module("trading_data")
+
+
+def bars(start, n, seed=0):
+    """Frame seperti data_{symbol}_mt5 + kolom teks sr_zone dan kolom bool."""
+    rng = np.random.default_rng(seed)
+    close = 2000.0 + np.cumsum(rng.normal(0, 1.0, n))
+    return pd.DataFrame({
+        "Date": pd.date_range("2024-01-01", periods=start + n, freq="min")[start:],
+        "Close": close,
+        "Volume": rng.integers(1, 100, n).astype(np.int64),
+        "sr_zone": rng.choice(["support", "resistance", "none"], n),
+        "is_up": rng.random(n) > 0.5,
+    })
+
+
+@pytest.fixture
+def store(tmp_path):
+    return str(tmp_path / "data.cols")
+
+
+def test_append_chunks_roundtrip(store):
+    frame = bars(0, 1_000)
+    with ColumnStoreWriter(store) as writer:
+        for lo in range(0, len(frame), 300):
+            writer.append(frame.iloc[lo:lo + 300])
+    got = load_frame(store)
+    pd.testing.assert_frame_equal(got, frame.reset_index(drop=True), check_dtype=False)
+    assert got["Close"].dtype == np.float64 and got["Volume"].dtype == np.int64
+    assert got["Date"].dtype.kind == "M" and got["is_up"].dtype == bool
+
+    reader = ColumnStore(store)
+    assert len(reader) == 1_000 and reader.columns == list(frame.columns)
+    assert isinstance(reader.column("Close"), np.memmap) and not reader.column("Close").flags.writeable
+    assert reader.last("Close") == frame["Close"].iloc[-1]
+
+
+def test_append_rejects_different_columns(store):
+    with ColumnStoreWriter(store) as writer:
+        writer.append(bars(0, 10))
+        with pytest.raises(ValueError):
+            writer.append(bars(10, 10)[["Date", "Close"]])
+
+
+def test_reopen_append_continues_store(store):
+    frame = bars(0, 500)
+    with ColumnStoreWriter(store) as writer:
+        writer.append(frame.iloc[:200])
+    with ColumnStoreWriter(store, append=True) as writer:
+        assert writer.length == 200
+        writer.append(frame.iloc[200:])
+    pd.testing.assert_frame_equal(load_frame(store), frame, check_dtype=False)
+
+
+def test_truncate_replaces_forming_last_bar(store):
+    """Pola update_store: bar terakhir (masih terbentuk) dipotong lalu ditulis ulang versi finalnya."""
+    final = bars(0, 300)
+    forming = final.iloc[:200].copy()
+    forming.loc[forming.index[-1], ["Close", "sr_zone"]] = [-1.0, "forming"]
+    with ColumnStoreWriter(store) as writer:
+        writer.append(forming)
+    with ColumnStoreWriter(store, append=True) as writer:
+        writer.truncate(199)
+        assert writer.length == 199
+        writer.append(final.iloc[199:])
+    got = load_frame(store)
+    assert len(got) == 300 and got["Date"].is_unique
+    pd.testing.assert_frame_equal(got, final, check_dtype=False)
+
+
+def test_bytes_after_manifest_length_are_discarded(store):
+    """Proses yang terhenti setelah menulis kolom tapi sebelum manifest: manifest menang."""
+    frame = bars(0, 400)
+    with ColumnStoreWriter(store) as writer:
+        writer.append(frame.iloc[:100])
+    for name in os.listdir(store):
+        if name.endswith(".bin"):
+            with open(os.path.join(store, name), "ab") as f:
+                f.write(b"\xff" * 37)
+    assert len(ColumnStore(store)) == 100
+    pd.testing.assert_frame_equal(load_frame(store), frame.iloc[:100], check_dtype=False)
+
+    with ColumnStoreWriter(store, append=True) as writer:
+        writer.append(frame.iloc[100:])
+    pd.testing.assert_frame_equal(load_frame(store), frame, check_dtype=False)
+    assert os.path.getsize(os.path.join(store, "Close.bin")) == 400 * 8
+
+
+def test_recreate_discards_previous_store(store):
+    with ColumnStoreWriter(store) as writer:
+        writer.append(bars(0, 100))
+    with ColumnStoreWriter(store) as writer:
+        writer.append(bars(0, 10)[["Date", "Close"]])
+    assert ColumnStore(store).columns == ["Date", "Close"]
+    assert sorted(os.listdir(store)) == ["Close.bin", "Date.bin", column_store.MANIFEST]
+
+
+def test_category_columns_grow_across_chunks(store):
+    with ColumnStoreWriter(store) as writer:
+        writer.append(pd.DataFrame({"sr_zone": ["none", "support", "none"]}))
+    with ColumnStoreWriter(store, append=True) as writer:
+        writer.append(pd.DataFrame({"sr_zone": ["resistance", "support"]}))
+    reader = ColumnStore(store)
+    with open(os.path.join(store, column_store.MANIFEST)) as f:
+        meta = json.load(f)["columns"][0]
+    assert meta["categories"] == ["none", "support", "resistance"]
+    assert reader.column("sr_zone").dtype == np.dtype("<i2")
+    assert list(reader.column("sr_zone")) == [0, 1, 0, 2, 1]
+    assert list(reader.values("sr_zone", 1, 4)) == ["support", "none", "resistance"]
+
+
+def test_unsupported_version_is_rejected(store):
+    with ColumnStoreWriter(store) as writer:
+        writer.append(bars(0, 5))
+    path = os.path.join(store, column_store.MANIFEST)
+    with open(path) as f:
+        manifest = json.load(f)
+    manifest["version"] = column_store.STORE_VERSION + 1
+    with open(path, "w") as f:
+        json.dump(manifest, f)
+    with pytest.raises(ValueError):
+        ColumnStore(store)
+
+
+def test_csv_import_export_and_chunked_iteration(tmp_path, store):
+    frame = bars(0, 1_000)
+    csv_path, exported = str(tmp_path / "data.csv"), str(tmp_path / "export.csv")
+    frame.to_csv(csv_path, index=False)
+    assert import_csv(csv_path, store, chunksize=333) == 1_000
+    pd.testing.assert_frame_equal(load_frame(store), load_frame(csv_path), check_dtype=False)
+
+    ColumnStore(store).export_csv(exported, chunksize=250)
+    pd.testing.assert_frame_equal(load_frame(exported), load_frame(csv_path))
+
+    for path in (store, csv_path):
+        chunks = list(iter_frames(path, chunksize=300, start=450))
+        assert [len(c) for c in chunks][:2] in ([300, 250], [150, 300])
+        np.testing.assert_allclose(pd.concat(chunks)["Close"], frame["Close"].iloc[450:], rtol=1e-12)
+
+
+def test_load_close_prices_from_store_is_float32(store):
+    frame = bars(0, 100)
+    frame.loc[5, "Close"] = np.nan
+    with ColumnStoreWriter(store) as writer:
+        writer.append(frame)
+    prices = trading_data.load_close_prices(store)
+    assert prices.dtype == np.float32 and len(prices) == 99
+    np.testing.assert_array_equal(prices, frame["Close"].dropna().to_numpy(np.float32))
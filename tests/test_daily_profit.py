@@ -0,0 +1,182 @@
+import csv
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import daily_profit
+from daily_profit import DailyProfitTracker, find_day_start
+
+FIELDS = ["timestamp", "action", "status", "details"]
+DAY = "2024-03-02"
+
+
+class ManualClock:
+    """Jam kalender & monotonic palsu yang dimajukan bersama-sama."""
+
+    def __init__(self, start: datetime):
+        self.start = start
+        self.seconds = 0.0
+
+    def monotonic(self) -> float:
+        return self.seconds
+
+    def now(self) -> datetime:
+        return self.start + timedelta(seconds=self.seconds)
+
+    def advance(self, seconds: float) -> None:
+        self.seconds += seconds
+
+
+def row(timestamp, profit=None, action="Close Trade", status="Successful"):
+    details = f"Profit: ${profit:.2f}" if profit is not None else "Position: 1, Volume: 0.05"
+    return {"timestamp": timestamp, "action": action, "status": status, "details": details}
+
+
+def append_rows(path, rows):
+    new = not path.exists()
+    with open(path, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        if new:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+def history(days=("2024-02-29", "2024-03-01"), per_day=3_000):
+    """Log beberapa hari sebelum DAY: tiap hari campuran baris profit dan non-profit."""
+    rows = []
+    for day in days:
+        for i in range(per_day):
+            rows.append(row(f"{day} 10:{i // 60 % 60:02d}:{i % 60:02d}", profit=1.0 if i % 3 == 0 else None))
+    return rows
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return tmp_path / "log_transaksi.csv", tmp_path / "daily_profit.json"
+
+
+@pytest.fixture
+def clock():
+    return ManualClock(datetime(2024, 3, 2, 12, 0, 0))
+
+
+def make_tracker(paths, clock, save_interval=60.0):
+    log, checkpoint = paths
+    return DailyProfitTracker(str(log), str(checkpoint), now=clock.now, save_interval=save_interval,
+                              clock=clock.monotonic)
+
+
+def read_checkpoint(paths):
+    with open(paths[1]) as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("block", [64, 1_000, 64 * 1024])
+def test_find_day_start_stops_within_one_block_of_day(monkeypatch, paths, block):
+    monkeypatch.setattr(daily_profit, "_SCAN_BLOCK", block)
+    log, _ = paths
+    append_rows(log, history())
+    append_rows(log, [row(f"{DAY} 00:00:01", profit=2.0), row(f"{DAY} 00:00:02")])
+    data = log.read_bytes()
+    first = data.index(f"{DAY} 00:00:01".encode())
+    offset = find_day_start(str(log), DAY)
+    # Awal baris, tidak melewati baris pertama hari ini, dan hanya ~1 blok sebelumnya
+    assert data[offset - 1:offset] == b"\n"
+    assert offset <= first
+    assert first - offset <= block + max(len(line) for line in data.splitlines(True))
+
+
+def test_find_day_start_edges(monkeypatch, paths):
+    monkeypatch.setattr(daily_profit, "_SCAN_BLOCK", 64)
+    log, _ = paths
+    append_rows(log, history(per_day=10))
+    # Semua baris lebih tua -> blok terakhir; semua lebih baru -> awal file (header)
+    assert log.stat().st_size - find_day_start(str(log), DAY) <= 64
+    assert find_day_start(str(log), "2024-02-01") == 0
+
+
+def test_startup_counts_only_todays_successful_closes(paths, clock):
+    log, _ = paths
+    append_rows(log, history() + [
+        row(f"{DAY} 09:00:00", profit=5.5),
+        row(f"{DAY} 09:00:01", profit=-1.25, action="Profit Target"),
+        row(f"{DAY} 09:00:02", profit=100.0, status="Failed"),
+        row(f"{DAY} 09:00:03", profit=100.0, action="Open Trade"),
+        row(f"{DAY} 09:00:04"),
+    ])
+    tracker = make_tracker(paths, clock)
+    assert tracker.total() == pytest.approx(4.25)
+    assert read_checkpoint(paths) == {"date": DAY, "total": pytest.approx(4.25), "offset": log.stat().st_size}
+
+
+def test_resume_reads_only_log_tail_after_checkpoint(monkeypatch, paths, clock):
+    log, _ = paths
+    append_rows(log, history() + [row(f"{DAY} 09:00:00", profit=5.0)])
+    make_tracker(paths, clock).close()
+    append_rows(log, [row(f"{DAY} 13:00:00", profit=2.5)])
+
+    def no_scan(*args):
+        raise AssertionError("checkpoint valid, log tidak perlu di-scan ulang")
+
+    monkeypatch.setattr(daily_profit, "find_day_start", no_scan)
+    assert make_tracker(paths, clock).total() == pytest.approx(7.5)
+
+
+def test_stale_or_invalid_checkpoint_rebuilds_from_log(paths, clock):
+    log, checkpoint = paths
+    append_rows(log, history() + [row(f"{DAY} 09:00:00", profit=3.0)])
+    for content in ({"date": "2024-03-01", "total": 50.0, "offset": 10},
+                    {"date": DAY, "total": 50.0, "offset": 10 ** 9}):
+        checkpoint.write_text(json.dumps(content))
+        assert make_tracker(paths, clock).total() == pytest.approx(3.0)
+    checkpoint.write_text("{bukan json")
+    assert make_tracker(paths, clock).total() == pytest.approx(3.0)
+
+
+def test_record_saves_checkpoint_periodically_without_double_counting(paths, clock):
+    log, _ = paths
+    append_rows(log, history())
+    tracker = make_tracker(paths, clock, save_interval=60.0)
+    written = []
+    for i in range(10):
+        entry = row(clock.now().strftime("%Y-%m-%d %H:%M:%S"), profit=1.0)
+        tracker.record(entry)
+        # Setengah baris masih di antrean logger saat checkpoint disimpan
+        if i % 2 == 0:
+            append_rows(log, [entry])
+        else:
+            written.append(entry)
+        clock.advance(15.0)
+    assert tracker.total() == pytest.approx(10.0)
+    checkpoint = read_checkpoint(paths)
+    assert 0.0 < checkpoint["total"] < 10.0, "checkpoint tidak dimajukan oleh record()"
+
+    append_rows(log, written)  # logger menulis sisa antrean lalu ditutup
+    tracker.close()
+    assert read_checkpoint(paths) == {"date": DAY, "total": pytest.approx(10.0), "offset": log.stat().st_size}
+    assert make_tracker(paths, clock).total() == pytest.approx(10.0)
+
+
+def test_day_rollover_resets_total_and_checkpoint(paths):
+    log, _ = paths
+    clock = ManualClock(datetime(2024, 3, 2, 23, 59, 0))
+    append_rows(log, history())
+    tracker = make_tracker(paths, clock, save_interval=1e9)
+    for profit in (4.0, 6.0):
+        entry = row(clock.now().strftime("%Y-%m-%d %H:%M:%S"), profit=profit)
+        tracker.record(entry)
+        append_rows(log, [entry])
+    assert tracker.total() == pytest.approx(10.0)
+
+    clock.advance(120.0)  # lewat tengah malam
+    assert tracker.total() == 0.0
+    entry = row(clock.now().strftime("%Y-%m-%d %H:%M:%S"), profit=1.5)
+    tracker.record(entry)
+    append_rows(log, [entry])
+    assert tracker.total() == pytest.approx(1.5)
+
+    tracker.close()
+    assert read_checkpoint(paths) == {"date": "2024-03-03", "total": pytest.approx(1.5),
+                                      "offset": log.stat().st_size}
+    assert make_tracker(paths, clock).total() == pytest.approx(1.5)
@@ -0,0 +1,144 @@
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+import pytest
+
+import fake_mt5
+from feature_engine import (
+    FEATURE_COLUMNS, SR_WINDOW, TOUCH_LOOKBACK, TOUCH_THRESH,
+    ChunkedFeatures, FeatureStream, compute_features, count_touches,
+)
+
+
+def _count_touches_pandas(series_close, level_series, lookback=TOUCH_LOOKBACK, touch_thresh=TOUCH_THRESH):
+    """
+    Salinan verbatim `count_touches` lama dari preprocess_data (pandas .iloc, O(n * lookback)),
+    dipakai sebagai oracle regresi. lookback/touch_thresh dulu variabel closure.
+    """
+    touches = []
+    for i in range(len(series_close)):
+        start = max(0, i - lookback + 1)
+        lvl = level_series.iloc[i]
+        if np.isnan(lvl):
+            touches.append(0)
+            continue
+        window_close = series_close.iloc[start:i+1]
+        cnt = (np.abs(window_close - lvl) / lvl <= touch_thresh).sum()
+        touches.append(int(cnt))
+    return pd.Series(touches, index=series_close.index)
+
+
+def _assert_touches_match(close, level, lookback=TOUCH_LOOKBACK, thresh=TOUCH_THRESH):
+    close_s = pd.Series(close, index=pd.date_range("2024-01-01", periods=len(close), freq="min"))
+    level_s = pd.Series(level, index=close_s.index)
+    expected = _count_touches_pandas(close_s, level_s, lookback, thresh).to_numpy()
+    got = count_touches(close, level, lookback, thresh)
+    assert got.dtype == np.int64 and got.shape == expected.shape
+    assert np.array_equal(expected, got), f"beda di {int((expected != got).sum())} bar"
+
+
+@pytest.fixture(scope="module")
+def ohlc():
+    rates = fake_mt5.synthetic_rates(1_700_000_000, 5_000, step=1.0)
+    return tuple(rates[k].astype(np.float64) for k in ("open", "high", "low", "close"))
+
+
+def _walk(n, seed):
+    # Langkah kecil relatif level -> banyak touch
+    return 2000.0 + np.cumsum(np.random.default_rng(seed).normal(0, 0.8, n))
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("extreme", ["min", "max"])
+def test_touches_match_pandas_on_sr_levels(seed, extreme):
+    close = _walk(3000, seed)
+    level = getattr(pd.Series(close).rolling(SR_WINDOW), extreme)().to_numpy()
+    _assert_touches_match(close, level)
+
+
+def test_touches_match_pandas_with_custom_lookback_and_threshold():
+    close = _walk(3000, 1)
+    _assert_touches_match(close, pd.Series(close).rolling(SR_WINDOW).min().to_numpy(), lookback=37, thresh=0.001)
+
+
+def test_touches_match_pandas_with_scattered_nan_levels():
+    rng = np.random.default_rng(0)
+    close = _walk(3000, 2)
+    level = close + rng.normal(0, 2.0, len(close))
+    level[rng.random(len(close)) < 0.1] = np.nan
+    _assert_touches_match(close, level)
+
+
+@pytest.mark.parametrize("min_periods", [None, 1])
+def test_touches_match_pandas_on_nan_leading_series(min_periods):
+    close = _walk(800, 3)
+    close[:120] = np.nan
+    level = pd.Series(close).rolling(SR_WINDOW, min_periods=min_periods).min().to_numpy()
+    _assert_touches_match(close, level)
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 17, TOUCH_LOOKBACK - 1, TOUCH_LOOKBACK])
+def test_touches_match_pandas_on_series_shorter_than_lookback(n):
+    close = _walk(n, 4)
+    level = pd.Series(close, dtype=np.float64).rolling(5, min_periods=1).min().to_numpy()
+    _assert_touches_match(close, level)
+
+
+def test_streaming_matches_batch(ohlc):
+    o, h, l, c = ohlc
+    batch = compute_features(o, h, l, c)
+    stream = FeatureStream()
+    rows = []
+    for i in range(len(c)):
+        # Bar terbentuk dulu (commit=False) lalu close (commit=True), seperti di loop live
+        stream.update(o[i] + 1.0, h[i] + 1.0, l[i], c[i] + 1.0, commit=False)
+        rows.append(stream.update(o[i], h[i], l[i], c[i]))
+    for col in FEATURE_COLUMNS:
+        got = np.array([r[col] for r in rows])
+        np.testing.assert_allclose(got, batch[col], rtol=1e-9, atol=1e-9, err_msg=col)
+
+
+def test_batch_matches_pandas_and_ta(ohlc):
+    ta = pytest.importorskip("ta")
+    _, h, l, c = ohlc
+    batch = compute_features(*ohlc)
+    df = pd.DataFrame({"High": h, "Low": l, "Close": c})
+    stoch = ta.momentum.StochasticOscillator(high=df["High"], low=df["Low"], close=df["Close"], window=14,
+                                             smooth_window=3)
+    expected = {
+        "MA_3": df["Close"].rolling(window=3).mean(),
+        "MA_15": df["Close"].rolling(window=15).mean(),
+        "stoch_k": stoch.stoch(),
+        "stoch_d": stoch.stoch_signal(),
+        "RSI_14": ta.momentum.RSIIndicator(close=df["Close"], window=14).rsi(),
+        "ATR_14": ta.volatility.AverageTrueRange(high=df["High"], low=df["Low"], close=df["Close"],
+                                                 window=14).average_true_range(),
+        "SR_min": df["Close"].rolling(window=50).min(),
+        "SR_max": df["Close"].rolling(window=50).max(),
+        "log_return": np.log(df["Close"] / df["Close"].shift(1)),
+    }
+    for col, series in expected.items():
+        np.testing.assert_allclose(batch[col], series.values, rtol=1e-9, atol=1e-9, err_msg=col)
+
+
+@pytest.mark.parametrize("chunk", [50, 777, 5_000])
+def test_chunked_matches_batch(ohlc, chunk):
+    o, h, l, c = ohlc
+    full = compute_features(o, h, l, c)
+    full["support_touches"] = count_touches(c, full["SR_min"])
+    full["resistance_touches"] = count_touches(c, full["SR_max"])
+    engine = ChunkedFeatures()
+    parts = [engine.update(o[i:i + chunk], h[i:i + chunk], l[i:i + chunk], c[i:i + chunk])
+             for i in range(0, len(c), chunk)]
+    for col in FEATURE_COLUMNS + ChunkedFeatures.TOUCH_COLUMNS:
+        got = np.concatenate([p[col] for p in parts])
+        np.testing.assert_allclose(got, full[col], rtol=1e-9, atol=1e-9, err_msg=col)
+
+
+def test_chunked_state_round_trip(ohlc):
+    o, h, l, c = ohlc
+    whole = ChunkedFeatures().update(o, h, l, c)
+    first = ChunkedFeatures()
+    first.update(o[:2_000], h[:2_000], l[:2_000], c[:2_000])
+    resumed = ChunkedFeatures.from_state(first.state()).update(o[2_000:], h[2_000:], l[2_000:], c[2_000:])
+    for col in FEATURE_COLUMNS + ChunkedFeatures.TOUCH_COLUMNS:
+        np.testing.assert_allclose(resumed[col], whole[col][2_000:], rtol=1e-9, atol=1e-9, err_msg=col)
@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+import pandas as pd  # type: ignore
+import pytest
+
+from column_store import load_frame
+from tests.conftest import trainer_module
+
+importer = trainer_module("1_import_data_mt5")
+
+INITIAL, NEW, PAGE_BARS = 3_000, 500, 700
+
+
+@pytest.fixture(params=["M1", "H1"])
+def feed(request):
+    """
+    MT5 palsu dengan INITIAL + NEW bar; jam berada di tengah bar ke-INITIAL yang masih
+    terbentuk (close/low belum final). Return (kwargs update_store, clock, rates, final_bar).
+    """
+    timeframe = request.param
+    tf_seconds = importer.TIMEFRAMES[timeframe][1]
+    clock = importer._FakeClock(importer.FAKE_EPOCH + timedelta(seconds=(INITIAL - 0.5) * tf_seconds))
+    mt5_module, _ = importer._fake_mt5_module(INITIAL + NEW, timeframe, clock)
+    rates = mt5_module.rates
+    final_bar = rates[INITIAL - 1].copy()
+    rates["close"][INITIAL - 1] -= 3.0
+    rates["low"][INITIAL - 1] = min(rates["low"][INITIAL - 1], rates["close"][INITIAL - 1])
+    kwargs = dict(timeframe=timeframe, days=(INITIAL + NEW + 1) * tf_seconds / 86400.0, page_bars=PAGE_BARS,
+                  mt5_module=mt5_module, now=clock)
+    return kwargs, clock, rates, final_bar
+
+
+def test_incremental_import_matches_full_download(tmp_path, feed):
+    kwargs, clock, rates, final_bar = feed
+    store, fresh = str(tmp_path / "data.cols"), str(tmp_path / "fresh.cols")
+    assert importer.update_store(store, "FAKE", **kwargs) == INITIAL
+
+    # Jam maju NEW bar; bar yang tadinya masih terbentuk kini final
+    rates[INITIAL - 1] = final_bar
+    clock.advance(NEW * importer.TIMEFRAMES[kwargs["timeframe"]][1])
+    assert importer.update_store(store, "FAKE", **kwargs) == NEW
+    importer.update_store(fresh, "FAKE", full=True, **kwargs)
+
+    got = load_frame(store)
+    assert got["Date"].is_unique
+    assert len(got) == INITIAL + NEW
+    assert got["Close"].iloc[INITIAL - 1] == final_bar["close"], "bar yang masih terbentuk tidak diganti"
+    pd.testing.assert_frame_equal(got, load_frame(fresh))
+
+
+def test_rerun_without_new_bars_adds_nothing(tmp_path, feed):
+    kwargs, _, _, _ = feed
+    store = str(tmp_path / "data.cols")
+    importer.update_store(store, "FAKE", **kwargs)
+    before = load_frame(store)
+    assert importer.update_store(store, "FAKE", **kwargs) == 0
+    pd.testing.assert_frame_equal(load_frame(store), before)
+
+
+def test_fake_rates_are_prefix_stable():
+    short = importer._fake_rates(12_345, "M1")
+    longer = importer._fake_rates(25_000, "M1")
+    assert (longer[:len(short)] == short).all()
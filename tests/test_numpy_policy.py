@@ -0,0 +1,99 @@
+import os
+import zipfile
+
+import numpy as np  # type: ignore
+import pytest
+
+gym = pytest.importorskip("gymnasium")
+nn = pytest.importorskip("torch.nn")
+PPO = pytest.importorskip("stable_baselines3").PPO
+
+from numpy_policy import NumpyPolicy, _softmax, export_policy  # noqa: E402
+from observation_spec import ObservationSpec  # noqa: E402
+
+
+class ConstantObsEnv(gym.Env):
+    """Env minimal: hanya observation/action space yang dipakai untuk membangun PPO."""
+
+    def __init__(self, obs_shape, n_actions):
+        self.observation_space = gym.spaces.Box(-np.inf, np.inf, obs_shape, dtype=np.float32)
+        self.action_space = gym.spaces.Discrete(n_actions)
+
+    def reset(self, *, seed=None, options=None):
+        return np.zeros(self.observation_space.shape, dtype=np.float32), {}
+
+    def step(self, action):
+        return np.zeros(self.observation_space.shape, dtype=np.float32), 0.0, True, False, {}
+
+
+CASES = {
+    "default_tanh": ((4,), 3, {}),
+    "relu_2d_obs": ((5, 3), 4, {"net_arch": {"pi": [16, 8], "vf": [8]}, "activation_fn": nn.ReLU}),
+    "no_hidden_layer": ((7,), 2, {"net_arch": {"pi": [], "vf": [8]}}),
+}
+
+
+@pytest.fixture(params=list(CASES))
+def exported(request, tmp_path):
+    """(model SB3, NumpyPolicy hasil export, path zip, path npz) untuk satu arsitektur."""
+    obs_shape, n_actions, policy_kwargs = CASES[request.param]
+    model_path = str(tmp_path / "model.zip")
+    PPO("MlpPolicy", ConstantObsEnv(obs_shape, n_actions), policy_kwargs=policy_kwargs, seed=0,
+        device="cpu").save(model_path)
+    npz_path = export_policy(model_path)
+    return PPO.load(model_path, device="cpu"), NumpyPolicy.load(npz_path), model_path, npz_path
+
+
+def _observations(model, n=2_000):
+    # Skala besar agar logit tersebar dan argmax benar-benar diuji di banyak aksi
+    return np.random.default_rng(0).normal(0, 5, (n,) + model.observation_space.shape).astype(np.float32)
+
+
+def test_export_writes_npz_next_to_model(exported):
+    model, policy, model_path, npz_path = exported
+    assert npz_path == os.path.splitext(model_path)[0] + ".npz"
+    assert policy.obs_shape == model.observation_space.shape
+    assert policy.n_actions == model.action_space.n
+
+
+def test_deterministic_actions_match_sb3(exported):
+    model, policy, _, _ = exported
+    obs = _observations(model)
+    expected, _ = model.predict(obs, deterministic=True)
+    got, _ = policy.predict(obs, deterministic=True)
+    assert len(np.unique(expected)) > 1, "semua aksi sama, test tidak bermakna"
+    assert got.shape == expected.shape and np.array_equal(got, expected)
+    single, _ = policy.predict(obs[0], deterministic=True)
+    assert np.ndim(single) == 0 and int(single) == int(model.predict(obs[0], deterministic=True)[0])
+
+
+def test_sampling_follows_softmax_of_logits(exported):
+    model, _, _, npz_path = exported
+    obs = _observations(model, 1)
+    policy = NumpyPolicy.load(npz_path, seed=0)
+    probs = _softmax(policy.logits(obs).astype(np.float64))[0]
+    sampled, _ = policy.predict(np.repeat(obs, 20_000, axis=0))
+    freq = np.bincount(sampled, minlength=policy.n_actions) / len(sampled)
+    np.testing.assert_allclose(freq, probs, atol=0.02)
+
+
+def test_observation_space_matches_sb3(exported):
+    model, policy, _, _ = exported
+    assert policy.observation_space.shape == model.observation_space.shape
+    assert policy.observation_space.dtype == np.float32
+
+
+def test_observation_spec_is_copied_into_npz(tmp_path):
+    model_path = str(tmp_path / "model.zip")
+    PPO("MlpPolicy", ConstantObsEnv((8,), 3), device="cpu").save(model_path)
+    spec = ObservationSpec(columns=["Close", "RSI_14"], window=4, scale={"RSI_14": [50.0, 10.0]})
+    spec.save_to_model(model_path)
+    npz_path = export_policy(model_path)
+    assert ObservationSpec.load_from_model(npz_path) == spec
+    assert zipfile.is_zipfile(npz_path)
+    NumpyPolicy.load(npz_path)  # entri spec tidak mengganggu np.load
+
+
+def test_rejects_unknown_activation():
+    with pytest.raises(ValueError):
+        NumpyPolicy([np.zeros((2, 4))], [np.zeros(2)], ["swish"], (4,))
@@ -0,0 +1,56 @@
+import zipfile
+
+import numpy as np  # type: ignore
+import pytest
+
+import fake_mt5
+from bar_buffer import BarRing
+from feature_engine import RingFeatureTracker, compute_features
+from observation_spec import SPEC_FILE, ObservationSpec
+
+
+def test_live_observation_matches_training_matrix(n=3_000, window=6):
+    """Observasi live (RingFeatureTracker per bar) == baris matriks observasi training pada data yang sama."""
+    rates = fake_mt5.synthetic_rates(1_700_000_000 - 1_700_000_000 % 86400, n)
+    feats = compute_features(rates["open"], rates["high"], rates["low"], rates["close"])
+    feats.update({"Open": rates["open"], "High": rates["high"], "Low": rates["low"], "Close": rates["close"]})
+    columns = ["Close", "MA_3", "RSI_14", "ATR_14", "dist_to_support"]
+    scale = {"Close": [float(rates["close"].mean()), float(rates["close"].std())], "RSI_14": [50.0, 10.0]}
+    spec = ObservationSpec(columns=columns, window=window, scale=scale)
+    matrix = spec.transform(np.column_stack([feats[c] for c in columns])).astype(np.float32)
+
+    ring = BarRing(capacity=120)
+    tracker = RingFeatureTracker(history=spec.window)
+    checked = 0
+    for t in range(n):
+        ring.push(rates[t])
+        obs = spec.live_observation(tracker, tracker.update(ring))
+        expected = matrix[t + 1 - window:t + 1] if t + 1 >= window else None
+        if expected is None or not np.isfinite(expected).all():
+            assert obs is None, t
+            continue
+        assert obs is not None, t
+        np.testing.assert_allclose(obs.ravel(), expected.ravel(), rtol=1e-5, atol=1e-5)
+        checked += 1
+    assert checked > n - 100
+
+
+def test_spec_round_trips_through_model_zip(tmp_path):
+    path = str(tmp_path / "model.zip")
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("data", "{}")
+    assert ObservationSpec.load_from_model(path) is None
+
+    ObservationSpec(columns=["Close"], window=4, obs_mode="returns").save_to_model(path)
+    spec = ObservationSpec(columns=["Close", "RSI_14"], window=8, scale={"RSI_14": [50.0, 10.0]})
+    spec.save_to_model(path)  # menimpa spec lama, entri lain tetap ada
+    assert ObservationSpec.load_from_model(path) == spec
+    with zipfile.ZipFile(path) as zf:
+        assert sorted(zf.namelist()) == ["data", SPEC_FILE]
+
+
+def test_rejects_columns_that_cannot_be_computed_live():
+    with pytest.raises(ValueError):
+        ObservationSpec(columns=["Close", "sr_zone"], window=4)
+    with pytest.raises(ValueError):
+        ObservationSpec(columns=["Close", "RSI_14"], window=4, obs_mode="returns")
@@ -0,0 +1,108 @@
+import os
+import secrets
+import socket
+import sys
+
+import numpy as np  # type: ignore
+import pytest
+
+from policy_server import PolicyClient, PolicyServer, daemon_running, load_authkey
+
+OBS = np.zeros((1, 4), dtype=np.float32)
+
+
+class ConstantModel:
+    """Model palsu: selalu aksi `action`."""
+
+    def __init__(self, action: int):
+        self.action = action
+
+    def predict(self, obs, deterministic: bool = False):
+        return np.full(len(obs), self.action), None
+
+
+def fallback(path):
+    return ConstantModel(1)
+
+
+@pytest.fixture
+def models(tmp_path):
+    """Direktori model yang diizinkan, file model di dalam & di luarnya, dan symlink keluar."""
+    model_dir, other_dir = tmp_path / "models", tmp_path / "other"
+    model_dir.mkdir()
+    other_dir.mkdir()
+    allowed, outside = model_dir / "ok.zip", other_dir / "evil.zip"
+    allowed.touch()
+    outside.touch()
+    link = model_dir / "link.zip"
+    link.symlink_to(outside)
+    return {"dir": str(model_dir), "allowed": str(allowed), "outside": str(outside), "link": str(link)}
+
+
+@pytest.fixture
+def server(tmp_path, models):
+    """PolicyServer aktif (model palsu: aksi 2) yang mencatat path setiap model yang dimuat."""
+    loaded = []
+
+    def loader(path, device):
+        loaded.append(path)
+        return ConstantModel(2)
+
+    srv = PolicyServer(str(tmp_path / "policy.sock"), secrets.token_bytes(32), [models["dir"]], max_delay=0.0,
+                       loader=loader).start()
+    srv.loaded = loaded
+    yield srv
+    srv.close()
+
+
+def client(server, path, authkey=None):
+    return PolicyClient(path, server.address, authkey=server.authkey if authkey is None else authkey,
+                        timeout=5.0, loader=fallback)
+
+
+def test_authenticated_client_is_served_by_daemon(server, models):
+    c = client(server, models["allowed"])
+    assert c.connected, c.last_error
+    assert c.predict(OBS)[0][0] == 2 and c.remote_calls == 1
+    c.close()
+
+
+def test_wrong_key_falls_back_in_process(server, models):
+    c = client(server, models["allowed"], authkey=b"salah")
+    assert not c.connected and "Authentication" in c.last_error
+    assert c.predict(OBS)[0][0] == 1 and c.local_calls == 1
+    # Daemon tetap melayani klien lain
+    assert client(server, models["allowed"]).connected
+
+
+@pytest.mark.parametrize("name", ["outside", "link", "dotdot"])
+def test_models_outside_model_dirs_are_never_loaded(server, models, name):
+    path = os.path.join(models["dir"], "..", "other", "evil.zip") if name == "dotdot" else models[name]
+    c = client(server, path)
+    assert not c.connected and "PermissionError" in c.last_error
+    assert server.loaded == []
+
+
+def test_second_daemon_does_not_steal_a_live_socket(server, models):
+    with pytest.raises(RuntimeError):
+        PolicyServer(server.address, server.authkey, [models["dir"]], loader=server.loader).start()
+    c = client(server, models["allowed"])
+    assert c.connected and c.predict(OBS)[0][0] == 2
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Unix socket")
+def test_stale_socket_is_replaced(tmp_path, models):
+    address = str(tmp_path / "stale.sock")
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(address)
+    stale.close()
+    assert not daemon_running(address)
+    PolicyServer(address, b"k", [models["dir"]], loader=lambda path, device: ConstantModel(2)).start().close()
+
+
+def test_key_file_is_created_once_and_private(tmp_path):
+    key_file = str(tmp_path / "policy.key")
+    key = load_authkey(key_file, create=True)
+    assert load_authkey(key_file, create=True) == key and len(key) == 64
+    if sys.platform != "win32":
+        assert os.stat(key_file).st_mode & 0o777 == 0o600
@@ -0,0 +1,128 @@
+import numpy as np  # type: ignore
+import pandas as pd  # type: ignore
+import pytest
+
+import fake_mt5
+from column_store import ColumnStoreWriter, load_frame
+from feature_scaler import ScalerArtifact
+from tests.conftest import trainer_module
+
+prep = trainer_module("2_preprocessing_data")
+
+N_INITIAL, N_NEW, CHUNKSIZE, TIMESTEPS = 2_000, 1_000, 700, 20
+
+
+@pytest.fixture
+def raw_frame():
+    """Bar M1 final sepanjang N_INITIAL + N_NEW (kolom seperti store data_{symbol}_mt5.cols)."""
+    rates = fake_mt5.synthetic_rates(1_700_000_000, N_INITIAL + N_NEW, step=1.0)
+    return pd.DataFrame({
+        "Date": pd.to_datetime(rates["time"], unit="s"),
+        "Close": rates["close"], "High": rates["high"], "Low": rates["low"], "Open": rates["open"],
+        "Volume": rates["tick_volume"].astype(np.int64),
+    })
+
+
+def inside_bar(frame, i):
+    """Waktu UTC di tengah bar ke-i (bar itu masih terbentuk)."""
+    return frame["Date"].iloc[i] + pd.Timedelta(seconds=30)
+
+
+def write_store(path, frame):
+    with ColumnStoreWriter(path) as writer:
+        writer.append(frame)
+    return path
+
+
+def assert_frames_close(got, expected, rtol=1e-9):
+    assert list(got.index) == list(expected.index), (len(got), len(expected))
+    for col in expected.columns:
+        if expected[col].dtype.kind in "fc":
+            np.testing.assert_allclose(got[col].values, expected[col].values, rtol=rtol, atol=1e-9, err_msg=col)
+        else:
+            assert (got[col].values == expected[col].values).all(), col
+
+
+def test_incremental_matches_full_reprocessing(tmp_path, raw_frame):
+    """Kasus update_store: bar terakhir store ditimpa versi finalnya lalu bar baru ditambahkan."""
+    first = raw_frame.iloc[:N_INITIAL].copy()
+    # Versi "masih terbentuk" dari bar terakhir run pertama: close & high berbeda dari versi final
+    first.loc[first.index[-1], ["Close", "High"]] += 7.5
+    raw, out, artifact_path = (str(tmp_path / name) for name in ("raw.cols", "out.cols", "scalers.json"))
+    write_store(raw, first)
+    prep.preprocess_streaming(raw, out, TIMESTEPS, chunksize=CHUNKSIZE, artifact_path=artifact_path,
+                              now=inside_bar(raw_frame, N_INITIAL - 1))
+
+    with ColumnStoreWriter(raw, append=True) as writer:
+        writer.truncate(N_INITIAL - 1)
+        writer.append(raw_frame.iloc[N_INITIAL - 1:])
+    now = inside_bar(raw_frame, -1)
+    added = prep.preprocess_incremental(raw, out, chunksize=CHUNKSIZE, artifact_path=artifact_path, now=now)
+
+    # Referensi: proses ulang seluruh data final sekaligus dengan scaler yang sama
+    artifact = ScalerArtifact.load(artifact_path)
+    expected, _ = prep.preprocess_data(prep.drop_forming_bar(raw_frame, now), TIMESTEPS, artifact=artifact)
+    expected, _ = prep.attach_target(expected, None)
+    got = load_frame(out).set_index("Date")
+
+    assert added == N_NEW
+    assert got.index.is_unique and got.index.is_monotonic_increasing
+    assert_frames_close(got, expected)
+
+
+def test_incremental_processes_closed_bars_one_at_a_time(tmp_path, raw_frame):
+    """Histori final: bar terakhir tidak ditahan, dan satu bar baru per run langsung diproses."""
+    raw, out, artifact_path = (str(tmp_path / name) for name in ("raw.cols", "out.cols", "scalers.json"))
+    write_store(raw, raw_frame.iloc[:N_INITIAL])
+    prep.preprocess_streaming(raw, out, TIMESTEPS, chunksize=CHUNKSIZE, artifact_path=artifact_path)
+    for i in range(N_INITIAL, N_INITIAL + 3):
+        with ColumnStoreWriter(raw, append=True) as writer:
+            writer.append(raw_frame.iloc[i:i + 1])
+        assert prep.preprocess_incremental(raw, out, chunksize=CHUNKSIZE, artifact_path=artifact_path) == 1
+
+    artifact = ScalerArtifact.load(artifact_path)
+    expected, _ = prep.preprocess_data(raw_frame.iloc[:N_INITIAL + 3].copy(), TIMESTEPS, artifact=artifact)
+    expected, _ = prep.attach_target(expected, None)
+    assert_frames_close(load_frame(out).set_index("Date"), expected)
+
+
+def test_drop_forming_bar_only_drops_unfinished_bar(raw_frame):
+    last = raw_frame["Date"].iloc[-1]
+    assert len(prep.drop_forming_bar(raw_frame)) == len(raw_frame), "histori final tidak boleh dipotong"
+    assert len(prep.drop_forming_bar(raw_frame, now=last + pd.Timedelta(seconds=60))) == len(raw_frame)
+    assert len(prep.drop_forming_bar(raw_frame, now=last + pd.Timedelta(seconds=59))) == len(raw_frame) - 1
+    # Durasi bar ditebak dari bar sebelumnya walau gap terakhir lebih panjang (mis. akhir pekan)
+    gapped = raw_frame.copy()
+    gapped.loc[gapped.index[-1], "Date"] += pd.Timedelta(days=2)
+    assert len(prep.drop_forming_bar(gapped, now=gapped["Date"].iloc[-1] + pd.Timedelta(seconds=90))) == len(gapped)
+    # Satu bar saja: durasi tidak diketahui -> dianggap masih terbentuk
+    assert prep.drop_forming_bar(raw_frame.iloc[:1]).empty
+
+
+@pytest.mark.parametrize("n_rows", [CHUNKSIZE * 2 + 1, CHUNKSIZE * 3])
+def test_iter_final_frames_uses_previous_chunk_for_bar_period(tmp_path, raw_frame, n_rows):
+    raw = write_store(str(tmp_path / "raw.cols"), raw_frame.iloc[:n_rows])
+    closed = pd.concat(prep.iter_final_frames(raw, CHUNKSIZE))
+    forming = pd.concat(prep.iter_final_frames(raw, CHUNKSIZE, now=inside_bar(raw_frame, n_rows - 1)))
+    assert len(closed) == n_rows
+    assert len(forming) == n_rows - 1
+
+
+def test_streaming_partial_fit_matches_full_fit(tmp_path, raw_frame):
+    """Scaler dari partial_fit per chunk (mode streaming) == fit sekali atas seluruh data (mode penuh)."""
+    raw = write_store(str(tmp_path / "raw.cols"), raw_frame)
+    out, artifact_path = str(tmp_path / "out.cols"), str(tmp_path / "scalers.json")
+    written = prep.preprocess_streaming(raw, out, TIMESTEPS, chunksize=CHUNKSIZE, artifact_path=artifact_path)
+    streamed = ScalerArtifact.load(artifact_path)
+
+    full, artifact = prep.preprocess_data(prep.drop_forming_bar(load_frame(raw)), TIMESTEPS)
+    full, _ = prep.attach_target(full, None)
+
+    assert streamed.price_cols == artifact.price_cols
+    assert streamed.n_samples == artifact.n_samples
+    np.testing.assert_allclose(streamed.price_mean, artifact.price_mean, rtol=1e-9)
+    np.testing.assert_allclose(streamed.price_scale, artifact.price_scale, rtol=1e-9)
+    assert streamed.volume_min == pytest.approx(artifact.volume_min, rel=1e-9)
+    assert streamed.volume_scale == pytest.approx(artifact.volume_scale, rel=1e-9)
+    assert written == len(full)
+    assert_frames_close(load_frame(out).set_index("Date"), full, rtol=1e-7)
@@ -0,0 +1,85 @@
+import pytest
+
+import fake_mt5
+from tick_scheduler import TickScheduler
+
+SYMBOL = "XAUUSD"
+
+
+class ManualTime:
+    """Waktu palsu: sleep() memajukan waktu dan mencatat durasinya."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def make_scheduler():
+    """Pabrik (ManualTime, TickScheduler) di atas FakeTickFeed dengan `ticks_per_second`."""
+    def make(ticks_per_second, **kwargs):
+        time_ = ManualTime()
+        feed = fake_mt5.FakeTickFeed(SYMBOL, ticks_per_second=ticks_per_second, clock=time_.clock, epoch=0.0)
+        return time_, TickScheduler(fake_mt5.FakeMT5(feed=feed), SYMBOL, clock=time_.clock, sleep=time_.sleep,
+                                    **kwargs)
+    return make
+
+
+def test_unchanged_tick_only_wakes_for_risk_checks(make_scheduler):
+    _, sched = make_scheduler(0.1, risk_interval=1.0)  # satu tick per 10 detik
+    events = [sched.wait() for _ in range(9)]
+    assert events[0].new_tick
+    assert not any(e.new_tick for e in events[1:])
+    assert all(e.risk_due for e in events[1:])
+    assert sched.ticks_seen == 1
+
+
+def test_every_new_tick_wakes_exactly_once(make_scheduler):
+    _, sched = make_scheduler(5.0, risk_interval=60.0)
+    seen = []
+    while len(seen) < 50:
+        event = sched.wait()
+        if event.new_tick:
+            seen.append(event.tick.time_msc)
+    assert seen == [i * 200 for i in range(50)]
+    assert sched.ticks_seen == 50
+
+
+def test_risk_checks_keep_their_own_cadence(make_scheduler):
+    time_, sched = make_scheduler(3.0, risk_interval=0.5)
+    risk_times = []
+    while time_.now < 20.0:
+        if sched.wait().risk_due:
+            risk_times.append(time_.now)
+    gaps = [b - a for a, b in zip(risk_times, risk_times[1:])]
+    assert len(gaps) >= 38
+    assert gaps == pytest.approx([0.5] * len(gaps), abs=1e-9)
+
+
+def test_backoff_is_capped_and_never_oversleeps_a_risk_check(make_scheduler):
+    time_, sched = make_scheduler(0.01, risk_interval=1.3, min_poll=0.02, max_poll=0.25)
+    deadlines = []
+    sleep = time_.sleep
+
+    def checked_sleep(seconds):
+        deadlines.append(sched._next_risk - time_.now)
+        sleep(seconds)
+
+    sched.sleep = checked_sleep
+    while time_.now < 30.0:
+        sched.wait()
+    assert time_.sleeps[:4] == [0.02, 0.04, 0.08, 0.16]
+    assert max(time_.sleeps) == 0.25
+    assert all(s <= d + 1e-12 for s, d in zip(time_.sleeps, deadlines))
+
+
+def test_rejects_invalid_poll_bounds():
+    with pytest.raises(ValueError):
+        TickScheduler(fake_mt5.FakeMT5(), SYMBOL, min_poll=0.5, max_poll=0.1)
@@ -0,0 +1,47 @@
+import numpy as np  # type: ignore
+import pytest
+
+from tests.conftest import random_walk
+from trading_env import BatchTradingVecEnv, SimpleTradingEnv
+
+
+@pytest.mark.parametrize("episode_length, obs_mode", [(None, "close"), (300, "close_returns"), (50, "returns")])
+def test_batch_env_matches_simple_env(episode_length, obs_mode, n_envs=8, steps=3_000):
+    """Reward, done, truncated dan observasi BatchTradingVecEnv == SimpleTradingEnv untuk aksi acak yang sama."""
+    rng = np.random.default_rng(0)
+    close = random_walk(2_000)
+    kwargs = dict(window=4, spread=0.3, commission=0.05, reverse=True, episode_length=episode_length,
+                  obs_mode=obs_mode)
+    batch = BatchTradingVecEnv(close, n_envs=n_envs, seed=0, **kwargs)
+    obs = batch.reset()
+    envs = [SimpleTradingEnv(close, **kwargs) for _ in range(n_envs)]
+    for env, start, o in zip(envs, batch.idx, obs):
+        env.reset(options={"start": int(start)})
+        assert np.array_equal(env._obs(), o)
+
+    episodes = 0
+    for _ in range(steps):
+        actions = rng.integers(0, 3, size=n_envs)
+        obs, rewards, dones, infos = batch.step(actions)
+        for k, env in enumerate(envs):
+            o, r, terminated, truncated, _ = env.step(int(actions[k]))
+            done = terminated or truncated
+            assert np.float32(r) == rewards[k] and done == dones[k]
+            if done:
+                episodes += 1
+                assert np.array_equal(o, infos[k]["terminal_observation"])
+                assert truncated == infos[k]["TimeLimit.truncated"]
+                o, _ = env.reset(options={"start": int(batch.idx[k])})
+            assert np.array_equal(o, obs[k])
+    assert episodes > 0, "test harus melewati akhir episode"
+
+
+def test_precomputed_observations_match_per_step_slicing(window=8):
+    close = random_walk(2_000, seed=3)
+    env = SimpleTradingEnv(close, window=window, obs_mode="close_returns")
+    for idx in range(window, len(close) + 1):
+        env.idx = idx
+        obs = env._obs()
+        returns = [close[t] / close[t - 1] - 1 if t > 0 else 0.0 for t in range(idx - window, idx)]
+        assert np.array_equal(obs[:window], close[idx - window:idx])
+        np.testing.assert_allclose(obs[window:], returns, atol=1e-6)
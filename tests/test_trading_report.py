@@ -0,0 +1,112 @@
+import csv
+from datetime import datetime, timedelta
+
+import pytest
+
+from trading_report import KEY_FIELDS, REPORT_FIELDS, TradingReporter, read_binary_report
+
+ACCOUNT = 123456
+START = datetime(2024, 3, 1, 23, 59, 50)
+
+
+class ManualClock:
+    """Jam monotonic & kalender palsu yang dimajukan bersama-sama."""
+
+    def __init__(self):
+        self.seconds = 0.0
+
+    def monotonic(self) -> float:
+        return self.seconds
+
+    def now(self) -> datetime:
+        return START + timedelta(seconds=self.seconds)
+
+    def advance(self, seconds: float) -> None:
+        self.seconds += seconds
+
+
+def sample(**overrides):
+    row = dict(balance=1000.0, equity=1000.0, margin=0.0, free_margin=1000.0, open_trades=0,
+               floating_profit=0.0, daily_closed_profit=0.0)
+    row.update(overrides)
+    return row
+
+
+@pytest.fixture
+def make_reporter(tmp_path):
+    def make(fmt="csv", interval=5.0):
+        clock = ManualClock()
+        reporter = TradingReporter(ACCOUNT, interval=interval, fmt=fmt, out_dir=str(tmp_path),
+                                   clock=clock.monotonic, now=clock.now)
+        return clock, reporter
+    return make
+
+
+def read_csv_report(path):
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_identical_rows_are_written_once(tmp_path, make_reporter):
+    clock, reporter = make_reporter()
+    written = []
+    for _ in range(20):
+        written.append(reporter.report(sample()))
+        clock.advance(10.0)  # jauh melewati interval: baris identik tetap tidak ditulis
+    reporter.close()
+    assert written == [True] + [False] * 19
+    rows = read_csv_report(tmp_path / f"trading_report_{ACCOUNT}.csv")
+    assert len(rows) == 1 and list(rows[0]) == REPORT_FIELDS
+
+
+def test_minor_changes_wait_for_interval(make_reporter):
+    clock, reporter = make_reporter(interval=5.0)
+    assert reporter.report(sample())
+    clock.advance(1.0)
+    assert not reporter.report(sample(equity=1001.0))
+    clock.advance(3.9)
+    assert not reporter.report(sample(equity=1002.0))
+    clock.advance(0.1)
+    assert reporter.report(sample(equity=1003.0))
+    assert reporter.report(sample(equity=1004.0), force=True)
+    assert reporter.rows_written == 3
+
+
+@pytest.mark.parametrize("field", KEY_FIELDS)
+def test_key_field_change_is_written_immediately(make_reporter, field):
+    clock, reporter = make_reporter(interval=60.0)
+    assert reporter.report(sample())
+    clock.advance(0.1)
+    assert reporter.report(sample(**{field: 1}))
+
+
+def test_csv_appends_without_repeating_header(tmp_path, make_reporter):
+    for balance in (1000.0, 1010.0):
+        _, reporter = make_reporter()
+        reporter.report(sample(balance=balance))
+        reporter.close()
+    rows = read_csv_report(tmp_path / f"trading_report_{ACCOUNT}.csv")
+    assert [float(r["balance"]) for r in rows] == [1000.0, 1010.0]
+    assert rows[0]["timestamp"] == START.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def test_binary_records_roundtrip_and_rotate_daily(tmp_path, make_reporter):
+    clock, reporter = make_reporter(fmt="binary")
+    reporter.report(sample(open_trades=1, floating_profit=-2.5))
+    clock.advance(5.0)
+    reporter.report(sample(open_trades=2, floating_profit=3.25))
+    clock.advance(5.0)  # lewat tengah malam -> file hari berikutnya
+    reporter.report(sample(open_trades=3, daily_closed_profit=7.0))
+    reporter.close()
+
+    first = read_binary_report(str(tmp_path / f"trading_report_{ACCOUNT}_20240301.bin"))
+    second = read_binary_report(str(tmp_path / f"trading_report_{ACCOUNT}_20240302.bin"))
+    assert list(first["open_trades"]) == [1, 2]
+    assert list(first["floating_profit"]) == [-2.5, 3.25]
+    assert list(first["timestamp"]) == [START.timestamp(), START.timestamp() + 5.0]
+    assert len(second) == 1 and second["daily_closed_profit"][0] == 7.0
+
+
+def test_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        TradingReporter(ACCOUNT, fmt="json", out_dir=str(tmp_path))
@@ -0,0 +1,139 @@
+"""
+Scheduler berbasis perubahan tick untuk trading_loop.
+
+API MetaTrader5 tidak punya notifikasi push untuk tick baru, jadi scheduler ini
+mem-poll `symbol_info_tick` (satu panggilan IPC murah) dan hanya membangunkan
+loop utama ketika:
+- `time_msc` tick terakhir berubah (tick baru -> jalankan pipeline keputusan), atau
+- jadwal risk check jatuh tempo (floating profit / drawdown tetap dicek walau pasar sepi).
+
+Saat pasar sepi interval polling naik secara eksponensial (min_poll -> max_poll),
+sehingga bot yang idle hampir tidak memakai CPU.
+
+Benchmark (memakai fake_mt5, bisa dijalankan di Linux; test: tests/test_tick_scheduler.py):
+    python tick_scheduler.py --seconds 10 --ticks_per_second 2
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+
+@dataclass(frozen=True)
+class TickEvent:
+    """Hasil `TickScheduler.wait()`."""
+    tick: Any            # tick terakhir (bisa None jika terminal tidak mengirim tick)
+    new_tick: bool       # True jika time_msc berubah sejak event sebelumnya
+    risk_due: bool       # True jika jadwal risk check jatuh tempo
+
+
+class TickScheduler:
+    """
+    Membangunkan trading_loop hanya saat ada tick baru atau risk check jatuh tempo.
+
+    Args:
+        mt5_module: modul MetaTrader5 (atau fake_mt5.FakeMT5)
+        symbol: simbol yang dipantau
+        risk_interval: interval risk check dalam detik
+        min_poll: interval polling minimum (detik) setelah ada tick baru
+        max_poll: interval polling maksimum (detik) saat pasar sepi
+        clock: fungsi waktu monotonic
+        sleep: fungsi sleep (bisa diganti saat replay/test)
+    """
+
+    def __init__(
+        self,
+        mt5_module,
+        symbol: str,
+        risk_interval: float = 1.0,
+        min_poll: float = 0.02,
+        max_poll: float = 0.25,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if min_poll <= 0 or max_poll < min_poll:
+            raise ValueError("Interval polling tidak valid: butuh 0 < min_poll <= max_poll")
+        self.mt5 = mt5_module
+        self.symbol = symbol
+        self.risk_interval = float(risk_interval)
+        self.min_poll = float(min_poll)
+        self.max_poll = float(max_poll)
+        self.clock = clock
+        self.sleep = sleep
+        self._last_time_msc: Optional[int] = None
+        self._next_risk = clock()  # risk check pertama langsung jatuh tempo
+        self._poll = self.min_poll
+        # Statistik untuk benchmark / debugging
+        self.polls = 0
+        self.ticks_seen = 0
+
+    def wait(self) -> TickEvent:
+        """Blok sampai ada tick baru atau risk check jatuh tempo."""
+        while True:
+            tick = self.mt5.symbol_info_tick(self.symbol)
+            self.polls += 1
+            now = self.clock()
+            time_msc = getattr(tick, "time_msc", None) if tick is not None else None
+            new_tick = time_msc is not None and time_msc != self._last_time_msc
+            risk_due = now >= self._next_risk
+
+            if new_tick or risk_due:
+                if new_tick:
+                    self._last_time_msc = time_msc
+                    self.ticks_seen += 1
+                    self._poll = self.min_poll
+                if risk_due:
+                    self._next_risk = now + self.risk_interval
+                return TickEvent(tick=tick, new_tick=new_tick, risk_due=risk_due)
+
+            # Tidak ada yang perlu dikerjakan: tidur, tapi jangan melewati jadwal risk check
+            self.sleep(max(0.0, min(self._poll, self._next_risk - now)))
+            self._poll = min(self._poll * 2, self.max_poll)
+
+
+def _benchmark(seconds: float, ticks_per_second: float) -> None:
+    """Bandingkan polling buta 50 ms vs TickScheduler pada feed tick palsu."""
+    import fake_mt5
+
+    symbol = "XAUUSD"
+
+    def run(label, body):
+        feed = fake_mt5.FakeTickFeed(symbol, ticks_per_second=ticks_per_second)
+        mt5 = fake_mt5.FakeMT5(feed=feed)
+        cpu_start = time.process_time()
+        pipeline_runs, polls = body(mt5)
+        cpu = time.process_time() - cpu_start
+        print(f"{label:<16} pipeline={pipeline_runs:>6}  tick_polls={polls:>6}  cpu={cpu * 1000:8.1f} ms")
+
+    def blind(mt5):
+        runs = 0
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            mt5.symbol_info_tick(symbol)
+            runs += 1  # pipeline keputusan dijalankan tiap iterasi
+            time.sleep(0.05)
+        return runs, runs
+
+    def scheduled(mt5):
+        sched = TickScheduler(mt5, symbol)
+        runs = 0
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            event = sched.wait()
+            if event.new_tick:
+                runs += 1
+        return runs, sched.polls
+
+    print(f"Benchmark {seconds:.0f}s, {ticks_per_second} tick/s")
+    run("sleep(0.05)", blind)
+    run("TickScheduler", scheduled)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark TickScheduler vs polling 50 ms")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--ticks_per_second", type=float, default=2.0)
+    bench_args = parser.parse_args()
+    _benchmark(bench_args.seconds, bench_args.ticks_per_second)
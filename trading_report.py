@@ -0,0 +1,149 @@
+"""
+Penulis trading report per akun dengan sampling dan deduplikasi.
+
+Dulu `update_trading_report()` menulis satu baris penuh di setiap iterasi loop
+(~20 baris/detik per bot, hampir semuanya identik). `TradingReporter` hanya
+menulis baris jika:
+- field penting berubah (balance, open_trades, daily_closed_profit) -> langsung, atau
+- field lain (equity, margin, floating) berubah dan sudah lewat `interval` detik
+  sejak baris terakhir.
+Baris yang identik dengan baris terakhir tidak pernah ditulis.
+
+Format output:
+- "csv"    : trading_report_{akun}.csv (kompatibel dengan format lama)
+- "binary" : trading_report_{akun}_{YYYYMMDD}.bin, record biner tetap (REPORT_DTYPE),
+             rotasi harian, dibaca instan dengan `read_binary_report()`
+"""
+
+import csv
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+import numpy as np  # type: ignore
+
+REPORT_FIELDS = [
+    "timestamp", "balance", "equity", "margin", "free_margin",
+    "open_trades", "floating_profit", "daily_closed_profit",
+]
+# Field yang perubahannya langsung ditulis tanpa menunggu interval
+KEY_FIELDS = ("balance", "open_trades", "daily_closed_profit")
+
+# Record biner: timestamp = detik unix (float64)
+REPORT_DTYPE = np.dtype([
+    ("timestamp", "<f8"),
+    ("balance", "<f8"),
+    ("equity", "<f8"),
+    ("margin", "<f8"),
+    ("free_margin", "<f8"),
+    ("open_trades", "<i4"),
+    ("floating_profit", "<f8"),
+    ("daily_closed_profit", "<f8"),
+])
+
+
+def read_binary_report(path: str) -> np.ndarray:
+    """Memuat file report biner sebagai structured array (tanpa parsing teks)."""
+    return np.fromfile(path, dtype=REPORT_DTYPE)
+
+
+class TradingReporter:
+    """
+    Args:
+        account_number: nomor akun (bagian dari nama file)
+        interval: jeda minimum (detik) antar baris untuk perubahan non-penting
+        fmt: "csv" atau "binary"
+        out_dir: folder output
+        clock: jam monotonic untuk interval
+        now: sumber waktu kalender untuk timestamp & rotasi harian
+    """
+
+    def __init__(
+        self,
+        account_number,
+        interval: float = 5.0,
+        fmt: str = "csv",
+        out_dir: str = ".",
+        clock: Callable[[], float] = time.monotonic,
+        now: Callable[[], datetime] = datetime.now,
+    ):
+        if fmt not in ("csv", "binary"):
+            raise ValueError(f"Format report tidak dikenal: {fmt}")
+        self.account_number = account_number
+        self.interval = float(interval)
+        self.fmt = fmt
+        self.out_dir = out_dir
+        self.clock = clock
+        self.now = now
+        self._last_values: Optional[Dict] = None
+        self._last_emit = float("-inf")
+        self._file = None
+        self._file_day: Optional[str] = None
+        self._csv_writer = None
+        self.rows_written = 0
+
+    def report(self, row: Dict, force: bool = False) -> bool:
+        """
+        Terima satu sampel report (tanpa timestamp). Return True jika baris ditulis.
+        """
+        values = {k: row[k] for k in REPORT_FIELDS if k != "timestamp"}
+        if not force and not self._should_emit(values):
+            return False
+        self._write(self.now(), values)
+        self._last_values = values
+        self._last_emit = self.clock()
+        return True
+
+    def close(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception:
+                pass
+            self._file = None
+
+    def _should_emit(self, values: Dict) -> bool:
+        last = self._last_values
+        if last is None:
+            return True
+        if values == last:
+            return False
+        if any(values[k] != last[k] for k in KEY_FIELDS):
+            return True
+        return (self.clock() - self._last_emit) >= self.interval
+
+    def _path(self, day: str) -> str:
+        if self.fmt == "csv":
+            return os.path.join(self.out_dir, f"trading_report_{self.account_number}.csv")
+        return os.path.join(self.out_dir, f"trading_report_{self.account_number}_{day}.bin")
+
+    def _ensure_file(self, ts: datetime) -> None:
+        day = ts.strftime("%Y%m%d")
+        # CSV tidak dirotasi agar tetap kompatibel dengan nama file lama
+        if self._file is not None and (self.fmt == "csv" or day == self._file_day):
+            return
+        self.close()
+        path = self._path(day)
+        if self.fmt == "csv":
+            write_header = not os.path.isfile(path) or os.path.getsize(path) == 0
+            self._file = open(path, mode="a", newline="")
+            self._csv_writer = csv.DictWriter(self._file, fieldnames=REPORT_FIELDS)
+            if write_header:
+                self._csv_writer.writeheader()
+        else:
+            self._file = open(path, mode="ab")
+        self._file_day = day
+
+    def _write(self, ts: datetime, values: Dict) -> None:
+        self._ensure_file(ts)
+        if self.fmt == "csv":
+            self._csv_writer.writerow({"timestamp": ts.strftime("%Y-%m-%d %H:%M:%S"), **values})
+        else:
+            rec = np.zeros(1, dtype=REPORT_DTYPE)
+            rec["timestamp"] = ts.timestamp()
+            for k, v in values.items():
+                rec[k] = v
+            self._file.write(rec.tobytes())
+        self._file.flush()
+        self.rows_written += 1